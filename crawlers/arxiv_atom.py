@@ -0,0 +1,105 @@
+"""
+Parseur incrémental du flux Atom de l'API arXiv (remplace feedparser).
+
+feedparser construit un arbre d'objets générique (liens, détails HTML, dates analysées...)
+pour tout le document avant de rendre la main ; le crawler n'en utilisait que quelques
+champs. Ici le corps de la réponse est donné par morceaux à un XMLPullParser (expat, en C) :
+chaque <entry> est convertie en dictionnaire compact dès sa balise fermante, puis retirée
+de l'arbre, si bien que la mémoire ne dépend pas du nombre d'entrées du document.
+
+Champs produits (mêmes valeurs que l'ancien parsing feedparser pour les champs existants) :
+- id : dernier segment de l'URL <id> (ex: 2401.01234v1)
+- title, summary : texte sans espaces de début / fin
+- published : date brute ISO 8601 (ex: 2024-01-15T18:59:59Z)
+- authors : noms des auteurs
+- categories : termes des balises <category>
+- doi, journal_ref, primary_category : seulement si présents dans l'entrée
+- affiliations : {auteur: [affiliations]}, seulement si arXiv en fournit
+
+Variables de contrôle :
+- PARSE_CHUNK_SIZE : taille (octets) des morceaux fournis au parseur.
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, Iterator, Union
+
+# ------------------ CONFIG ------------------
+PARSE_CHUNK_SIZE = 64 * 1024
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+ENTRY_TAG = f"{ATOM}entry"
+
+
+def _text(element, tag: str) -> str:
+    value = element.findtext(tag)
+    return value.strip() if value else ""
+
+
+def entry_to_record(entry: ET.Element, category: str = None) -> Dict[str, Any]:
+    """Convertit un élément <entry> en dictionnaire pour l'ArxivProcessor."""
+    authors = []
+    affiliations = {}
+    for author in entry.iterfind(f"{ATOM}author"):
+        name = _text(author, f"{ATOM}name")
+        authors.append(name)
+        names = [aff.text.strip() for aff in author.iterfind(f"{ARXIV}affiliation") if aff.text]
+        if names:
+            affiliations[name] = names
+
+    record = {
+        "id": _text(entry, f"{ATOM}id").split("/")[-1],
+        "title": _text(entry, f"{ATOM}title"),
+        "summary": _text(entry, f"{ATOM}summary"),
+        "published": _text(entry, f"{ATOM}published"),
+        "authors": authors,
+        "category": category,
+        "categories": [tag.get("term") for tag in entry.iterfind(f"{ATOM}category")],
+    }
+
+    doi = _text(entry, f"{ARXIV}doi")
+    if doi:
+        record["doi"] = doi
+    journal_ref = _text(entry, f"{ARXIV}journal_ref")
+    if journal_ref:
+        record["journal_ref"] = journal_ref
+    primary = entry.find(f"{ARXIV}primary_category")
+    if primary is not None and primary.get("term"):
+        record["primary_category"] = primary.get("term")
+    if affiliations:
+        record["affiliations"] = affiliations
+    return record
+
+
+def iter_entries(body: Union[bytes, Iterable[bytes]], category: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    Renvoie les entrées d'un flux Atom arXiv au fil de la lecture.
+    `body` est le document complet (bytes) ou un itérable de morceaux (ex: iter_content).
+    """
+    if isinstance(body, (bytes, bytearray)):
+        document = body
+        chunks = (document[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(document), PARSE_CHUNK_SIZE))
+    else:
+        chunks = body
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+
+    def drain():
+        nonlocal root
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+            elif element.tag == ENTRY_TAG:
+                yield entry_to_record(element, category)
+                # L'entrée est consommée : on la vide et la détache pour garder un arbre vide
+                element.clear()
+                if root is not None and len(root) and root[-1] is element:
+                    root.remove(element)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
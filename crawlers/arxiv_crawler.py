@@ -6,24 +6,38 @@ Ce script interroge les archives d'arXiv pour récupérer les derniers travaux e
 
 Limitations Techniques :
 - DOI : Généralement NULL. arXiv étant un dépôt de preprints, le DOI n'est attribué 
-  qu'après publication en revue (souvent non répertorié dans le flux API initial).
-- Affiliations/ORCID : Non fournis par l'API standard d'arXiv.
+  qu'après publication en revue (souvent non répertorié dans le flux API initial, repris si présent).
+- Affiliations/ORCID : ORCID non fourni ; affiliations rarement renseignées (reprises si présentes).
 
 Variables de contrôle :
 - AI_CATEGORIES : Liste des domaines arXiv à scanner (cs.AI, cs.LG, etc.).
 - MAX_RESULTS_PER_CATEGORY : Nombre total d'articles à récupérer par catégorie (repris dans le pipeline)
 - FETCH_BATCH_SIZE : Nombre d'articles demandés par requête API (max 100 recommandé par arXiv).
-- FETCH_DELAY : Temps de pause (secondes) entre les requêtes pour respecter les quotas de l'API.
+- MAX_WORKERS : Nombre de catégories crawlées en parallèle (le débit global reste borné par la limite
+  de l'hôte arXiv, HOST_RATE_LIMITS dans crawlers/http_client.py : 2 req/s, soit une requête toutes les 0.5 s).
 - From_year: repris dans le pipeline (permet de limiter la profondeur des requêtes)
+- checkpoint: point de reprise (crawlers/checkpoint.py) : offset, compteurs et ids de la dernière page par catégorie
+- since: date de soumission minimale (YYYY-MM-DD), high-water mark du run précédent (prioritaire sur from_year)
 
 Fonctionnement :
-Le script itère sur les catégories, effectue des requêtes paginées jusqu'à atteindre 
-le quota fixé, et renvoie une liste de dictionnaires formatés pour l'ArxivProcessor.
+Les catégories sont crawlées en parallèle (un thread par catégorie) et fusionnées en un 
+flux unique dédoublonné par identifiant arXiv : un article cross-listé (cs.AI + cs.LG) 
+n'est émis qu'une fois. Une catégorie arrête sa pagination dès qu'une page ne contient 
+plus que des identifiants déjà vus. Le flux est renvoyé sous forme de liste de 
+dictionnaires formatés pour l'ArxivProcessor.
+
+Le flux Atom est lu par un parseur XML incrémental dédié (crawlers/arxiv_atom.py), plus
+rapide et plus léger que feedparser ; il ajoute le DOI et les affiliations quand arXiv
+les fournit.
 """
 
-import time
-import feedparser
-from typing import List, Dict, Any
+import threading
+from typing import Iterable, Iterator, List, Dict, Any
+
+from crawlers.arxiv_atom import PARSE_CHUNK_SIZE, iter_entries
+from crawlers.checkpoint import Checkpoint
+from crawlers.concurrency import merge_concurrently
+from crawlers.http_client import get_http_client
 
 # ------------------ CONFIG ------------------
 AI_CATEGORIES = [
@@ -38,8 +52,8 @@ BASE_ARXIV_URL = "https://export.arxiv.org/api/query"
 # Limits
 MAX_RESULTS_PER_CATEGORY = 3000  # you can change this whenever
 FETCH_BATCH_SIZE = 100  # how many results to fetch per request
-FETCH_DELAY = 0.5  # seconds between requests
 POST_DELAY = 0.05  # optional small delay per article
+MAX_WORKERS = len(AI_CATEGORIES)  # one thread per category
 
 
 # ------------------ HELPER ------------------
@@ -53,20 +67,25 @@ Logique Technique :
        éviter les erreurs de caractères de contrôle (InvalidURL).
     3. Tri : Force le tri par date de soumission descendante pour obtenir les 
        travaux les plus récents en priorité.
-    4. Parsing : Utilise feedparser pour transformer le XML complexe d'arXiv en 
-       dictionnaires Python simples, en nettoyant au passage les IDs et les titres.
+    4. Parsing : Lit le flux en streaming via le client HTTP partagé (keep-alive, gzip) et
+       donne chaque morceau reçu au parseur incrémental (crawlers/arxiv_atom.py) : chaque
+       entrée est convertie en dictionnaire simple (IDs et titres nettoyés) dès qu'elle est
+       complète, pendant la lecture du corps de la réponse.
 """
 
 def get_arxiv_data(
-    category: str, start_index: int = 0, max_results: int = 100, from_year: int = None
+    category: str, start_index: int = 0, max_results: int = 100, from_year: int = None, since: str = None
 ) -> List[Dict[str, Any]]:
     # Construction de la requête de base (1.)
     query = f"cat:{category}"
     
-    # Si une année est spécifiée, on ajoute un intervalle de date
+    # Si une année (ou une date de reprise) est spécifiée, on ajoute un intervalle de date
     # Format arXiv : [YYYYMMDDHHMM TO YYYYMMDDHHMM]
-    if from_year:
-        query += f" AND submittedDate:[{from_year}01010000 TO 203012312359]"
+    lower = f"{from_year}01010000" if from_year else None
+    if since:
+        lower = max(lower or "", since.replace("-", "") + "0000")
+    if lower:
+        query += f" AND submittedDate:[{lower} TO 203012312359]"
 
     query = query.replace(" ", "%20") #évite les crash (2.)
 
@@ -76,20 +95,37 @@ def get_arxiv_data(
         f"&sortBy=submittedDate&sortOrder=descending" # 3.
     )
     
-    feed = feedparser.parse(url)
-    articles = []
-    for entry in feed.entries: # 4.
-        articles.append(
-            {
-                "id": entry.id.split("/")[-1],
-                "title": entry.title.strip(),
-                "summary": entry.summary.strip(),
-                "published": entry.published,
-                "authors": [author.name for author in entry.authors],
-                "category": category,
-            }
-        )
-    return articles
+    return list(iter_arxiv_data(url, category))
+
+
+def iter_arxiv_data(url: str, category: str = None) -> Iterator[Dict[str, Any]]:
+    """Entrées d'une page de l'API arXiv, parsées au fil de la lecture de la réponse (4.)."""
+    response = get_http_client().get(url, stream=True)
+    with response:
+        response.raise_for_status()
+        yield from iter_entries(response.iter_content(chunk_size=PARSE_CHUNK_SIZE), category)
+
+
+# ------------------ DEDUP ------------------
+class SeenIds:
+    """Ensemble thread-safe des identifiants arXiv déjà émis (partagé entre catégories)."""
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ids = set(ids)
+        self._lock = threading.Lock()
+
+    def filter_new(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Renvoie les articles jamais vus et les marque comme vus."""
+        with self._lock:
+            fresh = []
+            for art in articles:
+                if art["id"] not in self._ids:
+                    self._ids.add(art["id"])
+                    fresh.append(art)
+            return fresh
+
+    def __len__(self):
+        return len(self._ids)
 
 
 # ------------------ FETCHING ------------------
@@ -100,42 +136,112 @@ résultats par requête (batch), elle boucle jusqu'à atteindre le quota demand
     1. Calcule la taille du prochain lot (batch) à récupérer sans dépasser le quota.
     2. Appelle get_arxiv_data pour la récupération technique et l'encodage de l'URL.
     3. Gère l'arrêt prématuré si l'API ne renvoie plus de nouveaux résultats.
-    4. Incrémente l'index de départ (start_index) pour la pagination suivante.
-    5. Respecte un temps de pause (FETCH_DELAY) pour éviter le bannissement par l'API.
+    4. Ne garde que les articles jamais vus (toutes catégories confondues) et arrête
+       la pagination si la page ne contenait que des doublons.
+    5. Incrémente l'index de départ (start_index) pour la pagination suivante et l'enregistre
+       dans le point de reprise avec les ids de la page émise : à la reprise, ils dédoublonnent
+       le recouvrement éventuel avec la page suivante (les processors dédoublonnent le reste).
+       Le point de reprise garde ainsi une taille constante quelle que soit la profondeur du crawl.
+    6. Le temps de pause (HOST_RATE_LIMITS) est appliqué par le client HTTP pour éviter le bannissement par l'API.
 """
-def fetch_category(category: str, max_results: int, from_year: int = None) -> List[Dict[str, Any]]:
-    start_index = 0
-    fetched_articles = []
-
-    while len(fetched_articles) < max_results:
-        remaining = max_results - len(fetched_articles)
-        batch_size = min(FETCH_BATCH_SIZE, remaining) # 1.
+def iter_category(
+    category: str, max_results: int, from_year: int = None, seen: SeenIds = None, since: str = None,
+    checkpoint: Checkpoint = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    seen = seen if seen is not None else SeenIds()
+    position = checkpoint.get(category, {}) if checkpoint else {}
+    if position.get("done"):
+        print(f"{category}: already completed in the resumed run, skipped.")
+        return
+    start_index = position.get("start_index", 0)
+    fetched = position.get("fetched", 0)
+    emitted = position.get("emitted", 0)
+    page_ids = position.get("page_ids", [])
+    if start_index:
+        print(f"{category}: resuming at offset {start_index} ({emitted} articles already emitted).")
+    if checkpoint:
+        checkpoint.update(category, {"start_index": start_index, "fetched": fetched, "emitted": emitted, "page_ids": page_ids})
+
+    while fetched < max_results:
+        batch_size = min(FETCH_BATCH_SIZE, max_results - fetched) # 1.
 
         articles = get_arxiv_data(  # 2.
-        category, start_index=start_index, max_results=batch_size, from_year=from_year
-    )
+            category, start_index=start_index, max_results=batch_size, from_year=from_year, since=since
+        )
         if not articles: # 3.
             break
 
-        fetched_articles.extend(articles)
-        start_index += batch_size # 4.
-        print(f"{len(fetched_articles)} articles collected for {category} so far...")
-        time.sleep(FETCH_DELAY) # 5.
+        fetched += len(articles)
+        fresh = seen.filter_new(articles) # 4.
+        if not fresh:
+            print(f"{category}: page {start_index} only contains known ids, stop paging.")
+            break
 
+        emitted += len(fresh)
+        yield fresh
+        start_index += batch_size # 5.
+        if checkpoint:
+            page_ids = [art["id"] for art in fresh]
+            checkpoint.update(category, {"start_index": start_index, "fetched": fetched, "emitted": emitted, "page_ids": page_ids})
+        print(f"{emitted} new articles collected for {category} so far...") # 6.
+
+    if checkpoint:
+        checkpoint.update(category, {"start_index": start_index, "fetched": fetched, "emitted": emitted, "page_ids": page_ids, "done": True})
     print(
-        f"Finished category {category}: {len(fetched_articles)} articles collected.\n"
+        f"Finished category {category}: {emitted} new articles collected ({fetched} fetched).\n"
     )
+
+
+def fetch_category(category: str, max_results: int, from_year: int = None, seen: SeenIds = None) -> List[Dict[str, Any]]:
+    fetched_articles = []
+    for page in iter_category(category, max_results, from_year=from_year, seen=seen):
+        fetched_articles.extend(page)
     return fetched_articles
 
 
+# ------------------ CONCURRENCE ------------------
+"""
+Crawl concurrent des catégories :
+    1. Chaque catégorie est paginée dans son propre thread (MAX_WORKERS).
+    2. Les pages sont poussées dans une file bornée et fusionnées en un seul flux.
+    3. Le dédoublonnage est partagé (SeenIds) : un article cross-listé n'est émis qu'une fois.
+    4. La politesse envers arXiv est garantie par le seau à jetons commun à tous les threads.
+"""
+def iter_ai_articles(
+    max_results_per_cat: int = MAX_RESULTS_PER_CATEGORY,
+    from_year: int = None,
+    categories: List[str] = None,
+    max_workers: int = MAX_WORKERS,
+    since: str = None,
+    checkpoint: Checkpoint = None,
+) -> Iterator[Dict[str, Any]]:
+    categories = categories or AI_CATEGORIES
+    # Reprise : les ids de la dernière page émise par chaque catégorie restent dédoublonnés
+    seen = SeenIds(
+        art_id
+        for category in categories
+        for art_id in (checkpoint.get(category, {}).get("page_ids", []) if checkpoint else [])
+    )
+
+    def producer(category: str):
+        print(f"=== Crawling category {category} ===")
+        return iter_category(category, max_results_per_cat, from_year=from_year, seen=seen, since=since, checkpoint=checkpoint) # 1.
+
+    # 2. + 3.
+    try:
+        yield from merge_concurrently(
+            [lambda c=category: producer(c) for category in categories],
+            max_workers=max_workers,
+            name="arXiv",
+        )
+    finally:
+        if checkpoint:
+            checkpoint.flush()
+
+
 # ------------------ MAIN ------------------
 def crawl_ai_articles(max_results_per_cat: int = MAX_RESULTS_PER_CATEGORY, from_year: int = None) -> List[Dict[str, Any]]:
-    all_articles = []
-    for category in AI_CATEGORIES:
-        print(f"=== Crawling category {category} ===")
-        
-        articles = fetch_category(category, max_results=max_results_per_cat, from_year=from_year)
-        all_articles.extend(articles)
+    all_articles = list(iter_ai_articles(max_results_per_cat=max_results_per_cat, from_year=from_year))
 
     print(f"\nTotal AI articles collected: {len(all_articles)}")
     return all_articles
@@ -0,0 +1,112 @@
+"""
+Points de reprise des crawls longs (fichier d'état JSON par source).
+
+Un crawl de plusieurs milliers de pages (OpenAlex, arXiv) ou de 1 500 brevets EPO ne
+garde sa position que dans des variables locales : un token expiré ou une API instable
+à mi-parcours obligeait à tout recommencer. Les crawlers enregistrent ici leur curseur,
+offset ou tranche (et les identifiants déjà émis quand le dédoublonnage en dépend), et
+`pipeline.py --resume` repart de la dernière position enregistrée.
+
+Features:
+- Un fichier JSON par source : CHECKPOINT_DIR/<source>.json, écriture atomique (tmp + replace).
+- Écriture toutes les `every` mises à jour (pages / tranches), et systématiquement en fin
+  de crawl ou sur erreur (flush).
+- Signature des paramètres du crawl (requête, années, limite...) : un point de reprise
+  enregistré pour d'autres paramètres est ignoré.
+- Thread-safe : les shards / catégories crawlés en parallèle partagent le même fichier.
+- Chaque position est marquée "done" à la fin de son crawl : le pipeline ne supprime le
+  fichier que si toutes les positions sont terminées (un shard en erreur reste à reprendre).
+
+Limitation : la position est enregistrée quand une page est remise au pipeline ; les
+enregistrements encore dans la file du pipeline au moment d'un crash ne sont pas
+redemandés à la reprise (ils restent disponibles dans le spool s'il a eu le temps de
+les écrire). Les processors dédoublonnent les pages éventuellement relues.
+
+Variables de contrôle :
+- CHECKPOINT_DIR : dossier des fichiers d'état.
+- CHECKPOINT_EVERY : nombre de mises à jour entre deux écritures sur disque.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+# ------------------ CONFIG ------------------
+CHECKPOINT_DIR = Path("checkpoints")
+CHECKPOINT_EVERY = 5
+
+
+class Checkpoint:
+    """
+    État de reprise d'un crawl : dictionnaire clé -> valeur JSON (une clé par shard,
+    catégorie ou requête), persisté périodiquement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        signature: Dict[str, Any] = None,
+        resume: bool = True,
+        directory: Path = CHECKPOINT_DIR,
+        every: int = CHECKPOINT_EVERY,
+    ):
+        self.name = name
+        self.path = Path(directory) / f"{name}.json"
+        self.signature = json.loads(json.dumps(signature or {}, default=str))
+        self.every = max(1, every)
+        self.state: Dict[str, Any] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            try:
+                saved = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Checkpoint {name}: fichier illisible ({e}), reprise ignorée")
+                saved = {}
+            if saved.get("signature") == self.signature:
+                self.state = saved.get("state", {})
+                print(f"Checkpoint {name}: reprise de {len(self.state)} position(s) ({self.path})")
+            elif saved:
+                print(f"Checkpoint {name}: paramètres différents du run précédent, reprise ignorée")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.state.get(key, default)
+
+    def update(self, key: str, value: Any):
+        """Enregistre la position d'une clé ; écrit sur disque toutes les `every` mises à jour."""
+        with self._lock:
+            self.state[key] = value
+            self._pending += 1
+            if self._pending >= self.every:
+                self._write()
+
+    def completed(self) -> bool:
+        """Vrai si toutes les positions enregistrées sont terminées (done)."""
+        with self._lock:
+            return all(value.get("done") for value in self.state.values() if isinstance(value, dict))
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write()
+
+    def clear(self):
+        """Crawl terminé : le point de reprise n'a plus lieu d'être."""
+        with self._lock:
+            self.state = {}
+            self._pending = 0
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"signature": self.signature, "state": self.state}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._pending = 0
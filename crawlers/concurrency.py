@@ -0,0 +1,84 @@
+"""
+Outils de concurrence partagés par les crawlers.
+
+Features:
+- Fusion de plusieurs producteurs (catégories arXiv, shards OpenAlex, requêtes HAL...)
+  exécutés dans un pool de threads borné en un flux unique.
+- File bornée entre producteurs et consommateur : la mémoire reste constante.
+- Arrêt propre si le consommateur s'interrompt avant la fin (break, limite atteinte).
+- Erreur d'un producteur relevée dans le consommateur, une fois les autres terminés : un
+  crawl partiel ne se termine pas comme un crawl complet (marques, checkpoints).
+- Répartition déterministe d'une limite globale entre shards.
+
+Le débit réseau reste piloté par le client HTTP partagé : plusieurs threads vers le même
+hôte se partagent son seau à jetons.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def split_limit(total: int, parts: int) -> List[int]:
+    """Répartition déterministe d'une limite : [3, 3, 2, 2] pour 10 sur 4 shards."""
+    base, remainder = divmod(total, parts)
+    return [base + (1 if i < remainder else 0) for i in range(parts)]
+
+
+def merge_concurrently(
+    producers: Sequence[Callable[[], Iterator[List[T]]]],
+    max_workers: int,
+    queue_size: int = None,
+    name: str = "crawl",
+) -> Iterator[T]:
+    """
+    Exécute chaque producteur (fonction renvoyant un itérateur de pages) dans un thread
+    et renvoie les éléments de toutes les pages au fil de leur arrivée.
+    Une erreur dans un producteur n'interrompt pas les autres ; la première est relevée
+    une fois tous les producteurs terminés.
+    """
+    pages: queue.Queue = queue.Queue(maxsize=queue_size or max_workers * 2)
+    stop = threading.Event()
+    errors: List[Exception] = []
+
+    def worker(index: int, producer: Callable[[], Iterator[List[T]]]):
+        try:
+            if stop.is_set():
+                return
+            for page in producer():
+                if stop.is_set():
+                    break
+                pages.put(page)
+        except Exception as e:
+            print(f"[ERROR] {name} worker {index} failed: {e}")
+            errors.append(e)
+        finally:
+            pages.put(_DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    for index, producer in enumerate(producers):
+        pool.submit(worker, index, producer)
+
+    remaining = len(producers)
+    try:
+        while remaining:
+            page = pages.get()
+            if page is _DONE:
+                remaining -= 1
+                continue
+            yield from page
+    finally:
+        # Arrêt anticipé du consommateur : on libère les threads bloqués sur la file
+        stop.set()
+        while remaining:
+            if pages.get() is _DONE:
+                remaining -= 1
+        pool.shutdown()
+
+    if errors:
+        raise errors[0]
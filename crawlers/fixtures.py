@@ -0,0 +1,105 @@
+"""
+Fixtures HTTP des crawlers : enregistrement de vraies paires requête / réponse et relecture.
+
+En mode enregistrement (`pipeline.py --record-fixtures`), le client HTTP partagé copie
+chaque réponse reçue d'OpenAlex, arXiv, HAL, ScanR, S2, OpenCorporates ou EPO OPS dans
+FIXTURE_DIR. Le serveur local scripts/mock_server.py rejoue ensuite ces fixtures :
+les crawlers y sont redirigés par `--base-url` (cf. CrawlerHttpClient.set_base_url),
+ce qui permet de mesurer leur débit sans réseau, de façon reproductible.
+
+Organisation sur disque :
+    FIXTURE_DIR/<hôte>/<clé>.json.gz
+
+Features:
+- Même clé que le cache HTTP (cf. crawlers/http_cache.py) : SHA-256 de méthode + URL
+  (paramètres inclus) + corps + en-têtes qui changent la réponse (X-OPS-Range).
+- Même format que le cache : une ligne JSON de métadonnées (requête, statut, en-têtes)
+  puis le corps décompressé.
+- Les jetons OAuth (NO_CACHE_PATHS) et les réponses de throttling / erreurs serveur ne
+  sont pas enregistrés : le serveur local les simule.
+
+Variables de contrôle :
+- FIXTURE_DIR : dossier racine des fixtures.
+- SKIPPED_STATUSES : codes HTTP jamais enregistrés.
+- REDIRECT_SCHEME : schéma des URLs d'origine reconstruites par le serveur local.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from crawlers.http_cache import KEPT_HEADERS, NO_CACHE_PATHS, VARY_HEADERS, cache_key
+
+# ------------------ CONFIG ------------------
+FIXTURE_DIR = Path("fixtures") / "http"
+SKIPPED_STATUSES = (403, 429, 500, 502, 503, 504)
+REDIRECT_SCHEME = "https"
+
+
+def fixture_path(directory: Path, method: str, url: str, body: Optional[bytes] = None, headers: Dict[str, str] = None) -> Path:
+    """Fichier de la fixture d'une requête (URL d'origine, paramètres déjà encodés)."""
+    host = urlsplit(url).hostname or "unknown"
+    return Path(directory) / host / f"{cache_key(method, url, body, headers)}.json.gz"
+
+
+def redirect_url(base_url: str, url: str) -> str:
+    """https://api.openalex.org/works?x=1 -> <base_url>/api.openalex.org/works?x=1"""
+    parts = urlsplit(url)
+    target = f"{base_url.rstrip('/')}/{parts.hostname}{parts.path or '/'}"
+    return f"{target}?{parts.query}" if parts.query else target
+
+
+def original_url(path: str) -> str:
+    """Inverse de redirect_url côté serveur : /api.openalex.org/works?x=1 -> https://api.openalex.org/works?x=1"""
+    return f"{REDIRECT_SCHEME}://{path.lstrip('/')}"
+
+
+class FixtureRecorder:
+    """
+    Enregistre les réponses reçues par le client HTTP partagé.
+    Thread-safe : partagé par les threads des crawlers concurrents.
+    """
+
+    def __init__(self, directory: Path = FIXTURE_DIR):
+        self.directory = Path(directory)
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str], response: requests.Response):
+        if any(fragment in url for fragment in NO_CACHE_PATHS) or response.status_code in SKIPPED_STATUSES:
+            return
+        meta = {
+            "method": method.upper(),
+            "url": url,
+            "vary": {k: headers[k] for k in VARY_HEADERS if headers and k in headers},
+            "status": response.status_code,
+            "encoding": response.encoding,
+            "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+            "recorded_at": time.time(),
+        }
+        path = fixture_path(self.directory, method, url, body, headers)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb") as f:
+            f.write(json.dumps(meta).encode() + b"\n")
+            f.write(response.content)
+        os.replace(tmp, path)
+        with self._lock:
+            self.recorded += 1
+
+
+def load_fixture(path: Path) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Renvoie (métadonnées, corps) d'une fixture, ou None si elle n'existe pas."""
+    try:
+        with gzip.open(path, "rb") as f:
+            meta = json.loads(f.readline())
+            return meta, f.read()
+    except (FileNotFoundError, OSError, ValueError):
+        return None
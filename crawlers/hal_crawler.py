@@ -13,45 +13,85 @@ Limitations Techniques :
 
 Variables de contrôle :
 - rows : Nombre de publications demandées par requête (pagination).
-- pause : Temps de latence (secondes) pour respecter la courtoisie envers l'API.
+- pause : Intervalle minimal (secondes) entre deux requêtes, appliqué par le client HTTP partagé ;
+  par défaut, la limite de l'hôte HAL dans HOST_RATE_LIMITS (crawlers/http_client.py).
 - fl (Field List) : Liste des champs extraits (halId, title, date, doi, structures, auteurs, keywords).
+- SORT : Tri sur la clé unique Solr (docid), indispensable à la pagination par cursorMark.
+
+Fonctionnement :
+La pagination utilise le cursorMark de Solr (et non des offsets 'start') : la latence reste 
+constante quelle que soit la profondeur et aucune notice n'est sautée. Les notices sont 
+renvoyées par un générateur (mémoire constante) ; fetch_ai_publications reste disponible 
+pour obtenir une liste.
+Le tri sur docid rend le curseur réutilisable d'un run à l'autre : les nouveaux dépôts ont
+un docid supérieur, reprendre au dernier curseur (last_cursor) ne renvoie que le delta.
+Conséquence : avec une limite (max_results), HAL renvoie les notices de plus petit docid
+(les plus anciens dépôts), et non plus les plus pertinentes comme le tri par défaut (score).
+Un tri "score desc, docid asc", accepté par cursorMark, rendrait le curseur inutilisable
+comme marque : le score d'une notice change d'un run à l'autre.
 """
 
-import requests
-import time
+from typing import Any, Dict, Iterator, List
+from urllib.parse import urlsplit
+
+from crawlers.http_client import get_http_client
+
+FIELDS = "halId_s,title_s,producedDateY_i,doiId_s,docType_s,structId_i,structName_s,structType_s,structCountry_s,authFullName_s,keyword_s,domain_s"
+SORT = "docid asc"
 
 class HALCrawler:
     BASE_URL = "https://api.archives-ouvertes.fr/search/"
 
-    def __init__(self, rows=100, pause=0.2):
+    def __init__(self, rows=100, pause=None):
         self.rows = rows
         self.pause = pause
+        self.http = get_http_client()
+        # Une pause explicite remplace le débit de l'hôte HAL (plus de time.sleep), rafale inchangée
+        if pause:
+            self.http.set_rate_limit(urlsplit(self.BASE_URL).hostname, 1 / pause)
+        # Curseur suivant la dernière page lue (high-water mark pour le run suivant)
+        self.last_cursor = None
 
-    def fetch_ai_publications(self, query: str, start_year: int, max_results: int = 100):
-        """Récupère les publications HAL pour une requête donnée (passée en paramètre dans le pipeline)."""
-        results = []
-        start = 0
-        
-        while len(results) < max_results:
+    def iter_pages(self, query: str, start_year: int, max_results: int = 100, end_year: int = None, cursor: str = "*") -> Iterator[List[Dict[str, Any]]]:
+        """Pages de notices HAL pour une requête, paginées par cursorMark (reprise possible via cursor)."""
+        collected = 0
+        year_range = f"[{start_year} TO {end_year if end_year else '*'}]"
+
+        while collected < max_results:
             params = {
                 "q": query, #passée en argument dans le pipeline
-                "fq": [f"producedDateY_i:[{start_year} TO *]", "doiId_s:[* TO *]"], #passé en argument dans le pipeline
-                "rows": min(self.rows, max_results - len(results)), #passé en argument dans le pipeline
-                "start": start,
+                "fq": [f"producedDateY_i:{year_range}", "doiId_s:[* TO *]"], #passé en argument dans le pipeline
+                "rows": min(self.rows, max_results - collected), #passé en argument dans le pipeline
+                "sort": SORT,
+                "cursorMark": cursor,
                 "wt": "json",
-                "fl": "halId_s,title_s,producedDateY_i,doiId_s,docType_s,structId_i,structName_s,structType_s,structCountry_s,authFullName_s,keyword_s,domain_s"
+                "fl": FIELDS
             }
             
-            response = requests.get(self.BASE_URL, params=params)
+            response = self.http.get(self.BASE_URL, params=params)
             
             #gestion des erreurs
             response.raise_for_status()
-            docs = response.json().get("response", {}).get("docs", [])
+            payload = response.json()
+            docs = payload.get("response", {}).get("docs", [])
             if not docs: break
             
-            results.extend(docs)
-            start += self.rows
-            time.sleep(self.pause)
-            print(f"HAL: {len(results)}/{max_results} collectés pour '{query}'...")
-            
-        return results
\ No newline at end of file
+            collected += len(docs)
+            yield docs
+            print(f"HAL: {collected}/{max_results} collectés pour '{query}' {year_range}...")
+
+            # Solr renvoie le même curseur quand il n'y a plus rien à lire
+            next_cursor = payload.get("nextCursorMark")
+            if next_cursor:
+                self.last_cursor = next_cursor
+            if not next_cursor or next_cursor == cursor: break
+            cursor = next_cursor
+
+    def iter_publications(self, query: str, start_year: int, max_results: int = 100, end_year: int = None, cursor: str = "*") -> Iterator[Dict[str, Any]]:
+        """Générateur de notices HAL (mémoire constante)."""
+        for page in self.iter_pages(query, start_year, max_results, end_year=end_year, cursor=cursor):
+            yield from page
+
+    def fetch_ai_publications(self, query: str, start_year: int, max_results: int = 100):
+        """Récupère les publications HAL pour une requête donnée (passée en paramètre dans le pipeline)."""
+        return list(self.iter_publications(query, start_year, max_results))
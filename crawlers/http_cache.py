@@ -0,0 +1,204 @@
+"""
+Cache disque des réponses HTTP des crawlers (optionnel, désactivé par défaut).
+
+Permet de rejouer un crawl après la correction d'un processor sans retélécharger
+les données depuis OpenAlex, HAL, ScanR, EPO OPS, etc. ni consommer les quotas d'API.
+
+Features:
+- Clé adressée par contenu : SHA-256 de méthode + URL (paramètres inclus) + corps de requête
+  (+ en-têtes qui changent la réponse, ex: X-OPS-Range pour la pagination EPO).
+- Durée de vie (TTL) configurable par source (hôte).
+- Stockage compressé (gzip), un fichier par réponse, réparti en sous-dossiers.
+- Taille totale bornée avec éviction LRU (date de dernier accès = mtime du fichier).
+
+Variables de contrôle :
+- CACHE_DIR : dossier racine du cache.
+- MAX_CACHE_BYTES : taille maximale (octets compressés) avant éviction.
+- SOURCE_TTLS : durée de vie (secondes) par hôte ; 0 désactive le cache pour cet hôte.
+- DEFAULT_TTL : durée de vie pour les hôtes non listés.
+- NO_CACHE_PATHS : fragments d'URL jamais mis en cache (ex: obtention de token OAuth).
+
+Utilisation :
+    get_http_client().enable_cache(ResponseCache())
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# ------------------ CONFIG ------------------
+CACHE_DIR = Path(".cache") / "http"
+MAX_CACHE_BYTES = 2 * 1024 ** 3  # 2 Go compressés
+
+DAY = 24 * 3600
+SOURCE_TTLS: Dict[str, int] = {
+    "api.openalex.org": 7 * DAY,
+    "export.arxiv.org": 1 * DAY,
+    "api.archives-ouvertes.fr": 3 * DAY,
+    "scanr.enseignementsup-recherche.gouv.fr": 7 * DAY,
+    "api.semanticscholar.org": 7 * DAY,
+    "api.opencorporates.com": 30 * DAY,
+    "ops.epo.org": 30 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+
+NO_CACHE_PATHS = ("/auth/accesstoken",)
+
+# En-têtes de requête qui font partie de la clé (pagination par en-tête chez OPS)
+VARY_HEADERS = ("X-OPS-Range",)
+
+# En-têtes conservés avec la réponse (le corps est stocké déjà décompressé)
+KEPT_HEADERS = ("Content-Type", "X-Throttling-Control", "Retry-After")
+
+
+def cache_key(method: str, url: str, body: Optional[bytes] = None, headers: Dict[str, str] = None) -> str:
+    """Empreinte SHA-256 de la requête (URL préparée : paramètres déjà encodés)."""
+    h = hashlib.sha256()
+    h.update(method.upper().encode())
+    h.update(b"\0")
+    h.update(url.encode())
+    h.update(b"\0")
+    if body:
+        h.update(body if isinstance(body, bytes) else str(body).encode())
+    for name in VARY_HEADERS:
+        if headers and name in headers:
+            h.update(f"\0{name}:{headers[name]}".encode())
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache disque LRU à durée de vie par hôte.
+    Thread-safe : partagé par les threads des crawlers concurrents.
+    """
+
+    def __init__(
+        self,
+        directory: Path = CACHE_DIR,
+        max_bytes: int = MAX_CACHE_BYTES,
+        ttls: Dict[str, int] = None,
+        default_ttl: int = DEFAULT_TTL,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttls = {**SOURCE_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self.directory.glob("*/*.gz"))
+
+    # --- OUTILS ---
+
+    def ttl_for(self, url: str) -> int:
+        return self.ttls.get(urlsplit(url).hostname or "", self.default_ttl)
+
+    def is_cacheable(self, method: str, url: str) -> bool:
+        if any(fragment in url for fragment in NO_CACHE_PATHS):
+            return False
+        return method.upper() in ("GET", "POST") and self.ttl_for(url) > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.gz"
+
+    # --- LECTURE / ÉCRITURE ---
+
+    def get(self, method: str, url: str, body: Optional[bytes] = None, headers: Dict[str, str] = None) -> Optional[requests.Response]:
+        """Renvoie la réponse en cache si elle existe et n'a pas expiré, sinon None."""
+        if not self.is_cacheable(method, url):
+            return None
+        path = self._path(cache_key(method, url, body, headers))
+        try:
+            with gzip.open(path, "rb") as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+        except (FileNotFoundError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - meta["stored_at"] > self.ttl_for(url):
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # LRU : un accès rafraîchit la date de dernière utilisation
+        os.utime(path, None)
+        self.hits += 1
+
+        response = requests.Response()
+        response.status_code = meta["status"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.url = meta["url"]
+        response.encoding = meta.get("encoding")
+        response._content = content
+        response.from_cache = True
+        return response
+
+    def put(self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str], response: requests.Response):
+        """Stocke une réponse 200 (corps décompressé + quelques en-têtes utiles)."""
+        if response.status_code != 200 or not self.is_cacheable(method, url):
+            return
+        meta = {
+            "status": response.status_code,
+            "url": url,
+            "encoding": response.encoding,
+            "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+            "stored_at": time.time(),
+        }
+        path = self._path(cache_key(method, url, body, headers))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb") as f:
+            f.write(json.dumps(meta).encode() + b"\n")
+            f.write(response.content)
+
+        with self._lock:
+            if path.exists():
+                self._size -= path.stat().st_size
+            os.replace(tmp, path)
+            self._size += path.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    # --- ÉVICTION ---
+
+    def _remove(self, path: Path):
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % de max_bytes."""
+        target = self.max_bytes * 0.9
+        entries = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*/*.gz")),
+            key=lambda e: e[0],
+        )
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+                self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob("*/*.gz"):
+                path.unlink()
+            self._size = 0
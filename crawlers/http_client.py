@@ -0,0 +1,307 @@
+"""
+Couche de transport HTTP partagée par l'ensemble des crawlers.
+
+Toutes les requêtes des crawlers passent par un unique client, ce qui évite de
+renégocier une connexion TCP+TLS à chaque appel et remplace les time.sleep codés
+en dur par une limitation de débit par hôte.
+
+Features:
+- Session requests unique avec pool de connexions keep-alive par hôte.
+- Compression gzip/deflate acceptée par défaut (Accept-Encoding).
+- Limitation de débit par hôte via un seau à jetons (token bucket) thread-safe.
+- Throttles spécifiques enregistrables par hôte (ex: OPS piloté par ses en-têtes de quotas),
+  utilisés à la place du seau à jetons générique.
+- Cache disque optionnel des réponses (cf. crawlers/http_cache.py) : une réponse servie
+  depuis le cache ne consomme ni jeton ni quota d'API.
+- Télémétrie (cf. crawlers/telemetry.py) : latence, octets, codes HTTP et attentes de
+  throttling de chaque requête.
+- Reprise sur erreur commune à toutes les sources (cf. crawlers/resilience.py) : retries des
+  erreurs transitoires avec backoff + aléa, Retry-After, disjoncteur par hôte et budget de
+  retries par run.
+- Enregistrement optionnel des réponses en fixtures et redirection de toutes les sources
+  vers un serveur local (cf. crawlers/fixtures.py, scripts/mock_server.py). La limitation
+  de débit, le cache et la télémétrie restent rattachés à l'hôte d'origine.
+
+Variables de contrôle :
+- HOST_RATE_LIMITS : (requêtes/seconde, rafale) autorisés pour chaque hôte connu.
+- DEFAULT_RATE_LIMIT : limite appliquée aux hôtes non listés.
+- POOL_CONNECTIONS / POOL_MAXSIZE : nombre d'hôtes gardés en cache et de connexions par hôte.
+- DEFAULT_TIMEOUT : délai max (secondes) d'une requête.
+- BASE_URL_ENV : variable d'environnement redirigeant tous les crawlers (ex: http://127.0.0.1:8765).
+
+Utilisation :
+    from crawlers.http_client import get_http_client
+    response = get_http_client().get(url, params=params)
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawlers.fixtures import redirect_url
+from crawlers.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+from crawlers.telemetry import get_telemetry
+
+# ------------------ CONFIG ------------------
+# (requêtes par seconde, taille de rafale) - calibrés sur les anciennes pauses des crawlers
+HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "export.arxiv.org": (2.0, 1),  # ancien FETCH_DELAY de 0.5 s
+    "api.archives-ouvertes.fr": (5.0, 2),  # ancienne pause HAL de 0.2 s
+    "scanr.enseignementsup-recherche.gouv.fr": (2.0, 1),  # ancienne pause de 0.5 s
+    "api.semanticscholar.org": (1.0, 1),  # quota S2 avec clé : 1 req/s
+    "api.opencorporates.com": (2.0, 2),
+    "ops.epo.org": (1.0, 1),  # OPS est restrictif (remplacé par OpsThrottle dans InpiCrawler)
+    "api.openalex.org": (10.0, 10),  # polite pool OpenAlex : 10 req/s
+}
+DEFAULT_RATE_LIMIT = (5.0, 5)
+
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 8
+DEFAULT_TIMEOUT = 60
+USER_AGENT = "fil-rouge-v2-crawler (mailto:anthonylazkani.22@gmail.com)"
+BASE_URL_ENV = "CRAWLER_BASE_URL"
+
+
+class TokenBucket:
+    """
+    Seau à jetons : autorise `capacity` requêtes en rafale puis `rate` requêtes/seconde.
+    acquire() bloque jusqu'à ce qu'un jeton soit disponible.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Consomme un jeton et renvoie le temps (secondes) passé à attendre."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate: float, capacity: Optional[int] = None):
+        """Modifie le débit à chaud (les jetons déjà accumulés sont conservés)."""
+        with self.lock:
+            self._refill()
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self.tokens = min(self.tokens, capacity)
+
+
+class CrawlerHttpClient:
+    """
+    Client HTTP mutualisé : une session requests, un pool par hôte et un seau
+    à jetons par hôte. Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(self, rate_limits: Dict[str, Tuple[float, int]] = None, timeout: int = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.rate_limits = {**HOST_RATE_LIMITS, **(rate_limits or {})}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._throttles = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.retry_policy = RetryPolicy()
+        self.retry_budget = RetryBudget()
+        self.cache = None
+        self.recorder = None
+        self.base_url = os.environ.get(BASE_URL_ENV) or None
+        self.telemetry = get_telemetry()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": USER_AGENT,
+        })
+
+    # --- LIMITATION DE DÉBIT ---
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Renvoie (ou crée) le seau à jetons associé à un hôte."""
+        with self._lock:
+            if host not in self._buckets:
+                rate, capacity = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)
+                self._buckets[host] = TokenBucket(rate, capacity)
+            return self._buckets[host]
+
+    def set_rate_limit(self, host: str, rate: float, capacity: int = None):
+        """Ajuste la limite d'un hôte (ex: depuis les paramètres d'un crawler) ; sans capacity, la rafale configurée est gardée."""
+        with self._lock:
+            if capacity is None:
+                capacity = self.rate_limits.get(host, DEFAULT_RATE_LIMIT)[1]
+            self.rate_limits[host] = (rate, capacity)
+        self.bucket(host).set_rate(rate, capacity)
+
+    def register_throttle(self, host: str, throttle):
+        """
+        Remplace le seau à jetons d'un hôte par un throttle dédié, qui doit exposer
+        wait(url) avant l'envoi et observe(url, response) après réception.
+        """
+        with self._lock:
+            self._throttles[host] = throttle
+
+    # --- REPRISE SUR ERREUR ---
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Renvoie (ou crée) le disjoncteur associé à un hôte."""
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(host)
+            return self._breakers[host]
+
+    def set_retry_budget(self, total: int):
+        """Nombre total de retries autorisés pour le reste du run (toutes sources)."""
+        self.retry_budget = RetryBudget(total)
+
+    # --- CACHE ---
+
+    def enable_cache(self, cache):
+        """Active un ResponseCache : les requêtes déjà vues sont servies depuis le disque."""
+        self.cache = cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    # --- FIXTURES ---
+
+    def enable_recording(self, recorder):
+        """Active un FixtureRecorder : chaque réponse reçue est copiée en fixture."""
+        self.recorder = recorder
+
+    def set_base_url(self, base_url: Optional[str]):
+        """Redirige toutes les requêtes vers base_url/<hôte>/<chemin> (None : hôtes réels)."""
+        self.base_url = base_url or None
+
+    # --- REQUÊTES ---
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sert la réponse depuis le cache si possible, sinon envoie la requête sur la session
+        partagée en retentant les erreurs transitoires. Renvoie la dernière réponse (éventuellement
+        en erreur) une fois les retries épuisés ; lève CircuitOpenError si l'hôte est coupé."""
+        prepared = None
+        if self.cache is not None or self.recorder is not None:
+            prepared = requests.Request(
+                method, url,
+                params=kwargs.get("params"), data=kwargs.get("data"), json=kwargs.get("json"),
+            ).prepare()
+        if self.cache is not None:
+            cached = self.cache.get(method, prepared.url, prepared.body, kwargs.get("headers"))
+            if cached is not None:
+                self.telemetry.record_request(url, cached.status_code, 0.0, from_cache=True)
+                if self.recorder is not None:
+                    self.recorder.record(method, prepared.url, prepared.body, kwargs.get("headers"), cached)
+                return cached
+
+        host = urlsplit(url).hostname or ""
+        breaker = self.breaker(host)
+        policy = self.retry_policy
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.telemetry.record_circuit_open(url)
+                raise CircuitOpenError(f"{host}: disjoncteur ouvert, requête non envoyée ({url})")
+            response, error = None, None
+            try:
+                response = self._send(method, url, host, **kwargs)
+            except requests.RequestException as e:
+                error = e
+            except BaseException:
+                breaker.record_failure()
+                raise
+            if not policy.is_transient(response, error):
+                if error is not None:
+                    # Non retentée, mais comptée : un essai semi-ouvert qui lève ne doit pas
+                    # laisser le disjoncteur en attente (hôte coupé pour le reste du run)
+                    breaker.record_failure()
+                    raise error
+                breaker.record_success()
+                break
+
+            breaker.record_failure()
+            delay = policy.delay(attempt, response) if attempt < policy.max_retries else None
+            if delay is None or breaker.is_open or not self.retry_budget.spend():
+                if error is not None:
+                    raise error
+                break
+            if response is not None:
+                response.close()  # libère la connexion (réponse en flux non lue)
+            reason = response.status_code if response is not None else type(error).__name__
+            print(f"{host}: {reason}, nouvelle tentative dans {delay:.1f}s ({attempt + 1}/{policy.max_retries})")
+            self.telemetry.record_retry(url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+        if self.cache is not None:
+            self.cache.put(method, prepared.url, prepared.body, kwargs.get("headers"), response)
+        if self.recorder is not None:
+            self.recorder.record(method, prepared.url, prepared.body, kwargs.get("headers"), response)
+        return response
+
+    def _send(self, method: str, url: str, host: str, **kwargs) -> requests.Response:
+        """Une tentative : attend un jeton (ou le throttle dédié) pour l'hôte puis envoie la requête."""
+        throttle = self._throttles.get(host)
+        if throttle is not None:
+            waited = throttle.wait(url)
+        else:
+            waited = self.bucket(host).acquire()
+        self.telemetry.record_throttle_wait(url, waited or 0.0)
+
+        target = redirect_url(self.base_url, url) if self.base_url else url
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, target, **kwargs)
+        except requests.RequestException:
+            self.telemetry.record_request(url, None, time.monotonic() - started)
+            raise
+        # Réponse en flux (stream=True) : le corps n'est pas lu ici, seule la taille annoncée est comptée
+        size = int(response.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(response.content)
+        self.telemetry.record_request(url, response.status_code, time.monotonic() - started, size)
+        if throttle is not None:
+            throttle.observe(url, response)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[CrawlerHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> CrawlerHttpClient:
+    """Renvoie le client partagé par tous les crawlers (créé au premier appel)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CrawlerHttpClient()
+        return _client
@@ -6,8 +6,12 @@ les brevets mondiaux (via le format DOCDB) répondant à des critères spécifiq
 
 Limitations Techniques :
 - Authentification : Nécessite des identifiants OAuth2 (Consumer Key/Secret) valides (clés dans le .env)
-- Throttling : L'API EPO est restrictive, une pause de 1.5s est forcée entre chaque appel
+- Throttling : L'API EPO est restrictive. OPS annonce son état (idle/busy/overloaded) et le
+                quota par service (search, retrieval...) dans l'en-tête X-Throttling-Control :
+                OpsThrottle adapte le débit de chaque service à ces valeurs (vert/jaune/rouge/noir)
+                et suspend le service concerné en cas de rejet 403.
                 on peut aller plus vite en s'authentifiant mais on a que 20minutes
+- Token : renouvelé TOKEN_REFRESH_MARGIN secondes avant son expiration.
 - Format : Les données sont récupérées en XML et nécessitent un parsing
   pour extraire les titres, inventeurs et résumés (Abstracts).
 - Titre: la plupart des brevets n'ont pas de titres.
@@ -18,15 +22,125 @@ Variables de contrôle (reprise dans le pipeline) :
 - from_year : Année de priorité/publication minimale pour le filtrage chronologique.
 
 Fonctionnement :
-Le script récupère un Token OAuth2, effectue une recherche textuelle, puis pour chaque 
-référence trouvée, exécute deux appels supplémentaires pour récupérer les données 
-bibliographiques (Biblio) et le résumé (Abstract).
+Le script récupère un Token OAuth2, effectue une recherche textuelle, puis récupère les 
+données bibliographiques (Biblio) et le résumé (Abstract) de toute la tranche de 100 
+références en une seule requête multi-documents (mode batched, par défaut). L'ancien 
+mode unitaire (deux appels supplémentaires par brevet) reste disponible (batched=False).
 """
 
-import requests
 import base64
+import re
+import threading
 import time
 import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+
+from crawlers.http_client import TokenBucket, get_http_client
+from crawlers.resilience import parse_retry_after
+from crawlers.telemetry import get_telemetry
+
+# ------------------ CONFIG ------------------
+OPS_HOST = "ops.epo.org"
+TOKEN_REFRESH_MARGIN = 120  # secondes avant expiration où l'on renouvelle le token
+MAX_RANGE_RETRIES = 3  # tentatives max sur une même tranche après un rejet
+
+# Quotas par défaut (requêtes/minute) avant la première lecture des en-têtes OPS
+OPS_DEFAULT_QUOTAS = {"search": 30, "retrieval": 200, "inpadoc": 60, "images": 200, "other": 1000}
+COLOR_FACTORS = {"green": 1.0, "yellow": 0.5, "red": 0.2, "black": 0.0}
+SYSTEM_FACTORS = {"idle": 1.0, "busy": 0.8, "overloaded": 0.4}
+SAFETY_FACTOR = 0.9  # on reste légèrement sous le quota annoncé
+BLACK_PAUSE = 60  # secondes de pause quand un service passe au noir
+REJECTION_PAUSE = 60  # pause par défaut après un 403 sans Retry-After
+
+
+class OpsThrottle:
+    """
+    Ordonnanceur adaptatif pour OPS, enregistré auprès du client HTTP partagé.
+
+    Un seau à jetons par service OPS (search, retrieval, ...) dont le débit suit l'en-tête
+    X-Throttling-Control renvoyé à chaque réponse, par ex. :
+        busy (images=green:100, inpadoc=green:45, other=green:1000, retrieval=yellow:200, search=green:30)
+    Débit = quota/minute x facteur couleur x facteur état système x SAFETY_FACTOR.
+    """
+
+    HEADER_RE = re.compile(r"^\s*(\w+)\s*\((.*)\)")
+    SERVICE_RE = re.compile(r"([\w-]+)=(\w+):(\d+)")
+
+    def __init__(self):
+        self.buckets = {
+            service: TokenBucket(quota / 60 * SAFETY_FACTOR, 1)
+            for service, quota in OPS_DEFAULT_QUOTAS.items()
+        }
+        self.paused_until = {service: 0.0 for service in OPS_DEFAULT_QUOTAS}
+        self.system_state = "idle"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def service_for(url: str):
+        """Associe une URL OPS au service qui la comptabilise (None = non throttlé)."""
+        path = urlsplit(url).path
+        if "/auth/" in path:
+            return None
+        if "/search" in path:
+            return "search"
+        if "/published-data/" in path:
+            return "retrieval"
+        if "/family/" in path or "/legal/" in path:
+            return "inpadoc"
+        if "/images/" in path:
+            return "images"
+        return "other"
+
+    def wait(self, url: str) -> float:
+        service = self.service_for(url)
+        if service is None:
+            return 0.0
+        waited = 0.0
+        pause = self.paused_until[service] - time.time()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        return waited + self.buckets[service].acquire()
+
+    def observe(self, url: str, response):
+        if getattr(response, "from_cache", False):
+            return
+        header = response.headers.get("X-Throttling-Control")
+        if header:
+            self.update(header)
+        if response.status_code == 403:
+            self.on_rejection(self.service_for(url), response)
+
+    def update(self, header: str):
+        """Recalcule le débit de chaque service à partir de l'en-tête X-Throttling-Control."""
+        match = self.HEADER_RE.match(header)
+        if not match:
+            return
+        with self._lock:
+            self.system_state = match.group(1).lower()
+            system_factor = SYSTEM_FACTORS.get(self.system_state, 1.0)
+            for service, color, quota in self.SERVICE_RE.findall(match.group(2)):
+                if service not in self.buckets:
+                    continue
+                color = color.lower()
+                factor = COLOR_FACTORS.get(color, 1.0) * system_factor * SAFETY_FACTOR
+                if factor <= 0:
+                    self.paused_until[service] = time.time() + BLACK_PAUSE
+                    print(f"EPO: service '{service}' au noir, pause de {BLACK_PAUSE}s.")
+                    continue
+                self.buckets[service].set_rate(int(quota) / 60 * factor)
+
+    def on_rejection(self, service, response):
+        """403 OPS : suspend le service pendant Retry-After (ou REJECTION_PAUSE)."""
+        reason = response.headers.get("X-Rejection-Reason", "inconnue")
+        pause = parse_retry_after(response.headers.get("Retry-After"))
+        if pause is None:
+            pause = REJECTION_PAUSE
+        services = [service] if service else list(self.paused_until)
+        with self._lock:
+            for name in services:
+                self.paused_until[name] = max(self.paused_until[name], time.time() + pause)
+        print(f"EPO: rejet 403 ({reason}), service '{service}' suspendu {pause:.0f}s.")
 
 
 class InpiCrawler:
@@ -35,19 +149,18 @@ class InpiCrawler:
     Gère l'authentification OAuth2, la recherche CQL et le parsing XML des brevets.
     """
 
-    def __init__(self, client_id: str, client_secret: str, session=None):
+    def __init__(self, client_id: str, client_secret: str):
         self.client_id = client_id
         self.client_secret = client_secret
         self.token = None
         self.token_expiry = 0
-        self.session = session
+        # Fin de la dernière tranche sauvegardée (high-water mark pour le run suivant)
+        self.last_range = None
         self.base_url = "https://ops.epo.org/3.2/rest-services"
-        if self.session:
-            from processors.inpi_processor import InpiProcessor
-            self.processor = InpiProcessor(self.session)
-        else:
-            self.processor = None
-
+        self.http = get_http_client()
+        # Le débit vers OPS est piloté par les en-têtes de quotas plutôt que par un seau fixe
+        self.throttle = OpsThrottle()
+        self.http.register_throttle(OPS_HOST, self.throttle)
 
 
     # --- PARTIE TECHNIQUE ---
@@ -55,10 +168,12 @@ class InpiCrawler:
     """
     Gère le cycle de vie du jeton d'accès. 
     Récupère un nouveau token via Basic Auth ou renvoie le token valide en cache.
+    Le token est renouvelé par anticipation (TOKEN_REFRESH_MARGIN) pour ne jamais
+    partir avec un jeton qui expire en cours de tranche.
     """
-    def _get_token(self):
+    def _get_token(self, force: bool = False):
 
-        if self.token and time.time() < self.token_expiry:
+        if not force and self.token and time.time() < self.token_expiry - TOKEN_REFRESH_MARGIN:
             return self.token
 
         auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
@@ -66,7 +181,7 @@ class InpiCrawler:
             "Authorization": f"Basic {auth}",
             "Content-Type": "application/x-www-form-urlencoded",
         }
-        r = requests.post(
+        r = self.http.post(
             "https://ops.epo.org/3.2/auth/accesstoken",
             headers=headers,
             data={"grant_type": "client_credentials"},
@@ -74,7 +189,7 @@ class InpiCrawler:
         r.raise_for_status()
         payload = r.json()
         self.token = payload["access_token"]
-        self.token_expiry = time.time() + int(payload["expires_in"]) - 30
+        self.token_expiry = time.time() + int(payload["expires_in"])
         return self.token
 
 
@@ -93,95 +208,154 @@ class InpiCrawler:
 
     # --- PARTIE CRAWLER ---
 
-    def fetch_ai_patents(self, query_text: str = "artificial intelligence", max_results: int = 1500, from_year: int = None):
-        results = []
+    def iter_patent_ranges(self, query_text: str = "artificial intelligence", max_results: int = 1500, from_year: int = None, batched: bool = True, start_range: int = 1, checkpoint=None):
+        """
+        Générateur des brevets tranche par tranche, à partir de start_range (reprise après la
+        dernière tranche du run précédent), sans écriture en BDD : le pipeline insère depuis
+        son propre thread.
+        batched=True : les biblio + abstracts d'une tranche entière sont récupérés en une
+        seule requête multi-documents (POST) ; batched=False : ancien mode, deux appels de
+        détail (biblio, abstract) par brevet.
+        checkpoint (crawlers/checkpoint.py) : la position avance une fois la tranche consommée.
+        Une tranche en échec (erreur, tentatives épuisées) enregistre le point de reprise puis
+        lève l'exception : le pipeline ne considère pas le crawl comme complet.
+        """
         cql_query = f'ti="{query_text}"'
         if from_year:
             cql_query += f" and pd>={from_year}"
 
         # On avance par tranches de 100 (limite de l'OEB)
         step = 100
-        for start in range(1, max_results + 1, step):
-            end = min(start + step - 1, max_results)
+        last = start_range + max_results - 1
+        position = checkpoint.get("ranges", {}) if checkpoint else {}
+        if position:
+            start_range, last = position["next_start"], position["last"]
+            print(f"EPO: reprise à la tranche {start_range} (jusqu'à {last}).")
+        for start in range(start_range, last + 1, step):
+            end = min(start + step - 1, last)
             
             print(f"EPO: Requête des brevets {start} à {end}...")
             
             try:
-                headers = self._headers()
-                headers["X-OPS-Range"] = f"{start}-{end}"
-
-                r = requests.get(
-                    f"{self.base_url}/published-data/search",
-                    headers=headers,
-                    params={"q": cql_query}
-                )
-                
-                if r.status_code == 403:
-                    print("EPO: Ban 403 détecté. Pause forcée de 2 minutes...")
-                    time.sleep(120)
-                    continue # On retente la même tranche
-                
-                r.raise_for_status()
-                refs = self._extract_refs(r.text)
+                refs = None
+                for attempt in range(MAX_RANGE_RETRIES):
+                    headers = self._headers()
+                    headers["X-OPS-Range"] = f"{start}-{end}"
+
+                    r = self.http.get(
+                        f"{self.base_url}/published-data/search",
+                        headers=headers,
+                        params={"q": cql_query}
+                    )
+
+                    # 403 : OpsThrottle a déjà suspendu le service, on retente la même tranche
+                    # (chaque nouvelle tentative est prélevée sur le budget de retries du run)
+                    if r.status_code == 403:
+                        if not self.http.retry_budget.spend():
+                            break
+                        get_telemetry().record_retry(self.base_url)
+                        continue
+                    # Token expiré/invalide : on force le renouvellement et on retente
+                    if r.status_code in (400, 401) and "token" in r.text.lower():
+                        if not self.http.retry_budget.spend():
+                            break
+                        get_telemetry().record_retry(self.base_url)
+                        self._get_token(force=True)
+                        continue
+
+                    r.raise_for_status()
+                    refs = self._extract_refs(r.text)
+                    break
+
+                if refs is None:
+                    raise RuntimeError(f"tranche abandonnée après {MAX_RANGE_RETRIES} tentatives")
                 
                 if not refs:
                     print("EPO: Plus de résultats disponibles.")
                     break
 
-                for ref in refs:
-                    docdb_id = ref["docdb_id"]
-                    
-                    # Détails : Biblio
-                    r_bib = requests.get(
-                        f"{self.base_url}/published-data/publication/docdb/{docdb_id}/biblio",
-                        headers=self._headers()
-                    )
-                    if r_bib.status_code == 200:
-                        bib_data = self._parse_biblio(r_bib.text)
-                        
-                        # Détails : Abstract
-                        r_abs = requests.get(
-                            f"{self.base_url}/published-data/publication/docdb/{docdb_id}/abstract",
-                            headers=self._headers()
-                        )
-                        abstract = self._parse_abstract(r_abs.text) if r_abs.status_code == 200 else None
-
-                        patent_item={
-                            "external_id": docdb_id,
-                            "title": bib_data["title"],
-                            "abstract": abstract,
-                            "year": bib_data["year"],
-                            "authors": list(set(bib_data["applicants"] + bib_data["inventors"])),
-                            "applicants": bib_data["applicants"],
-                            "inventors": bib_data["inventors"]
-                        }
-
-                        # --- SAUVEGARDE IMMÉDIATE ---
-                        if self.session and self.processor:
-                            try:
-                                # On utilise le processeur déjà initialisé
-                                self.processor.process_patents([patent_item]) 
-                                self.session.commit() 
-                                print(f"EPO: {docdb_id} INSCRIT EN BDD.")
-                            except Exception as e:
-                                self.session.rollback()
-                                print(f"Erreur BDD pour {docdb_id}: {e}")
-                        
-                        print(f"EPO: {docdb_id} ok.")
-                        # Throttling CRITIQUE : 2 secondes entre CHAQUE appel de détail
-                        time.sleep(2.0) 
-                    
-                # Pause supplémentaire entre deux tranches de 100
-                print("Fin de tranche, pause de 5 secondes...")
-                time.sleep(5.0)
+                if batched:
+                    patent_items = self._fetch_patents_batch(refs)
+                else:
+                    patent_items = [item for item in (self._fetch_patent(ref) for ref in refs) if item]
 
             except Exception as e:
                 print(f"Erreur tranche {start}-{end}: {e}")
-                break
+                if checkpoint:
+                    checkpoint.flush()
+                raise
+
+            print(f"EPO: {len(patent_items)}/{len(refs)} brevets récupérés pour la tranche {start}-{end}.")
+            yield patent_items
+            self.last_range = start + len(refs) - 1
+            if checkpoint:
+                checkpoint.update("ranges", {"next_start": end + 1, "last": last})
 
-        return results
+        if checkpoint:
+            checkpoint.update("ranges", {"next_start": last + 1, "last": last, "done": True})
+            checkpoint.flush()
 
+    """
+    Récupère biblio + abstract de toute une tranche en une requête multi-documents.
+    OPS accepte jusqu'à 100 numéros DOCDB (format CC.NUMERO.KIND) dans le corps d'un POST ;
+    la réponse biblio contient déjà les résumés, parsés en une seule passe.
+    En cas d'échec de la requête groupée, on repasse en mode unitaire pour la tranche.
+    """
+    def _fetch_patents_batch(self, refs):
+        body = "\n".join(self._docdb_number(ref) for ref in refs)
+        headers = self._headers()
+        headers["Content-Type"] = "text/plain"
+
+        r = self.http.post(
+            f"{self.base_url}/published-data/publication/docdb/biblio",
+            headers=headers,
+            data=body,
+        )
+        if r.status_code != 200:
+            print(f"EPO: requête groupée refusée ({r.status_code}), repli en mode unitaire...")
+            return [item for item in (self._fetch_patent(ref) for ref in refs) if item]
+
+        bib_by_id = self._parse_biblio_batch(r.text)
+        items = []
+        for ref in refs:
+            bib_data = bib_by_id.get(ref["docdb_id"])
+            if bib_data:
+                items.append(self._build_patent_item(ref["docdb_id"], bib_data, bib_data["abstract"]))
+        return items
+
+    """
+    Mode unitaire : deux appels de détail (Biblio puis Abstract) pour un brevet.
+    """
+    def _fetch_patent(self, ref):
+        docdb_id = ref["docdb_id"]
+
+        # Détails : Biblio
+        r_bib = self.http.get(
+            f"{self.base_url}/published-data/publication/docdb/{docdb_id}/biblio",
+            headers=self._headers()
+        )
+        if r_bib.status_code != 200:
+            return None
+        bib_data = self._parse_biblio(r_bib.text)
+
+        # Détails : Abstract
+        r_abs = self.http.get(
+            f"{self.base_url}/published-data/publication/docdb/{docdb_id}/abstract",
+            headers=self._headers()
+        )
+        abstract = self._parse_abstract(r_abs.text) if r_abs.status_code == 200 else None
+        return self._build_patent_item(docdb_id, bib_data, abstract)
 
+    def _build_patent_item(self, docdb_id, bib_data, abstract):
+        return {
+            "external_id": docdb_id,
+            "title": bib_data["title"],
+            "abstract": abstract,
+            "year": bib_data["year"],
+            "authors": list(set(bib_data["applicants"] + bib_data["inventors"])),
+            "applicants": bib_data["applicants"],
+            "inventors": bib_data["inventors"]
+        }
 
     # --- HELPERS PARSING ------------------
 
@@ -198,16 +372,45 @@ class InpiCrawler:
             if doc is not None:
                 num = doc.findtext("ex:doc-number", namespaces=ns)
                 country = doc.findtext("ex:country", namespaces=ns)
-                refs.append({"docdb_id": f"{country}{num}", "doc_number": num})
+                kind = doc.findtext("ex:kind", namespaces=ns)
+                refs.append({"docdb_id": f"{country}{num}", "doc_number": num, "country": country, "kind": kind})
         return refs
 
+    """
+    Numéro DOCDB au format attendu par les requêtes multi-documents (CC.NUMERO.KIND).
+    """
+    def _docdb_number(self, ref):
+        parts = [ref["country"], ref["doc_number"]]
+        if ref.get("kind"):
+            parts.append(ref["kind"])
+        return ".".join(parts)
+
     """
     Extrait les métadonnées clés du flux XML bibliographique : 
     Titre (EN), année de publication réelle (YYYY), demandeurs et inventeurs.
     """
     def _parse_biblio(self, xml_text):
+        return self._biblio_from_element(ET.fromstring(xml_text))
+
+    """
+    Parse en une passe la réponse d'une requête multi-documents : un exchange-document
+    par brevet, indexé par docdb_id (pays + numéro), résumé inclus.
+    """
+    def _parse_biblio_batch(self, xml_text):
         ns = {"ex": "http://www.epo.org/exchange"}
         root = ET.fromstring(xml_text)
+        documents = {}
+        for doc in root.iter("{http://www.epo.org/exchange}exchange-document"):
+            if doc.get("status") == "not found":
+                continue
+            data = self._biblio_from_element(doc)
+            p = doc.findall(".//ex:abstract//ex:p", ns)
+            data["abstract"] = " ".join([node.text for node in p if node.text]) if p else None
+            documents[f"{doc.get('country')}{doc.get('doc-number')}"] = data
+        return documents
+
+    def _biblio_from_element(self, root):
+        ns = {"ex": "http://www.epo.org/exchange"}
         data = {"title": "Untitled Patent", "applicants": [], "inventors": [], "year": None}
         
         # Extraction du titre
@@ -219,7 +422,7 @@ class InpiCrawler:
         if pub_date is not None and pub_date.text:
             try:
                 data["year"] = int(pub_date.text[:4]) # On prend les 4 premiers caractères
-            except:
+            except ValueError:
                 pass
 
         for a in root.findall(".//ex:applicant//ex:name", ns):
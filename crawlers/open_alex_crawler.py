@@ -6,19 +6,35 @@ Variables de contrôle (Pilotables via le pipeline) :
 - max_articles : Nombre total d'articles à récupérer sur l'ensemble de la période.
 - from_year : Année de départ pour la collecte.
 - per_page : Taille des lots demandés à l'API (max 100).
+- lean : Mode allégé (select OpenAlex limité aux champs utilisés par les processors,
+         curseur à 200 résultats par page, raw optionnel).
+- include_raw : Conserve le work complet dans 'raw' (requis par AffiliationProcessor).
+- shard_by : Découpage de la période en shards de date de publication ("year" ou "month").
+- max_workers : Nombre de shards crawlés en parallèle (MAX_SHARD_WORKERS).
+- since : Date de publication minimale (YYYY-MM-DD), high-water mark du run précédent.
+- checkpoint : Point de reprise (crawlers/checkpoint.py) : curseur et compteur de chaque shard.
 
 Fonctionnement :
-Le script boucle sur les années demandées, applique un filtre par concept (C41008148) 
+Le script découpe la période demandée en shards (années ou mois de publication), les crawle 
+en parallèle dans un pool borné, applique un filtre par concept (C41008148) 
 et récupère les métadonnées enrichies (DOI, Abstracts, Citations, Keywords, Topics).
+Les résultats des shards sont fusionnés en un flux unique ; max_articles est réparti de 
+façon déterministe entre les shards (les premiers shards reçoivent le reste de la division).
+Les requêtes sont construites avec pyalex mais envoyées via le client HTTP partagé
+(pool keep-alive, limite de débit, cache disque optionnel).
 
 Limitations:
 - présence inégale de DOI
 """
 
 
-from pyalex import Works, config
-from typing import List, Dict, Any
-import time
+import calendar
+from pyalex import Works, config, invert_abstract
+from typing import Callable, Iterator, List, Dict, Any, Tuple
+
+from crawlers.checkpoint import Checkpoint
+from crawlers.concurrency import merge_concurrently, split_limit
+from crawlers.http_client import get_http_client
 
 # ------------------ CONFIG ------------------
 config.email = "anthonylazkani.22@gmail.com"
@@ -28,140 +44,296 @@ AI_CONCEPT_ID = "C41008148" #recherche lié à l'IA
 START_YEAR = 2026
 END_YEAR = 2026
 PER_PAGE = 100
+LEAN_PER_PAGE = 200  # maximum autorisé par OpenAlex
+MAX_SHARD_WORKERS = 4  # shards crawlés simultanément (le polite pool reste borné par le client HTTP)
+
+# Champs réellement utilisés par OpenAlexProcessor (mode lean)
+LEAN_SELECT_FIELDS = [
+    "id",
+    "doi",
+    "title",
+    "type",
+    "publication_year",
+    "publication_date",
+    "language",
+    "is_retracted",
+    "primary_location",
+    "cited_by_count",
+    "keywords",
+    "topics",
+    "authorships",
+    "abstract_inverted_index",
+    "referenced_works",
+    "related_works",
+]
+
+
+# ------------------ PAGINATION ------------------
+
+def iter_openalex_pages(
+    query, per_page: int = PER_PAGE, cursor: str = "*", on_cursor: Callable[[str], None] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Pagine une requête pyalex (Works(), Institutions()...) par curseur en passant par le
+    client HTTP partagé. Renvoie les pages de résultats sous forme de listes de dict.
+    on_cursor reçoit le curseur suivant une fois la page consommée (point de reprise).
+    """
+    http = get_http_client()
+    while cursor:
+        params = {"per-page": per_page, "cursor": cursor}
+        if config.email:
+            params["mailto"] = config.email
+        response = http.get(query.url, params=params)
+        response.raise_for_status()
+        payload = response.json()
+        results = payload.get("results", [])
+        if not results:
+            break
+        yield results
+        cursor = payload.get("meta", {}).get("next_cursor")
+        if on_cursor and cursor:
+            on_cursor(cursor)
+
+
+# ------------------ MAPPING ------------------
+
+def build_work_data(work: Dict[str, Any], include_raw: bool = True) -> Dict[str, Any]:
+    """
+    Transforme un work OpenAlex en dictionnaire pour OpenAlexProcessor.
+    Les champs absents (non sélectionnés en mode lean) valent None / listes vides.
+    """
+    # Extract authors with full details 4.
+    authors = []
+    for idx, auth in enumerate(work.get("authorships") or []):
+        a = auth.get("author") or {}
+        author_affiliations = []
+        for inst in auth.get("institutions", []):
+            author_affiliations.append(
+                {
+                    "id": inst.get("id"),
+                    "display_name": inst.get("display_name"),
+                    "ror": inst.get("ror"),
+                    "country_code": inst.get("country_code"),
+                    "type": inst.get("type"),
+                }
+            )
+
+        roles = []
+        if auth.get("is_corresponding"):
+            roles.append("corresponding_author")
+        if idx == 0:
+            roles.append("first_author")
+        if not roles:
+            roles.append("co_author")
+
+        author_data = {
+            "author_id": a.get("id"),
+            "display_name": a.get("display_name"),
+            "orcid": a.get("orcid"),
+            "raw_author_name": auth.get("raw_author_name"),
+            "roles": roles,
+            "affiliations": author_affiliations,
+            "countries": auth.get("countries", []),
+        }
+        authors.append(author_data)
+
+    # Extract location info
+    loc = work.get("primary_location") or {}
+    source_info = loc.get("source") or {}
+
+    # Build work data structure - 5. + 6.
+    return {
+        "external_id": work.get("id"),
+        "type": work.get("type", "article"),
+        "doi": work.get("doi"),
+        "title": work.get("title"),
+        "abstract": invert_abstract(work.get("abstract_inverted_index")),
+        "year": work.get("publication_year"),
+        "publication_date": work.get("publication_date"),
+        "language": work.get("language"),
+        "is_retracted": work.get("is_retracted", False),
+        "is_open_access": loc.get("is_oa", False),
+        "license": loc.get("license"),
+        "url": loc.get("landing_page_url"),
+        "citation_count": work.get("cited_by_count", 0),
+        "keywords": [
+            kw.get("display_name") for kw in work.get("keywords", [])
+        ]
+        if work.get("keywords")
+        else [],
+        "topics": [t.get("display_name") for t in work.get("topics", [])]
+        if work.get("topics")
+        else [],
+        "authors": authors,
+        "open_access_location": loc.get("landing_page_url"),
+        "source_name": source_info.get("display_name"),
+        "source_issn": source_info.get("issn"),
+        "source_type": source_info.get("type"),
+        "version": loc.get("version"),
+        "is_accepted": loc.get("is_accepted"),
+        "is_published": loc.get("is_published"),
+        "referenced_works": (work.get("referenced_works") or [])[
+            :10
+        ],  # Limit to first 10
+        "related_works": (work.get("related_works") or [])[:5],
+        "raw": work if include_raw else None,
+    }
+
+
+# ------------------ SHARDING ------------------
+
+def publication_date_shards(from_year: int, to_year: int, shard_by: str = "year") -> List[Tuple[str, str]]:
+    """Découpe [from_year, to_year] en intervalles (from_date, to_date) au format YYYY-MM-DD."""
+    shards = []
+    for year in range(from_year, to_year + 1):
+        if shard_by == "month":
+            for month in range(1, 13):
+                last_day = calendar.monthrange(year, month)[1]
+                shards.append((f"{year}-{month:02d}-01", f"{year}-{month:02d}-{last_day:02d}"))
+        else:
+            shards.append((f"{year}-01-01", f"{year}-12-31"))
+    return shards
 
 
 # ------------------ MAIN CRAWLING FUNCTION ------------------
 
 """
 Logique technique :
-    1. Itère sur la plage d'années définie (from_year à to_year).
-    2. Initialise une requête filtrée sur le concept IA (C41008148) avec tri chronologique descendant.
-    3. Utilise un paginateur pour parcourir les résultats par lots (PER_PAGE).
+    1. Découpe la période (from_year à to_year) en shards de date de publication et répartit max_articles.
+    2. Initialise, par shard, une requête filtrée sur le concept IA (C41008148) avec tri chronologique descendant.
+       En mode lean, la réponse est réduite aux champs utiles (select).
+    3. Utilise un paginateur par curseur pour parcourir les résultats par lots (PER_PAGE, 200 en lean).
     4. Extrait et normalise les 'authorships' pour isoler les rôles (first, corresponding) et les affiliations (ROR, pays).
     5. Capture les métadonnées de diffusion : DOI, Open Access, licences et sources (ISSN).
     6. Récupère les relations sémantiques : mots-clés, thématiques (topics) et citations (referenced_works).
+    7. Crawle les shards en parallèle et fusionne leurs pages en un flux unique.
+    La politesse envers l'API est assurée par le client HTTP (pas de pause par work).
 """
 
-def crawl_openalex_ai(max_articles: int = 10, from_year: int = START_YEAR, to_year: int = END_YEAR) -> List[Dict[str, Any]]:
-    """
-    Récupère les publications OpenAlex.
-    """
-    all_works = []
+def iter_shard(
+    from_date: str,
+    to_date: str,
+    max_articles: int,
+    lean: bool = False,
+    include_raw: bool = True,
+    checkpoint: Checkpoint = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Crawle un shard de dates et renvoie les works mappés page par page."""
+    if max_articles <= 0:
+        return
+    key = f"{from_date}:{to_date}"
+    position = checkpoint.get(key, {}) if checkpoint else {}
+    if position.get("done"):
+        print(f"Shard {from_date} -> {to_date}: already completed in the resumed run, skipped.")
+        return
+    collected = position.get("collected", 0)
+    cursor = position.get("cursor", "*")
+    if checkpoint:
+        checkpoint.update(key, {"cursor": cursor, "collected": collected})
+    query = (
+        Works()
+        .filter(
+            concepts={"id": AI_CONCEPT_ID},
+            from_publication_date=from_date,
+            to_publication_date=to_date,
+        ) # 2.
+        .sort(publication_date="desc")
+    )
+    if lean:
+        query = query.select(LEAN_SELECT_FIELDS)
+
+    def save_cursor(next_cursor: str):
+        if checkpoint:
+            checkpoint.update(key, {"cursor": next_cursor, "collected": collected})
+
+    pages = iter_openalex_pages(query, per_page=LEAN_PER_PAGE if lean else PER_PAGE, cursor=cursor, on_cursor=save_cursor)
+    for page in pages if collected < max_articles else (): # 3.
+        batch = []
+        for work in page:
+            if collected >= max_articles:
+                break
+
+            title = work.get("title")
+
+            # Skip deprecated works
+            if title is None or title.lower() == "deprecated":
+                continue
 
-    for year in range(from_year, to_year + 1): # 1.
-        print(f"\n=== Crawling year {year} ===")
+            batch.append(build_work_data(work, include_raw=include_raw))
+            collected += 1
 
-        if len(all_works) >= max_articles:
+        if batch:
+            yield batch
+        if collected >= max_articles:
             break
 
-        query = (
-            Works()
-            .filter(concepts={"id": AI_CONCEPT_ID}, publication_year=year) # 2.
-            .sort(publication_date="desc")
-        )
+    if checkpoint:
+        checkpoint.update(key, {"collected": collected, "done": True})
+    print(f"Shard {from_date} -> {to_date}: {collected} articles.")
 
-        pager = query.paginate(per_page=PER_PAGE) # 3.
 
-        for page in pager:
-            if len(all_works) >= max_articles:
-                break
+def iter_openalex_ai(
+    max_articles: int = 10,
+    from_year: int = START_YEAR,
+    to_year: int = END_YEAR,
+    lean: bool = False,
+    include_raw: bool = None,
+    shard_by: str = "year",
+    max_workers: int = MAX_SHARD_WORKERS,
+    since: str = None,
+    checkpoint: Checkpoint = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flux des publications OpenAlex, shards crawlés en parallèle.
+    include_raw vaut par défaut True en mode normal et False en mode lean.
+    since (YYYY-MM-DD) écarte les shards antérieurs et tronque le premier shard restant.
+    """
+    if include_raw is None:
+        include_raw = not lean
 
-            for work in page:
-                if len(all_works) >= max_articles:
-                    break
-                
-                external_id = work.get("id")
-                title = work.get("title")
-                doi = work.get("doi")
-
-                # Skip deprecated works
-                if title is None or title.lower() == "deprecated":
-                    continue
-
-                # Extract authors with full details 4.
-                authors = []
-                for idx, auth in enumerate(work.get("authorships", [])):
-                    a = auth.get("author", {})
-                    author_affiliations = []
-                    for inst in auth.get("institutions", []):
-                        author_affiliations.append(
-                            {
-                                "id": inst.get("id"),
-                                "display_name": inst.get("display_name"),
-                                "ror": inst.get("ror"),
-                                "country_code": inst.get("country_code"),
-                                "type": inst.get("type"),
-                            }
-                        )
-
-                    roles = []
-                    if auth.get("is_corresponding"):
-                        roles.append("corresponding_author")
-                    if idx == 0:
-                        roles.append("first_author")
-                    if not roles:
-                        roles.append("co_author")
-
-                    author_data = {
-                        "author_id": a.get("id"),
-                        "display_name": a.get("display_name"),
-                        "orcid": a.get("orcid"),
-                        "raw_author_name": auth.get("raw_author_name"),
-                        "roles": roles,
-                        "affiliations": author_affiliations,
-                        "countries": auth.get("countries", []),
-                    }
-                    authors.append(author_data)
-
-                # Extract location info
-                loc = work.get("primary_location") or {}
-                source_info = loc.get("source") or {}
-
-                # Build work data structure - 5. + 6.
-                work_data = {
-                    "external_id": external_id,
-                    "type": work.get("type", "article"),
-                    "doi": work.get("doi"),
-                    "title": title,
-                    "abstract": work.get("abstract"),
-                    "year": work.get("publication_year"),
-                    "publication_date": work.get("publication_date"),
-                    "language": work.get("language"),
-                    "is_retracted": work.get("is_retracted", False),
-                    "is_open_access": loc.get("is_oa", False),
-                    "license": loc.get("license"),
-                    "url": loc.get("landing_page_url"),
-                    "citation_count": work.get("cited_by_count", 0),
-                    "keywords": [
-                        kw.get("display_name") for kw in work.get("keywords", [])
-                    ]
-                    if work.get("keywords")
-                    else [],
-                    "topics": [t.get("display_name") for t in work.get("topics", [])]
-                    if work.get("topics")
-                    else [],
-                    "authors": authors,
-                    "open_access_location": loc.get("landing_page_url"),
-                    "source_name": source_info.get("display_name"),
-                    "source_issn": source_info.get("issn"),
-                    "source_type": source_info.get("type"),
-                    "version": loc.get("version"),
-                    "is_accepted": loc.get("is_accepted"),
-                    "is_published": loc.get("is_published"),
-                    "referenced_works": work.get("referenced_works", [])[
-                        :10
-                    ],  # Limit to first 10
-                    "related_works": work.get("related_works", [])[:5],
-                    "raw": work,
-                }
+    shards = publication_date_shards(from_year, to_year, shard_by) # 1.
+    if since:
+        shards = [(max(from_date, since), to_date) for from_date, to_date in shards if to_date >= since]
+        if not shards:
+            print(f"OpenAlex: nothing to crawl after {since}.")
+            return
+    limits = split_limit(max_articles, len(shards))
+    print(f"\n=== Crawling OpenAlex {from_year}-{to_year} in {len(shards)} shards ({shard_by}) ===")
+
+    producers = [
+        lambda f=from_date, t=to_date, n=limit: iter_shard(f, t, n, lean=lean, include_raw=include_raw, checkpoint=checkpoint)
+        for (from_date, to_date), limit in zip(shards, limits)
+        if limit > 0
+    ]
+    try:
+        yield from merge_concurrently(producers, max_workers=max_workers, name="OpenAlex") # 7.
+    finally:
+        if checkpoint:
+            checkpoint.flush()
 
-                all_works.append(work_data)
 
-                if len(all_works) % 100 == 0:
-                    print(f"Collected {len(all_works)} articles...", end="\r")
+def crawl_openalex_ai(
+    max_articles: int = 10,
+    from_year: int = START_YEAR,
+    to_year: int = END_YEAR,
+    lean: bool = False,
+    include_raw: bool = None,
+    shard_by: str = "year",
+    max_workers: int = MAX_SHARD_WORKERS,
+    since: str = None,
+) -> List[Dict[str, Any]]:
+    """
+    Récupère les publications OpenAlex.
+    """
+    all_works = []
+    for work_data in iter_openalex_ai(
+        max_articles, from_year, to_year,
+        lean=lean, include_raw=include_raw, shard_by=shard_by, max_workers=max_workers, since=since,
+    ):
+        all_works.append(work_data)
 
-                # Optional: small pause to be polite
-                time.sleep(0.01)
+        if len(all_works) % 100 == 0:
+            print(f"Collected {len(all_works)} articles...", end="\r")
 
     print(f"\nDone. Collected {len(all_works)} clean articles.")
     return all_works
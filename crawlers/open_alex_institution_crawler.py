@@ -17,17 +17,20 @@ Limitations:
 Attention, les types sont bien normalisés mais ne correspondent pas forcément au reste (company ou investor)
 """
 
+from typing import Any, Dict, Iterator, List
+
 from pyalex import Institutions, config
-import time
+
+from crawlers.open_alex_crawler import iter_openalex_pages
 
 config.email = "anthonylazkani.22@gmail.com"
 
-def crawl_openalex_institutions(limit: int = 100):
+def iter_openalex_institutions(limit: int = 100) -> Iterator[Dict[str, Any]]:
     """
     Crawl des institutions avec tri par volume de travaux (les plus influentes d'abord).
     limit est piloté depuis le pipeline
     """
-    all_institutions = []
+    collected = 0
     
     # On trie par works_count descendant pour éviter de récupérer des entités vides
     query = (
@@ -35,18 +38,18 @@ def crawl_openalex_institutions(limit: int = 100):
         .sort(works_count="desc")
     )
 
-    # per_page est limité à 200 par l'API
-    pager = query.paginate(per_page=min(limit, 200))
+    # per_page est limité à 200 par l'API (pagination via le client HTTP partagé)
+    pager = iter_openalex_pages(query, per_page=min(limit, 200))
 
     for page in pager:
-        if len(all_institutions) >= limit:
+        if collected >= limit:
             break
             
         for inst in page:
-            if len(all_institutions) >= limit:
+            if collected >= limit:
                 break
             
-            all_institutions.append({
+            yield {
                 "external_id": inst.get("id").replace("https://openalex.org/", ""),
                 "ror": inst.get("ror"),
                 "display_name": inst.get("display_name"),
@@ -57,7 +60,11 @@ def crawl_openalex_institutions(limit: int = 100):
                 "cited_by_count": inst.get("cited_by_count", 0),
                 "acronyms": inst.get("display_name_acronyms", []),
                 "raw": inst
-            })
+            }
+            collected += 1
             
-    print(f"OpenAlex: {len(all_institutions)} institutions collectées.")
-    return all_institutions
\ No newline at end of file
+    print(f"OpenAlex: {collected} institutions collectées.")
+
+
+def crawl_openalex_institutions(limit: int = 100) -> List[Dict[str, Any]]:
+    return list(iter_openalex_institutions(limit=limit))
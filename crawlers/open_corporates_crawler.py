@@ -10,10 +10,10 @@ Variables de contrôle (Pilotables via le pipeline) :
 """
 
 import os
-import time
-import requests
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
+
+from crawlers.http_client import get_http_client
 
 # CONFIG POC
 load_dotenv()
@@ -29,18 +29,20 @@ Fonctionnement
     2. Bride la demande à 100 résultats maximum (limite technique du paramètre per_page).
     3. Récupère le flux JSON et extrait les objets imbriqués dans results -> companies.
     4. Filtre les entrées invalides et construit un dictionnaire normalisé pour le processeur.
-    5. Interrompt l'accumulation dès que le quota 'limit' est atteint.
+    5. Émet les entreprises au fil de l'eau et s'interrompt dès que le quota 'limit' est atteint.
 """
-def crawl_opencorporates_ai(limit: int = MAX_RECORDS, query: str = SEARCH_QUERY) -> List[Dict[str, Any]]:
+def iter_opencorporates_ai(limit: int = MAX_RECORDS, query: str = SEARCH_QUERY) -> Iterator[Dict[str, Any]]:
     api_key = os.getenv("OPENCORPORATES_API_KEY") #1.
     base_url = "https://api.opencorporates.com/v0.4/companies/search"
 
-    all_companies = []
+    http = get_http_client()
+
+    collected = 0
     current_page = 1 
 
     print(f"=== Crawling OpenCorporates POC (Query: {query} | Limit: {limit}) ===")
 
-    while len(all_companies) < limit:
+    while collected < limit:
         params = {
             "q": query, 
             "api_token": api_key, 
@@ -49,39 +51,40 @@ def crawl_opencorporates_ai(limit: int = MAX_RECORDS, query: str = SEARCH_QUERY)
         }
 
         try: 
-            response = requests.get(base_url, params=params)
+            response = http.get(base_url, params=params)
             response.raise_for_status()
             data = response.json()
             results = data.get("results", {}).get("companies", [])
+        except Exception as e:
+            print(f"[ERROR] OpenCorporates crawl failed at page {current_page}: {e}")
+            break
+
+        if not results: 
+            break
 
-            if not results: 
+        for item in results:
+            if collected >= limit:
                 break
+                
+            co = item.get("company")
+            if not co: continue
 
-            for item in results:
-                if len(all_companies) >= limit:
-                    break
-                    
-                co = item.get("company")
-                if not co: continue
-
-                company_data = {
-                    "external_id": co.get("company_number"),
-                    "name": co.get("name"),
-                    "type": co.get("company_type"),
-                    "jurisdiction": co.get("jurisdiction_code"),
-                    "founded_date": co.get("incorporation_date"),
-                    "operating_status": co.get("current_status"),
-                    "raw": co,
-                }
-                all_companies.append(company_data)
-
-            print(f"Page {current_page} récupérée ({len(all_companies)}/{limit})")
-            current_page += 1 # On passe à la page suivante
-            
+            yield {
+                "external_id": co.get("company_number"),
+                "name": co.get("name"),
+                "type": co.get("company_type"),
+                "jurisdiction": co.get("jurisdiction_code"),
+                "founded_date": co.get("incorporation_date"),
+                "operating_status": co.get("current_status"),
+                "raw": co,
+            }
+            collected += 1
 
-        except Exception as e:
-            print(f"[ERROR] OpenCorporates crawl failed at page {current_page}: {e}")
-            break
+        print(f"Page {current_page} récupérée ({collected}/{limit})")
+        current_page += 1 # On passe à la page suivante
 
-    print(f"Done. Collected {len(all_companies)} companies for POC.")
-    return all_companies
+    print(f"Done. Collected {collected} companies for POC.")
+
+
+def crawl_opencorporates_ai(limit: int = MAX_RECORDS, query: str = SEARCH_QUERY) -> List[Dict[str, Any]]:
+    return list(iter_opencorporates_ai(limit=limit, query=query))
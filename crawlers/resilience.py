@@ -0,0 +1,174 @@
+"""
+Politique commune de reprise sur erreur des crawlers : backoff, Retry-After, disjoncteurs
+par hôte et budget de retries par run.
+
+Appliquée par le client HTTP partagé (crawlers/http_client.py) à toutes les sources :
+chaque crawler gérait jusqu'ici ses échecs à sa façon (S2 retentait en boucle, HAL levait
+à la première erreur, ScanR abandonnait au premier code non 200).
+
+Features:
+- Retries des erreurs transitoires (RETRY_STATUSES, coupures réseau, timeouts) avec backoff
+  exponentiel plafonné et aléa complet ("full jitter") pour désynchroniser les threads.
+- Retry-After respecté (secondes ou date HTTP) ; au-delà de MAX_RETRY_AFTER la requête
+  est abandonnée plutôt que de bloquer le crawl pendant des heures.
+- Disjoncteur par hôte : après BREAKER_THRESHOLD échecs consécutifs, les requêtes vers cet
+  hôte échouent immédiatement (CircuitOpenError) pendant BREAKER_COOLDOWN secondes, puis une
+  requête d'essai décide de la fermeture ou d'une nouvelle ouverture.
+- Budget de retries partagé par tout le run (RETRY_BUDGET) : une API durablement dégradée
+  ne peut pas consommer le temps de crawl des autres sources.
+
+Les requêtes des crawlers sont toutes des lectures (GET, ou POST de recherche / lot
+chez S2, ScanR et OPS) : elles peuvent être rejouées sans effet de bord.
+Les rejets 403 d'OPS restent gérés par OpsThrottle et InpiCrawler (crawlers/inpi_crawler.py),
+qui prélèvent leurs nouvelles tentatives sur le même budget.
+
+Variables de contrôle :
+- MAX_RETRIES : nouvelles tentatives max par requête.
+- BACKOFF_BASE / BACKOFF_CEILING : premier délai et délai max (secondes) du backoff.
+- MAX_RETRY_AFTER : Retry-After max (secondes) accepté avant abandon.
+- RETRY_STATUSES : codes HTTP considérés comme transitoires.
+- RETRY_BUDGET : nombre total de retries autorisés sur un run (toutes sources).
+- BREAKER_THRESHOLD / BREAKER_COOLDOWN : échecs consécutifs avant ouverture, durée d'ouverture.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+
+# ------------------ CONFIG ------------------
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CEILING = 60
+MAX_RETRY_AFTER = 300
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+RETRY_BUDGET = 500
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+
+
+class CircuitOpenError(requests.RequestException):
+    """Requête refusée sans appel réseau : le disjoncteur de l'hôte est ouvert."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête Retry-After en secondes (valeur numérique ou date HTTP), None si absent/illisible."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Décide si une réponse / une exception est retentée et après quel délai."""
+
+    def __init__(
+        self,
+        max_retries: int = MAX_RETRIES,
+        base: float = BACKOFF_BASE,
+        ceiling: float = BACKOFF_CEILING,
+        max_retry_after: float = MAX_RETRY_AFTER,
+        statuses=RETRY_STATUSES,
+    ):
+        self.max_retries = max_retries
+        self.base = base
+        self.ceiling = ceiling
+        self.max_retry_after = max_retry_after
+        self.statuses = tuple(statuses)
+
+    def is_transient(self, response: Optional[requests.Response], error: Optional[Exception] = None) -> bool:
+        if error is not None:
+            return isinstance(error, RETRY_EXCEPTIONS)
+        return response is not None and response.status_code in self.statuses
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """
+        Délai avant la tentative attempt + 1 : Retry-After s'il est fourni, sinon backoff
+        exponentiel avec aléa complet. None si le serveur demande d'attendre trop longtemps.
+        """
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.ceiling, self.base * 2 ** attempt))
+
+
+class RetryBudget:
+    """Nombre de retries restant pour tout le run, partagé par les threads des crawlers."""
+
+    def __init__(self, total: int = RETRY_BUDGET):
+        self.total = total
+        self.spent = 0
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def spend(self) -> bool:
+        """Consomme un retry ; False (une alerte au premier refus) si le budget est épuisé."""
+        with self._lock:
+            if self.spent < self.total:
+                self.spent += 1
+                return True
+            if not self._warned:
+                self._warned = True
+                print(f"Budget de retries épuisé ({self.total}) : les erreurs suivantes ne seront plus retentées.")
+            return False
+
+    @property
+    def remaining(self) -> int:
+        with self._lock:
+            return self.total - self.spent
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur d'un hôte : fermé (requêtes normales), ouvert (échec immédiat) ou
+    semi-ouvert (une seule requête d'essai après BREAKER_COOLDOWN).
+    """
+
+    def __init__(self, host: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.opened_at is not None
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"{self.host}: disjoncteur refermé.")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+                print(f"{self.host}: disjoncteur ouvert après {self.failures} échecs consécutifs, pause de {self.cooldown:.0f}s.")
@@ -13,29 +13,151 @@ Limitations Techniques :
 
 Variables de contrôle (Pilotables via le pipeline) :
 - query : Mot-clé de recherche (ex: "intelligence artificielle").
-- max_pages : Limite de profondeur de la collecte (20 résultats par page).
+- max_pages : Limite de profondeur de la collecte (20 résultats par page, mode historique from/size).
+- PAGE_SIZE : Taille des pages en mode search_after (par défaut).
+- SOURCE_FIELDS : Champs du _source réellement utilisés par le crawler et ScanRProcessor.
+- SEARCH_AFTER_SORT : Tri stable (score puis identifiant) requis par search_after ; si l'index
+  le refuse, le crawl repasse en from/size.
 
 Fonctionnement :
 Le script effectue une recherche plein texte, identifie les entreprises et laboratoires, 
 et extrait simultanément les liens vers leurs brevets déposés.
+Par défaut, la pagination utilise search_after (pas de limite des 10 000 hits de from/size), 
+le _source est restreint aux champs utiles (les gros tableaux de publications ne transitent 
+plus) et les organisations sont renvoyées au fil de l'eau (iter_scanr_ai). Une erreur HTTP
+persistante lève une exception : le pipeline ne considère pas le crawl comme complet.
 """
 
 
-import requests
-import time
 import json
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 
-BASE_URL = "https://scanr.enseignementsup-recherche.gouv.fr/api/scanr-organizations/_search"
+import requests
 
+from crawlers.http_client import get_http_client
+
+BASE_URL = "https://scanr.enseignementsup-recherche.gouv.fr/api/scanr-organizations/_search"
 
-def crawl_scanr_ai(query: str = "intelligence artificielle", limit: int = 100) -> List[Dict[str, Any]]:
-    all_results = []
+PAGE_SIZE = 500
+SEARCH_AFTER_SORT = [{"_score": "desc"}, {"id.keyword": "asc"}]
+SOURCE_FIELDS = [
+    "id",
+    "externalIds",
+    "label",
+    "acronym",
+    "is_main_parent",
+    "isFrench",
+    "address",
+    "creationYear",
+    "status",
+    "email",
+    "links",
+    "socialMedias",
+    "rnsr_domains",
+    "categories",
+    "leaders.firstName",
+    "leaders.lastName",
+    "institutions.label",
+    "institutions.structure",
+    "institutions.relationType",
+    "patents.id",
+    "patents.title",
+]
+
+
+def build_org_data(source: Dict[str, Any]) -> Dict[str, Any]:
+    """Transforme le _source d'une organisation ScanR en dictionnaire pour ScanRProcessor."""
+    # 1. Pivot SIREN
+    siren = next((item.get("id") for item in source.get("externalIds", []) if item.get("type") == "siren"), source.get("id"))
+
+    # 2. Récupération des brevets liés
+    extracted_patents = []
+    for p in source.get("patents", []):
+        extracted_patents.append({
+            "external_id": str(p.get("id")), # Identifiant brevet ScanR
+            "title": p.get("title", {}).get("fr") or p.get("title", {}).get("default"),
+            "type": "patent",
+            "source_name": "scanr_link" 
+        })
     
-    size_per_page = 20
-    # On calcule le nombre de pages nécessaires pour atteindre la limite
-    max_pages = (limit // size_per_page) + (1 if limit % size_per_page > 0 else 0)
+    return {
+        "external_id": siren,
+        "name": source.get("label", {}).get("default") or "Sans nom",
+        "type": "company" if source.get("is_main_parent") else "facility",
+        "city": source.get("address", [{}])[0].get("city") if source.get("address") else None,
+        "founded_date": str(source.get("creationYear")) if source.get("creationYear") else None,
+        "operating_status": source.get("status"),
+        "is_ai_related": True,
+        "patents": extracted_patents,
+        "raw": source 
+    }
+
+
+def search(http, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Envoie une recherche ScanR ; lève une exception si la réponse est en erreur."""
+    response = http.post(BASE_URL, json=payload)
+    if response.status_code != 200:
+        print(f"Erreur {response.status_code}: {response.text[:500]}")
+    response.raise_for_status()
+    return json.loads(response.text) #pour éviter les bugs d'encodage
+
+
+def iter_scanr_ai(query: str = "intelligence artificielle", limit: int = 100, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Flux des organisations ScanR paginé par search_after, _source restreint à SOURCE_FIELDS.
+    Si l'index refuse le tri (HTTP 400 dès la première page : champ de tri absent du mapping),
+    le crawl repasse en pagination from/size (iter_scanr_pages), sans tri explicite.
+    Toute autre erreur interrompt le crawl par une exception.
+    """
+    http = get_http_client()
+    payload = {
+        "query": {
+            "query_string": {
+                "query": query,
+                "default_operator": "AND"
+            }
+        },
+        "size": min(page_size, limit),
+        "sort": SEARCH_AFTER_SORT,
+        "_source": SOURCE_FIELDS,
+        "track_total_hits": False,
+    }
+    collected = 0
+
+    print(f"=== Crawling ScanR (search_after) for: {query} ===")
+
+    while collected < limit:
+        payload["size"] = min(page_size, limit - collected)
+        try:
+            data = search(http, payload)
+        except requests.HTTPError as e:
+            if "search_after" in payload or e.response is None or e.response.status_code != 400:
+                raise
+            print(f"ScanR: tri {SEARCH_AFTER_SORT} refusé par l'index, pagination from/size.")
+            yield from iter_scanr_pages(query=query, limit=limit, source_fields=SOURCE_FIELDS)
+            return
+
+        hits = data.get("hits", {}).get("hits", [])
+        if not hits:
+            break
+
+        for hit in hits:
+            yield build_org_data(hit.get("_source", {}))
+            collected += 1
+
+        print(f"Collecté {collected} organisations...", end="\r")
+        # La page suivante commence après la valeur de tri du dernier hit
+        payload["search_after"] = hits[-1].get("sort")
+        if not payload["search_after"]:
+            break
+
+    print(f"\nTerminé. {collected} organisations récupérées.")
 
+
+def iter_scanr_pages(
+    query: str = "intelligence artificielle", limit: int = 100, size_per_page: int = 20, source_fields: List[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Mode historique : pagination from/size (limitée aux 10 000 premiers hits), _source complet par défaut."""
     # Payload standard pour Elasticsearch utilisé par ScanR
     payload = {
         "query": {
@@ -47,71 +169,35 @@ def crawl_scanr_ai(query: str = "intelligence artificielle", limit: int = 100) -
         "size": size_per_page,
         "from": 0 # 'from' au lieu de page
     }
+    if source_fields:
+        payload["_source"] = source_fields
+
+    http = get_http_client()
+    collected = 0
 
     print(f"=== Crawling ScanR for: {query} ===")
 
-    for page in range(max_pages):
-        payload["from"] = page * size_per_page
-        
-        try:
-            response = requests.post(BASE_URL, json=payload)
-            
-            if response.status_code != 200:
-                print(f"Erreur {response.status_code}: {response.text}")
-                break
-                
-
-            raw_text = response.text
-            data = json.loads(raw_text) #pour éviter les bugs d'encodage
-            
-            # Dans Elasticsearch, les résultats sont dans hits -> hits
-            hits = data.get("hits", {}).get("hits", [])
-            
-            if not hits:
-                print("Fin des résultats.")
-                break
-
-            for hit in hits:
-                if len(all_results) >= limit:
-                    break
-
-                source = hit.get("_source", {})
-                
-                # 1. Pivot SIREN
-                siren = next((item.get("id") for item in source.get("externalIds", []) if item.get("type") == "siren"), source.get("id"))
-
-                # 2. Récupération des brevets liés
-                extracted_patents = []
-                for p in source.get("patents", []):
-                    extracted_patents.append({
-                        "external_id": str(p.get("id")), # Identifiant brevet ScanR
-                        "title": p.get("title", {}).get("fr") or p.get("title", {}).get("default"),
-                        "type": "patent",
-                        "source_name": "scanr_link" 
-                    })
-                
-                org_data = {
-                    "external_id": siren,
-                    "name": source.get("label", {}).get("default") or "Sans nom",
-                    "type": "company" if source.get("is_main_parent") else "facility",
-                    "city": source.get("address", [{}])[0].get("city") if source.get("address") else None,
-                    "founded_date": str(source.get("creationYear")) if source.get("creationYear") else None,
-                    "operating_status": source.get("status"),
-                    "is_ai_related": True,
-                    "patents": extracted_patents,
-                    "raw": source 
-                }
-                all_results.append(org_data)
-           
-            if len(all_results) >= limit:
-                break
-
-            print(f"Collecté {len(all_results)} organisations...", end="\r")
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"Request failed: {e}")
+    while collected < limit:
+        payload["from"] = collected
+        payload["size"] = min(size_per_page, limit - collected)
+        data = search(http, payload)
+
+        # Dans Elasticsearch, les résultats sont dans hits -> hits
+        hits = data.get("hits", {}).get("hits", [])
+        if not hits:
+            print("Fin des résultats.")
             break
 
-    print(f"\nTerminé. {len(all_results)} organisations récupérées.")
-    return all_results
\ No newline at end of file
+        for hit in hits:
+            yield build_org_data(hit.get("_source", {}))
+            collected += 1
+
+        print(f"Collecté {collected} organisations...", end="\r")
+
+    print(f"\nTerminé. {collected} organisations récupérées.")
+
+
+def crawl_scanr_ai(query: str = "intelligence artificielle", limit: int = 100, search_after: bool = True) -> List[Dict[str, Any]]:
+    if search_after:
+        return list(iter_scanr_ai(query=query, limit=limit))
+    return list(iter_scanr_pages(query=query, limit=limit))
@@ -1,32 +1,61 @@
 """
 Crawler Semantic Scholar spécialisé dans l'IA.
 Gère les requêtes paginées et le respect des limites de l'API.
+Le débit (1 req/s) est piloté par le client HTTP partagé.
+
+Deux modes :
+- fetch_ai_papers : recherche par pertinence, 100 résultats par page (sans abstract).
+- fetch_ai_papers_bulk : recherche bulk (jeton de continuation, jusqu'à 1000 ids par appel)
+  puis récupération des détails (abstract, auteurs, ids externes) par lots de 500 via
+  l'endpoint POST /paper/batch.
+
+Pas de high-water mark : la recherche par pertinence n'est pas triée par date, la date la
+plus récente des `max_results` premiers résultats ne borne donc pas ceux qui restent à lire.
+
+Les erreurs 429 / 5xx sont retentées par le client HTTP partagé (backoff avec aléa,
+Retry-After, disjoncteur et budget de retries : cf. crawlers/resilience.py). Une erreur
+persistante interrompt le crawl par une exception, pour que le pipeline ne le considère
+pas comme complet.
 """
-import requests
-import time
+from typing import Any, Dict, Iterator
+
+from crawlers.http_client import get_http_client
+
+GRAPH_URL = "https://api.semanticscholar.org/graph/v1"
+DETAIL_BATCH_SIZE = 500  # maximum accepté par /paper/batch
+DETAIL_FIELDS = "paperId,title,abstract,year,authors,venue,externalIds,citationCount,openAccessPdf,fieldsOfStudy"
 
 class SemanticScholarCrawler:
-    BASE_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
+    BASE_URL = f"{GRAPH_URL}/paper/search"
 
     def __init__(self, api_key: str = None, limit: int = 100):
         self.headers = {"x-api-key": api_key} if api_key else {}
         self.limit = limit
+        self.http = get_http_client()
 
-    def fetch_ai_papers(self, query: str, year: int, max_results: int = 100):
-        all_papers = []
+    def _request(self, method: str, url: str, **kwargs):
+        """
+        Envoie une requête S2 avec la clé d'API. Les 429 / 5xx sont retentés par le client
+        partagé ; renvoie la dernière réponse (éventuellement en erreur) une fois les retries épuisés.
+        """
+        return self.http.request(method, url, headers=self.headers, timeout=30, **kwargs)
+
+    def iter_ai_papers(self, query: str, year: int, max_results: int = 100) -> Iterator[Dict[str, Any]]:
+        """Flux des articles de la recherche par pertinence (pages de 100)."""
+        collected = 0
         offset = 0
         # S2 limite souvent à 100 par page pour les recherches textuelles
-        batch_size = 100 
-        
+        batch_size = 100
+
         # On garde une liste de champs stable (sans abstract si la 500 persiste)
         fields = "paperId,title,year,authors,venue,externalIds,citationCount"
 
         print(f"--- Crawling S2: {query} ({year}) ---")
 
-        while len(all_papers) < max_results:
+        while collected < max_results:
             # On ajuste le batch_size pour ne pas dépasser max_results au dernier tour
-            current_limit = min(batch_size, max_results - len(all_papers))
-            
+            current_limit = min(batch_size, max_results - collected)
+
             params = {
                 "query": query,
                 "offset": offset,
@@ -34,39 +63,76 @@ class SemanticScholarCrawler:
                 "year": str(year),
                 "fields": fields
             }
-            
-            try:
-                response = requests.get(self.BASE_URL, params=params, headers=self.headers, timeout=30)
-                
-                # Gestion du Rate Limit (429)
-                if response.status_code == 429:
-                    print("S2 Rate Limit : pause de 5 secondes...")
-                    time.sleep(5)
-                    continue
-
-                # Gestion de l'erreur 500 (Problème serveur S2)
-                if response.status_code == 500:
-                    print("S2 Erreur 500 : tentative sans le champ abstract...")
-                    # On pourrait ici retirer un champ lourd si besoin
-                    break
-
-                response.raise_for_status()
-                data = response.json().get("data", [])
-                
-                if not data:
-                    print("Plus de résultats disponibles sur S2.")
-                    break
-
-                all_papers.extend(data)
-                offset += len(data)
-                
-                print(f"S2 : {len(all_papers)}/{max_results} récupérés (Offset: {offset})")
-
-                # Respect du quota (important même avec une clé)
-                time.sleep(0.5)
-
-            except Exception as e:
-                print(f"Erreur S2 à l'offset {offset}: {e}")
+
+            # Rate Limit (429) et 5xx : retentés avec backoff par le client HTTP partagé
+            response = self._request("GET", self.BASE_URL, params=params)
+            response.raise_for_status()
+            data = response.json().get("data", [])
+
+            if not data:
+                print("Plus de résultats disponibles sur S2.")
+                break
+
+            yield from data
+            collected += len(data)
+            offset += len(data)
+
+            print(f"S2 : {collected}/{max_results} récupérés (Offset: {offset})")
+
+    def fetch_ai_papers(self, query: str, year: int, max_results: int = 100):
+        return list(self.iter_ai_papers(query, year, max_results))
+
+    # --- MODE BULK ---
+
+    def search_bulk_ids(self, query: str, year: int, max_results: int = 1000):
+        """Collecte les paperId via /paper/search/bulk (pagination par jeton de continuation)."""
+        ids = []
+        token = None
+
+        while len(ids) < max_results:
+            params = {"query": query, "year": str(year), "fields": "paperId"}
+            if token:
+                params["token"] = token
+
+            response = self._request("GET", f"{GRAPH_URL}/paper/search/bulk", params=params)
+            response.raise_for_status()
+            payload = response.json()
+
+            data = payload.get("data", [])
+            ids.extend(p["paperId"] for p in data[: max_results - len(ids)] if p.get("paperId"))
+            print(f"S2 bulk : {len(ids)}/{max_results} ids collectés...")
+
+            token = payload.get("token")
+            if not data or not token:
                 break
 
-        return all_papers
\ No newline at end of file
+        return ids
+
+    def iter_paper_details(self, paper_ids: list) -> Iterator[Dict[str, Any]]:
+        """Récupère abstracts, auteurs et ids externes par lots de DETAIL_BATCH_SIZE (POST /paper/batch)."""
+        fetched = 0
+        for i in range(0, len(paper_ids), DETAIL_BATCH_SIZE):
+            chunk = paper_ids[i:i + DETAIL_BATCH_SIZE]
+            response = self._request(
+                "POST", f"{GRAPH_URL}/paper/batch",
+                params={"fields": DETAIL_FIELDS},
+                json={"ids": chunk},
+            )
+            response.raise_for_status()
+            # S2 renvoie null pour les ids inconnus
+            papers = [p for p in response.json() if p]
+            fetched += len(papers)
+            print(f"S2 batch : détails de {fetched}/{len(paper_ids)} articles récupérés")
+            yield from papers
+
+    def fetch_paper_details(self, paper_ids: list):
+        return list(self.iter_paper_details(paper_ids))
+
+    def iter_ai_papers_bulk(self, query: str, year: int, max_results: int = 100) -> Iterator[Dict[str, Any]]:
+        """Mode bulk : ids via la recherche bulk, puis détails complets (avec abstract) par lots."""
+        print(f"--- Crawling S2 (bulk): {query} ({year}) ---")
+        ids = self.search_bulk_ids(query, year, max_results)
+        yield from self.iter_paper_details(ids)
+
+    def fetch_ai_papers_bulk(self, query: str, year: int, max_results: int = 100):
+        return list(self.iter_ai_papers_bulk(query, year, max_results))
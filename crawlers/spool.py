@@ -0,0 +1,112 @@
+"""
+Zone d'atterrissage brute des crawls (spool NDJSON compressé).
+
+Chaque crawl écrit les enregistrements tels que renvoyés par le crawler, avant tout
+traitement, dans des segments append-only. Un crash du processor (ou du pipeline) ne
+fait donc plus perdre ce qui a déjà été téléchargé, et `pipeline.py --from-spool`
+peut rejouer les segments dans les processors sans aucun appel réseau.
+
+Organisation sur disque :
+    SPOOL_DIR/<source>/<run_id>/part-00000.ndjson.gz
+    SPOOL_DIR/<source>/<run_id>/part-00001.ndjson.gz
+    ...
+
+Features:
+- Un enregistrement JSON par ligne, segments gzip.
+- Chaque appel à write() ajoute un membre gzip complet au segment courant : un crash
+  ne peut tronquer que le dernier paquet, les précédents restent lisibles.
+- Rotation de segment tous les SEGMENT_RECORDS enregistrements.
+- Partition par source et par identifiant de run (horodatage du lancement).
+
+Variables de contrôle :
+- SPOOL_DIR : dossier racine du spool.
+- SEGMENT_RECORDS : nombre d'enregistrements max par segment.
+"""
+
+import gzip
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+# ------------------ CONFIG ------------------
+SPOOL_DIR = Path("spool")
+SEGMENT_RECORDS = 10000
+
+
+def new_run_id() -> str:
+    """Identifiant de run triable chronologiquement (ex: 20261018T142501)."""
+    return datetime.now().strftime("%Y%m%dT%H%M%S")
+
+
+class SpoolWriter:
+    """
+    Écrit les enregistrements d'une source pour un run donné.
+    Thread-safe : utilisable depuis le thread du crawler.
+    """
+
+    def __init__(self, source: str, run_id: str = None, directory: Path = SPOOL_DIR, segment_records: int = SEGMENT_RECORDS):
+        self.source = source
+        self.run_id = run_id or new_run_id()
+        self.directory = Path(directory) / source / self.run_id
+        self.segment_records = segment_records
+        self.segment = 0
+        self.segment_count = 0
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def _segment_path(self) -> Path:
+        return self.directory / f"part-{self.segment:05d}.ndjson.gz"
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        """Ajoute un paquet d'enregistrements (un membre gzip par paquet)."""
+        lines = [json.dumps(record, ensure_ascii=False, default=str) for record in records]
+        if not lines:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            while lines:
+                if self.segment_count >= self.segment_records:
+                    self.segment += 1
+                    self.segment_count = 0
+                batch = lines[: self.segment_records - self.segment_count]
+                lines = lines[len(batch):]
+                with open(self._segment_path(), "ab") as f:
+                    with gzip.GzipFile(fileobj=f, mode="wb") as gz:
+                        gz.write(("\n".join(batch) + "\n").encode("utf-8"))
+                self.segment_count += len(batch)
+                self.written += len(batch)
+
+    def close(self):
+        if self.written:
+            print(f"Spool: {self.written} {self.source} records -> {self.directory}")
+
+
+# ------------------ LECTURE ------------------
+
+def list_runs(source: str, directory: Path = SPOOL_DIR) -> List[str]:
+    """Runs disponibles pour une source, du plus ancien au plus récent."""
+    root = Path(directory) / source
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir())
+
+
+def iter_spool(source: str, run_id: str = None, directory: Path = SPOOL_DIR) -> Iterator[Dict[str, Any]]:
+    """
+    Rejoue les enregistrements d'une source (un run précis, ou tous les runs dans l'ordre).
+    Un segment tronqué par un crash est lu jusqu'au dernier enregistrement complet.
+    """
+    runs = [run_id] if run_id else list_runs(source, directory)
+    for run in runs:
+        for segment in sorted((Path(directory) / source / run).glob("part-*.ndjson.gz")):
+            try:
+                with gzip.open(segment, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            print(f"Spool: ligne tronquée ignorée dans {segment}")
+            except (EOFError, gzip.BadGzipFile) as e:
+                print(f"Spool: segment {segment} tronqué ({e}), lecture arrêtée au dernier paquet complet")
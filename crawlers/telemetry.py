@@ -0,0 +1,291 @@
+"""
+Télémétrie des crawlers : débit, latence, volumes, retries et attentes de throttling par source.
+
+Toutes les requêtes passent par le client HTTP partagé (crawlers/http_client.py), qui
+alimente ce registre ; les crawlers y ajoutent leurs retries applicatifs (backoff S2,
+tranches EPO rejouées) et le pipeline le nombre d'enregistrements reçus par source.
+
+Features:
+- Compteurs par source : requêtes, réponses par code HTTP, erreurs réseau, octets reçus,
+  réponses servies par le cache, retries, réponses de throttling (429 / 403 OPS),
+  requêtes refusées par un disjoncteur ouvert,
+  secondes passées à attendre un jeton ou la fin d'une suspension.
+- Latence : histogramme cumulatif (LATENCY_BUCKETS) + échantillon borné pour les
+  percentiles p50 / p90 / p99.
+- Débit : enregistrements / seconde entre la première et la dernière activité de la source.
+- Export : rapport JSON du run et fichier texte au format Prometheus (compatible avec le
+  textfile collector de node_exporter).
+
+Les métriques HTTP sont rattachées à une source par hôte (HOST_SOURCES) : OpenAlex works et
+institutions partagent l'hôte api.openalex.org et donc les mêmes compteurs HTTP.
+
+Utilisation :
+    from crawlers.telemetry import get_telemetry
+    get_telemetry().write_json(Path("reports/run.json"))
+"""
+
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# ------------------ CONFIG ------------------
+HOST_SOURCES: Dict[str, str] = {
+    "api.openalex.org": "openalex",
+    "export.arxiv.org": "arxiv",
+    "api.archives-ouvertes.fr": "hal",
+    "scanr.enseignementsup-recherche.gouv.fr": "scanr",
+    "api.semanticscholar.org": "semantic_scholar",
+    "api.opencorporates.com": "open_corporates",
+    "ops.epo.org": "inpi",
+}
+
+# Bornes (secondes) de l'histogramme de latence
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_LATENCY_SAMPLES = 10000  # échantillon (reservoir sampling) pour les percentiles
+THROTTLE_STATUSES = (403, 429)
+
+
+def source_for(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return HOST_SOURCES.get(host, host or "unknown")
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class SourceStats:
+    """Compteurs d'une source (mis à jour sous le verrou du registre)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.retry_sleep = 0.0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+        self.circuit_open = 0
+        self.items = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.samples: List[float] = []
+        self.first_seen: Optional[float] = None
+        self.last_seen: Optional[float] = None
+
+    def touch(self):
+        now = time.time()
+        if self.first_seen is None:
+            self.first_seen = now
+        self.last_seen = now
+
+    def observe_latency(self, seconds: float):
+        self.latency_sum += seconds
+        self.latency_count += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.latency_buckets[i] += 1
+        if len(self.samples) < MAX_LATENCY_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.latency_count)
+            if slot < MAX_LATENCY_SAMPLES:
+                self.samples[slot] = seconds
+
+    @property
+    def elapsed(self) -> float:
+        if self.first_seen is None:
+            return 0.0
+        return max(self.last_seen - self.first_seen, 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        elapsed = self.elapsed
+        return {
+            "requests": self.requests,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "retry_sleep_seconds": round(self.retry_sleep, 3),
+            "throttled_responses": self.throttled,
+            "throttle_wait_seconds": round(self.throttle_wait, 3),
+            "circuit_open_rejections": self.circuit_open,
+            "items": self.items,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(self.items / elapsed, 3) if elapsed else None,
+            "latency_seconds": {
+                "mean": round(self.latency_sum / self.latency_count, 4) if self.latency_count else None,
+                "p50": percentile(ordered, 0.50),
+                "p90": percentile(ordered, 0.90),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1] if ordered else None,
+            },
+        }
+
+
+class Telemetry:
+    """Registre thread-safe des métriques par source."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.sources: Dict[str, SourceStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, source: str) -> SourceStats:
+        if source not in self.sources:
+            self.sources[source] = SourceStats()
+        return self.sources[source]
+
+    # --- ENREGISTREMENT ---
+
+    def record_request(self, url: str, status: Optional[int], latency: float, size: int = 0, from_cache: bool = False):
+        """Une réponse (ou une erreur réseau si status vaut None)."""
+        with self._lock:
+            stats = self._stats(source_for(url))
+            stats.touch()
+            if from_cache:
+                stats.cache_hits += 1
+                return
+            stats.requests += 1
+            stats.observe_latency(latency)
+            if status is None:
+                stats.errors += 1
+                return
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes += size
+            if status in THROTTLE_STATUSES:
+                stats.throttled += 1
+
+    def record_throttle_wait(self, url: str, seconds: float):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._stats(source_for(url)).throttle_wait += seconds
+
+    def record_retry(self, url: str, sleep: float = 0.0):
+        with self._lock:
+            stats = self._stats(source_for(url))
+            stats.retries += 1
+            stats.retry_sleep += sleep
+
+    def record_circuit_open(self, url: str):
+        with self._lock:
+            self._stats(source_for(url)).circuit_open += 1
+
+    def record_items(self, source: str, count: int):
+        """Enregistrements reçus par le pipeline (source au sens du pipeline : "openalex_inst"...)."""
+        with self._lock:
+            stats = self._stats(source)
+            stats.touch()
+            stats.items += count
+
+    # --- EXPORT ---
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "sources": {name: stats.to_dict() for name, stats in sorted(self.sources.items())},
+            }
+
+    def write_json(self, path: Path, extra: Dict[str, Any] = None):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {**(extra or {}), **self.report()}
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    def prometheus_text(self) -> str:
+        counters = [
+            ("crawler_requests_total", "Requêtes HTTP envoyées", "requests"),
+            ("crawler_errors_total", "Erreurs réseau (sans réponse)", "errors"),
+            ("crawler_response_bytes_total", "Octets reçus (corps décompressé)", "bytes"),
+            ("crawler_cache_hits_total", "Réponses servies par le cache disque", "cache_hits"),
+            ("crawler_retries_total", "Requêtes rejouées par les crawlers", "retries"),
+            ("crawler_retry_sleep_seconds_total", "Secondes de backoff avant un retry", "retry_sleep"),
+            ("crawler_throttled_responses_total", "Réponses 429 / 403 de throttling", "throttled"),
+            ("crawler_throttle_wait_seconds_total", "Secondes d'attente imposées par la limitation de débit", "throttle_wait"),
+            ("crawler_circuit_open_total", "Requêtes refusées par un disjoncteur ouvert", "circuit_open"),
+            ("crawler_items_total", "Enregistrements reçus par le pipeline", "items"),
+        ]
+        lines = []
+        with self._lock:
+            sources = sorted(self.sources.items())
+            for metric, help_text, attr in counters:
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for name, stats in sources:
+                    lines.append(f'{metric}{{source="{name}"}} {getattr(stats, attr)}')
+
+            lines.append("# HELP crawler_responses_total Réponses HTTP par code")
+            lines.append("# TYPE crawler_responses_total counter")
+            for name, stats in sources:
+                for code, n in sorted(stats.statuses.items()):
+                    lines.append(f'crawler_responses_total{{source="{name}",code="{code}"}} {n}')
+
+            lines.append("# HELP crawler_items_per_second Débit moyen d'enregistrements sur le run")
+            lines.append("# TYPE crawler_items_per_second gauge")
+            for name, stats in sources:
+                rate = stats.items / stats.elapsed if stats.elapsed else 0.0
+                lines.append(f'crawler_items_per_second{{source="{name}"}} {rate:.3f}')
+
+            metric = "crawler_request_duration_seconds"
+            lines.append(f"# HELP {metric} Latence des requêtes HTTP")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, stats in sources:
+                if not stats.latency_count:
+                    continue
+                for bound, n in zip(LATENCY_BUCKETS, stats.latency_buckets):
+                    lines.append(f'{metric}_bucket{{source="{name}",le="{bound}"}} {n}')
+                lines.append(f'{metric}_bucket{{source="{name}",le="+Inf"}} {stats.latency_count}')
+                lines.append(f'{metric}_sum{{source="{name}"}} {stats.latency_sum:.6f}')
+                lines.append(f'{metric}_count{{source="{name}"}} {stats.latency_count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.prometheus_text(), encoding="utf-8")
+        tmp.replace(path)
+
+    def summary(self) -> str:
+        """Résumé lisible en fin de run."""
+        rows = []
+        for name, data in self.report()["sources"].items():
+            lat = data["latency_seconds"]
+            p50 = f"{lat['p50']:.2f}s" if lat["p50"] is not None else "-"
+            p99 = f"{lat['p99']:.2f}s" if lat["p99"] is not None else "-"
+            rate = f"{data['items_per_second']:.1f}/s" if data["items_per_second"] else "-"
+            rows.append(
+                f"{name:<18} req={data['requests']:<6} items={data['items']:<7} {rate:<9} "
+                f"p50={p50:<7} p99={p99:<7} retries={data['retries']:<4} "
+                f"throttled={data['throttled_responses']:<4} wait={data['throttle_wait_seconds']:.1f}s "
+                f"MB={data['bytes'] / 1e6:.1f}"
+            )
+        return "\n".join(rows)
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Renvoie le registre partagé par tous les crawlers (créé au premier appel)."""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
@@ -0,0 +1,71 @@
+"""
+Lecture / écriture des high-water marks des crawls (table CrawlState).
+
+Utilisé par scripts/pipeline.py pour ne demander aux sources que le delta depuis le
+dernier run. Une marque n'est enregistrée qu'après l'ingestion complète de la source :
+un run interrompu repart de la marque précédente.
+
+utilisation:
+python -m database.crawl_state_service            (affiche les marques)
+python -m database.crawl_state_service openalex   (supprime les marques d'une source)
+"""
+
+import sys
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from database.initialize import engine
+from models.crawl_state import CrawlState
+
+
+class CrawlStateService:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, source: str, scope: str = "") -> Optional[CrawlState]:
+        return self.session.exec(
+            select(CrawlState).where(CrawlState.source == source, CrawlState.scope == scope)
+        ).first()
+
+    def since(self, source: str, scope: str = "") -> Optional[str]:
+        """Date de publication de la marque au format YYYY-MM-DD (ou None)."""
+        state = self.get(source, scope)
+        if state and state.last_publication_date:
+            return state.last_publication_date.isoformat()
+        return None
+
+    def save(self, source: str, scope: str = "", **marks):
+        """Met à jour les marques fournies (last_publication_date, last_cursor, last_range)."""
+        state = self.get(source, scope) or CrawlState(source=source, scope=scope)
+        for name, value in marks.items():
+            if value is not None:
+                setattr(state, name, value)
+        state.updated_at = datetime.utcnow()
+        self.session.add(state)
+        self.session.commit()
+        return state
+
+    def reset(self, source: str = None) -> int:
+        """Supprime les marques d'une source (ou toutes) : le prochain run repart de zéro."""
+        statement = select(CrawlState)
+        if source:
+            statement = statement.where(CrawlState.source == source)
+        states = self.session.exec(statement).all()
+        for state in states:
+            self.session.delete(state)
+        self.session.commit()
+        return len(states)
+
+
+if __name__ == "__main__":
+    with Session(engine) as session:
+        service = CrawlStateService(session)
+        if len(sys.argv) > 1:
+            for source in sys.argv[1:]:
+                print(f"{source}: {service.reset(source)} marque(s) supprimée(s)")
+        else:
+            for state in session.exec(select(CrawlState)).all():
+                print(f"{state.source} [{state.scope}] date={state.last_publication_date} "
+                      f"cursor={state.last_cursor} range={state.last_range} ({state.updated_at})")
@@ -6,17 +6,22 @@ Features:
 - Définition de l'URL de connexion et de l'engine SQLModel.
 - Création physique du fichier database.db et des tables à partir des modèles.
 - Point d'entrée pour la mise à jour de la structure (schéma) de la BDD.
+- Transactions explicites (BEGIN émis par SQLAlchemy) : pysqlite n'ouvre sa transaction
+  qu'avant un INSERT/UPDATE, si bien qu'un SAVEPOINT émis plus tôt était validé sur disque
+  dès son RELEASE. Les savepoints (session.begin_nested) restent ainsi dans la transaction.
 
 A relancer à chaque modif de la structure de la BDD
 uv run python -m database.initialize
 """
 
+from sqlalchemy import event
 from sqlmodel import create_engine, SQLModel
 from models.source import Source
 from models.research_item import ResearchItem
 from models.author import Author
 from models.affiliation import Affiliation
 from models.entity import Entity
+from models.crawl_state import CrawlState
 
 # Arguments needed in order to create the engine
 FILENAME = "database.db"
@@ -27,6 +32,17 @@ connect_args = {"check_same_thread": False}
 engine = create_engine(SQLITEURL, connect_args=connect_args)
 
 
+@event.listens_for(engine, "connect")
+def disable_pysqlite_transactions(dbapi_connection, connection_record):
+    # pysqlite ne gère plus les transactions : SQLAlchemy émet lui-même le BEGIN
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def begin_sqlite_transaction(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
 # Function in order to initialize the database and the tables
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -21,11 +21,13 @@ from models.research_item import ResearchItem
 from models.author import Author
 from models.affiliation import Affiliation
 from models.entity import Entity
+from models.crawl_state import CrawlState
 
 
 TABLES = {
     "affiliation": Affiliation,
     "author": Author,
+    "crawl_state": CrawlState,
     "entity": Entity,
     "research_item": ResearchItem,
     "source": Source,
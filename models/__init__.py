@@ -3,7 +3,7 @@ Exportation des modèles de données épurés.
 
 Features:
 - Centralise les classes SQLModel pour l'initialisation de la BDD.
-- Expose les entités : Source, ResearchItem, Entity, Author et Affiliation.
+- Expose les entités : Source, ResearchItem, Entity, Author, Affiliation et CrawlState.
 - Facilite les imports circulaires lors des jointures.
 """
 
@@ -11,4 +11,5 @@ from .source import Source
 from .research_item import ResearchItem
 from .entity import Entity
 from .author import Author
-from .affiliation import Affiliation
\ No newline at end of file
+from .affiliation import Affiliation
+from .crawl_state import CrawlState
\ No newline at end of file
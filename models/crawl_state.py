@@ -0,0 +1,30 @@
+"""
+État incrémental des crawls (high-water marks), une ligne par source et par périmètre.
+
+Features:
+- Table compagnon de Source : n'altère pas le schéma existant (create_all suffit).
+- scope : périmètre auquel s'applique la marque (requête, année de départ...) ; une
+  marque enregistrée pour une autre requête n'est jamais réutilisée.
+- Trois types de marques selon la pagination de la source :
+  date de publication la plus récente (OpenAlex, arXiv), curseur (HAL cursorMark),
+  dernière tranche traitée (EPO OPS X-OPS-Range).
+"""
+
+from typing import Optional
+from datetime import date, datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+
+class CrawlState(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("source", "scope"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    source: str = Field(index=True)  # nom utilisé par le pipeline : "openalex", "hal"...
+    scope: str = Field(default="")
+
+    # High-water marks
+    last_publication_date: Optional[date] = None
+    last_cursor: Optional[str] = None
+    last_range: Optional[int] = None
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
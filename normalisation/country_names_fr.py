@@ -0,0 +1,286 @@
+"""
+Table français -> anglais des noms de pays (précalculée).
+
+Générée depuis Babel (noms de territoires de la locale "fr") et pycountry : la construire
+à chaque import de normalisation_country.py chargeait les données de locale Babel à chaque
+exécution. À régénérer après une mise à jour de babel / pycountry :
+    uv run normalisation/country_names_fr.py > /tmp/table.py
+
+Clés en minuscules (nom français Babel), valeurs = nom anglais pycountry.
+"""
+
+import json
+
+FR_TO_EN = {
+    "afghanistan": "Afghanistan",
+    "afrique du sud": "South Africa",
+    "albanie": "Albania",
+    "algérie": "Algeria",
+    "allemagne": "Germany",
+    "andorre": "Andorra",
+    "angola": "Angola",
+    "anguilla": "Anguilla",
+    "antarctique": "Antarctica",
+    "antigua-et-barbuda": "Antigua and Barbuda",
+    "arabie saoudite": "Saudi Arabia",
+    "argentine": "Argentina",
+    "arménie": "Armenia",
+    "aruba": "Aruba",
+    "australie": "Australia",
+    "autriche": "Austria",
+    "azerbaïdjan": "Azerbaijan",
+    "bahamas": "Bahamas",
+    "bahreïn": "Bahrain",
+    "bangladesh": "Bangladesh",
+    "barbade": "Barbados",
+    "belgique": "Belgium",
+    "belize": "Belize",
+    "bermudes": "Bermuda",
+    "bhoutan": "Bhutan",
+    "biélorussie": "Belarus",
+    "bolivie": "Bolivia, Plurinational State of",
+    "bosnie-herzégovine": "Bosnia and Herzegovina",
+    "botswana": "Botswana",
+    "brunei": "Brunei Darussalam",
+    "brésil": "Brazil",
+    "bulgarie": "Bulgaria",
+    "burkina faso": "Burkina Faso",
+    "burundi": "Burundi",
+    "bénin": "Benin",
+    "cambodge": "Cambodia",
+    "cameroun": "Cameroon",
+    "canada": "Canada",
+    "cap-vert": "Cabo Verde",
+    "chili": "Chile",
+    "chine": "China",
+    "chypre": "Cyprus",
+    "colombie": "Colombia",
+    "comores": "Comoros",
+    "congo-brazzaville": "Congo",
+    "congo-kinshasa": "Congo, The Democratic Republic of the",
+    "corée du nord": "Korea, Democratic People's Republic of",
+    "corée du sud": "Korea, Republic of",
+    "costa rica": "Costa Rica",
+    "croatie": "Croatia",
+    "cuba": "Cuba",
+    "curaçao": "Curaçao",
+    "côte d’ivoire": "Côte d'Ivoire",
+    "danemark": "Denmark",
+    "djibouti": "Djibouti",
+    "dominique": "Dominica",
+    "espagne": "Spain",
+    "estonie": "Estonia",
+    "eswatini": "Eswatini",
+    "fidji": "Fiji",
+    "finlande": "Finland",
+    "france": "France",
+    "gabon": "Gabon",
+    "gambie": "Gambia",
+    "ghana": "Ghana",
+    "gibraltar": "Gibraltar",
+    "grenade": "Grenada",
+    "groenland": "Greenland",
+    "grèce": "Greece",
+    "guadeloupe": "Guadeloupe",
+    "guam": "Guam",
+    "guatemala": "Guatemala",
+    "guernesey": "Guernsey",
+    "guinée": "Guinea",
+    "guinée équatoriale": "Equatorial Guinea",
+    "guinée-bissau": "Guinea-Bissau",
+    "guyana": "Guyana",
+    "guyane française": "French Guiana",
+    "géorgie": "Georgia",
+    "géorgie du sud-et-les îles sandwich du sud": "South Georgia and the South Sandwich Islands",
+    "haïti": "Haiti",
+    "honduras": "Honduras",
+    "hongrie": "Hungary",
+    "inde": "India",
+    "indonésie": "Indonesia",
+    "irak": "Iraq",
+    "iran": "Iran, Islamic Republic of",
+    "irlande": "Ireland",
+    "islande": "Iceland",
+    "israël": "Israel",
+    "italie": "Italy",
+    "jamaïque": "Jamaica",
+    "japon": "Japan",
+    "jersey": "Jersey",
+    "jordanie": "Jordan",
+    "kazakhstan": "Kazakhstan",
+    "kenya": "Kenya",
+    "kirghizstan": "Kyrgyzstan",
+    "kiribati": "Kiribati",
+    "koweït": "Kuwait",
+    "la réunion": "Réunion",
+    "laos": "Lao People's Democratic Republic",
+    "lesotho": "Lesotho",
+    "lettonie": "Latvia",
+    "liban": "Lebanon",
+    "liberia": "Liberia",
+    "libye": "Libya",
+    "liechtenstein": "Liechtenstein",
+    "lituanie": "Lithuania",
+    "luxembourg": "Luxembourg",
+    "macédoine du nord": "North Macedonia",
+    "madagascar": "Madagascar",
+    "malaisie": "Malaysia",
+    "malawi": "Malawi",
+    "maldives": "Maldives",
+    "mali": "Mali",
+    "malte": "Malta",
+    "maroc": "Morocco",
+    "martinique": "Martinique",
+    "maurice": "Mauritius",
+    "mauritanie": "Mauritania",
+    "mayotte": "Mayotte",
+    "mexique": "Mexico",
+    "micronésie": "Micronesia, Federated States of",
+    "moldavie": "Moldova, Republic of",
+    "monaco": "Monaco",
+    "mongolie": "Mongolia",
+    "montserrat": "Montserrat",
+    "monténégro": "Montenegro",
+    "mozambique": "Mozambique",
+    "myanmar (birmanie)": "Myanmar",
+    "namibie": "Namibia",
+    "nauru": "Nauru",
+    "nicaragua": "Nicaragua",
+    "niger": "Niger",
+    "nigeria": "Nigeria",
+    "niue": "Niue",
+    "norvège": "Norway",
+    "nouvelle-calédonie": "New Caledonia",
+    "nouvelle-zélande": "New Zealand",
+    "népal": "Nepal",
+    "oman": "Oman",
+    "ouganda": "Uganda",
+    "ouzbékistan": "Uzbekistan",
+    "pakistan": "Pakistan",
+    "palaos": "Palau",
+    "panama": "Panama",
+    "papouasie-nouvelle-guinée": "Papua New Guinea",
+    "paraguay": "Paraguay",
+    "pays-bas": "Netherlands",
+    "pays-bas caribéens": "Bonaire, Sint Eustatius and Saba",
+    "philippines": "Philippines",
+    "pologne": "Poland",
+    "polynésie française": "French Polynesia",
+    "porto rico": "Puerto Rico",
+    "portugal": "Portugal",
+    "pérou": "Peru",
+    "qatar": "Qatar",
+    "r.a.s. chinoise de hong kong": "Hong Kong",
+    "r.a.s. chinoise de macao": "Macao",
+    "roumanie": "Romania",
+    "royaume-uni": "United Kingdom",
+    "russie": "Russian Federation",
+    "rwanda": "Rwanda",
+    "république centrafricaine": "Central African Republic",
+    "république dominicaine": "Dominican Republic",
+    "sahara occidental": "Western Sahara",
+    "saint-barthélemy": "Saint Barthélemy",
+    "saint-christophe-et-niévès": "Saint Kitts and Nevis",
+    "saint-marin": "San Marino",
+    "saint-martin": "Saint Martin (French part)",
+    "saint-martin (partie néerlandaise)": "Sint Maarten (Dutch part)",
+    "saint-pierre-et-miquelon": "Saint Pierre and Miquelon",
+    "saint-vincent-et-les grenadines": "Saint Vincent and the Grenadines",
+    "sainte-hélène": "Saint Helena, Ascension and Tristan da Cunha",
+    "sainte-lucie": "Saint Lucia",
+    "salvador": "El Salvador",
+    "samoa": "Samoa",
+    "samoa américaines": "American Samoa",
+    "sao tomé-et-principe": "Sao Tome and Principe",
+    "serbie": "Serbia",
+    "seychelles": "Seychelles",
+    "sierra leone": "Sierra Leone",
+    "singapour": "Singapore",
+    "slovaquie": "Slovakia",
+    "slovénie": "Slovenia",
+    "somalie": "Somalia",
+    "soudan": "Sudan",
+    "soudan du sud": "South Sudan",
+    "sri lanka": "Sri Lanka",
+    "suisse": "Switzerland",
+    "suriname": "Suriname",
+    "suède": "Sweden",
+    "svalbard et jan mayen": "Svalbard and Jan Mayen",
+    "syrie": "Syrian Arab Republic",
+    "sénégal": "Senegal",
+    "tadjikistan": "Tajikistan",
+    "tanzanie": "Tanzania, United Republic of",
+    "taïwan": "Taiwan, Province of China",
+    "tchad": "Chad",
+    "tchéquie": "Czechia",
+    "terres australes françaises": "French Southern Territories",
+    "territoire britannique de l’océan indien": "British Indian Ocean Territory",
+    "territoires palestiniens": "Palestine, State of",
+    "thaïlande": "Thailand",
+    "timor oriental": "Timor-Leste",
+    "togo": "Togo",
+    "tokelau": "Tokelau",
+    "tonga": "Tonga",
+    "trinité-et-tobago": "Trinidad and Tobago",
+    "tunisie": "Tunisia",
+    "turkménistan": "Turkmenistan",
+    "turquie": "Türkiye",
+    "tuvalu": "Tuvalu",
+    "ukraine": "Ukraine",
+    "uruguay": "Uruguay",
+    "vanuatu": "Vanuatu",
+    "venezuela": "Venezuela, Bolivarian Republic of",
+    "viêt nam": "Viet Nam",
+    "wallis-et-futuna": "Wallis and Futuna",
+    "yémen": "Yemen",
+    "zambie": "Zambia",
+    "zimbabwe": "Zimbabwe",
+    "égypte": "Egypt",
+    "émirats arabes unis": "United Arab Emirates",
+    "équateur": "Ecuador",
+    "érythrée": "Eritrea",
+    "état de la cité du vatican": "Holy See (Vatican City State)",
+    "états-unis": "United States",
+    "éthiopie": "Ethiopia",
+    "île bouvet": "Bouvet Island",
+    "île christmas": "Christmas Island",
+    "île de man": "Isle of Man",
+    "île norfolk": "Norfolk Island",
+    "îles caïmans": "Cayman Islands",
+    "îles cocos": "Cocos (Keeling) Islands",
+    "îles cook": "Cook Islands",
+    "îles féroé": "Faroe Islands",
+    "îles heard-et-macdonald": "Heard Island and McDonald Islands",
+    "îles malouines": "Falkland Islands (Malvinas)",
+    "îles mariannes du nord": "Northern Mariana Islands",
+    "îles marshall": "Marshall Islands",
+    "îles mineures éloignées des états-unis": "United States Minor Outlying Islands",
+    "îles pitcairn": "Pitcairn",
+    "îles salomon": "Solomon Islands",
+    "îles turques-et-caïques": "Turks and Caicos Islands",
+    "îles vierges britanniques": "Virgin Islands, British",
+    "îles vierges des états-unis": "Virgin Islands, U.S.",
+    "îles åland": "Åland Islands",
+}
+
+
+def build_fr_to_en():
+    """Reconstruit la table depuis Babel et pycountry (dépendances chargées à la demande)."""
+    import pycountry
+    from babel import Locale
+
+    locale_fr = Locale("fr")
+    table = {}
+    for country in pycountry.countries:
+        nom_fr = locale_fr.territories.get(country.alpha_2)
+        if nom_fr:
+            table[nom_fr.lower()] = country.name
+    return table
+
+
+if __name__ == "__main__":
+    table = build_fr_to_en()
+    print("FR_TO_EN = {")
+    for nom_fr, name in sorted(table.items()):
+        print(f"    {json.dumps(nom_fr, ensure_ascii=False)}: {json.dumps(name, ensure_ascii=False)},")
+    print("}")
@@ -1,19 +1,18 @@
+import os
 import sqlite3
+import sys
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
 import pycountry
-from babel import Locale
 
-DB_PATH = Path(__file__).parent.parent / "database.db"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- 1. Mapping français → anglais (table Babel précalculée) ---
+from normalisation.country_names_fr import FR_TO_EN
 
-# --- 1. Mapping français → anglais via Babel ---
-FR_TO_EN = {}
-locale_fr = Locale("fr")
-for country in pycountry.countries:
-    nom_fr = locale_fr.territories.get(country.alpha_2)
-    if nom_fr:
-        FR_TO_EN[nom_fr.lower()] = country.name
+DB_PATH = Path(__file__).parent.parent / "database.db"
 
 # --- 2. Cas manuels ---
 MANUAL_MAP = {
@@ -54,6 +53,7 @@ def ascii_safe(name: str) -> str:
     return unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
 
 
+@lru_cache(maxsize=None)
 def normalize_country(raw: str) -> str | None:
     if not raw:
         return None
@@ -4,11 +4,15 @@ Harmonisé avec OrganizationProcessor.
 """
 
 from sqlmodel import Session, select
-from models import ResearchItem, Author, Source
+from models import ResearchItem, Source
+from processors.dedup_index import DedupIndex
+from processors.author_registry import AuthorRegistry
+from processors.bulk_writer import BulkWriter
+from processors.transform import transform_chunk
 from datetime import datetime
 
 class ArxivProcessor:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, bulk: bool = False):
         # Utilisation de la session passée en argument pour la cohérence
         self.session = session 
         
@@ -20,61 +24,77 @@ class ArxivProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
+        self.index = DedupIndex.for_session(session)
+        self.authors = AuthorRegistry.for_session(session)
+        # bulk : lignes écrites par INSERT multi-lignes en fin de paquet (cf. BulkWriter)
+        self.writer = BulkWriter(session) if bulk else None
 
     def get_or_create_author(self, author_name: str):
-        """Récupère l'auteur s'il existe déjà, sinon le crée."""
+        """Déclare l'auteur au registre (créé au commit s'il n'existe pas encore)."""
         # On utilise une clé simple basée sur le nom pour l'external_id
         ext_id = f"arxiv_{author_name.replace(' ', '_').lower()}"
-        author = self.session.exec(select(Author).where(Author.external_id == ext_id)).first()
-        
-        if not author:
-            author = Author(full_name=author_name, external_id=ext_id)
-            self.session.add(author)
-            # On ne commit pas ici, on laisse process_articles le faire
-        return author
+        # On ne commit pas ici, on laisse process_articles le faire
+        self.authors.add(ext_id, full_name=author_name)
 
     def process_articles(self, articles: list) -> int:
         """Traite et insère les articles arXiv."""
-        count = 0
-        for art in articles:
-            # 1. Extraction et conversion de la date (Indispensable pour SQLite)
-            # On cherche dans "published" (nom standard chez arXiv) ou "publication_date"
-            raw_pub_date = art.get("published") or art.get("publication_date")
-            clean_date = None
+        return self.write_articles(transform_chunk(prepare_article, articles))
 
-            if raw_pub_date:
-                try:
-                    # On prend les 10 premiers caractères "YYYY-MM-DD"
-                    clean_date = datetime.strptime(raw_pub_date[:10], "%Y-%m-%d").date()
-                except (ValueError, TypeError):
-                    clean_date = None
-
-            # 2. Évite les doublons
-            existing = self.session.exec(
-                select(ResearchItem).where(ResearchItem.external_id == art["id"])
-            ).first()
-            if existing: 
+    def write_articles(self, prepared: list) -> int:
+        """Insère les articles déjà transformés par prepare_article."""
+        count = 0
+        for art in prepared:
+            # 2. Évite les doublons (index mémoire), y compris par DOI quand arXiv le fournit
+            if self.index.has_item(external_id=art["external_id"], doi=art["doi"]):
                 continue
 
             # 3. Création des auteurs associés
-            for name in art.get("authors", []):
+            for name in art["authors"]:
                 self.get_or_create_author(name)
 
-            # 4. Mapping vers ResearchItem
-            item = ResearchItem(
-                source_id=self.source_id,
-                external_id=art["id"],
-                title=art["title"],
-                abstract=art.get("summary") or art.get("abstract"),
-                year=clean_date.year if clean_date else None,
-                publication_date=clean_date, # OBJET DATE ICI (pas de string !)
-                type="article",
-                is_open_access=True,
-                raw=art 
-            )
-            
-            self.session.add(item)
+            row = {**art["row"], "source_id": self.source_id}
+            if self.writer:
+                self.writer.add(ResearchItem, row)
+            else:
+                self.session.add(ResearchItem(**row))
+            self.index.add_item(art["external_id"], art["doi"])
             count += 1
 
+        if self.writer:
+            count = len(self.writer.flush().get(ResearchItem, {}))
         self.session.commit()
-        return count
\ No newline at end of file
+        return count
+
+
+def prepare_article(art: dict) -> dict:
+    """Transformation pure d'un article arXiv (date, colonnes ResearchItem), sans accès BDD."""
+    # 1. Extraction et conversion de la date (Indispensable pour SQLite)
+    # On cherche dans "published" (nom standard chez arXiv) ou "publication_date"
+    raw_pub_date = art.get("published") or art.get("publication_date")
+    clean_date = None
+
+    if raw_pub_date:
+        try:
+            # On prend les 10 premiers caractères "YYYY-MM-DD"
+            clean_date = datetime.strptime(raw_pub_date[:10], "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            clean_date = None
+
+    # 4. Mapping vers ResearchItem
+    doi = art.get("doi")
+    return {
+        "external_id": art["id"],
+        "doi": doi,
+        "authors": art.get("authors", []),
+        "row": dict(
+            external_id=art["id"],
+            doi=doi,
+            title=art["title"],
+            abstract=art.get("summary") or art.get("abstract"),
+            year=clean_date.year if clean_date else None,
+            publication_date=clean_date, # OBJET DATE ICI (pas de string !)
+            type="article",
+            is_open_access=True,
+            raw=art 
+        ),
+    }
@@ -0,0 +1,144 @@
+"""
+Registre des auteurs partagé par tous les processors d'une session : slug -> Author.id.
+
+Chaque processor avait son get_or_create_author (slugs `arxiv_`, `hal_`, `s2_`, `person_`,
+ids OpenAlex) et vérifiait chaque auteur de chaque enregistrement par un SELECT sur
+Author.external_id : sur un papier OpenAlex à plusieurs centaines d'auteurs, ces lectures
+dominaient l'ingestion. Ici un auteur se déclare en O(1) ; les auteurs inconnus sont mis
+en attente puis résolus ensemble :
+
+    1. INSERT multi-lignes ON CONFLICT DO NOTHING RETURNING (cf. BulkWriter) des auteurs en attente ;
+    2. un SELECT ... IN pour ceux qui existaient déjà en base (les seuls non renvoyés).
+
+Features:
+- Un registre par session SQL (session.info), partagé par toutes les sources du run.
+- Cache borné (MAX_CACHED slugs, éviction LRU) : la mémoire ne dépend pas du nombre
+  d'auteurs en base ; un slug évincé est simplement résolu à nouveau au flush suivant.
+- Écriture différée : les auteurs en attente sont écrits au plus tard juste avant le
+  commit de la session (before_commit), ou dès que FLUSH_THRESHOLD auteurs attendent.
+- Rollback : les auteurs en attente sont oubliés et les ids insérés depuis le dernier
+  commit retirés du cache, comme les objets ORM d'une transaction annulée.
+  Seule la transaction principale compte : SQLAlchemy émet aussi ces événements pour
+  les savepoints (session.begin_nested), qui sont ignorés.
+
+Variables de contrôle :
+- MAX_CACHED : nombre max de slugs gardés en mémoire.
+- FLUSH_THRESHOLD : nombre d'auteurs en attente déclenchant une écriture anticipée.
+
+Utilisation :
+    authors = AuthorRegistry.for_session(session)
+    authors.add("hal_jean_dupont", full_name="Jean Dupont")
+    author_id = authors.get_id("hal_jean_dupont")   # écrit les auteurs en attente si besoin
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from models import Author
+from processors.bulk_writer import BulkWriter
+
+# ------------------ CONFIG ------------------
+MAX_CACHED = 200_000
+FLUSH_THRESHOLD = 5_000
+
+REGISTRY_KEY = "author_registry"
+
+
+class AuthorRegistry:
+    """Résout les external_id d'auteurs en Author.id, avec insertion groupée des nouveaux."""
+
+    def __init__(self, session: Session, max_cached: int = MAX_CACHED, flush_threshold: int = FLUSH_THRESHOLD):
+        self.session = session
+        self.writer = BulkWriter(session)
+        self.max_cached = max_cached
+        self.flush_threshold = flush_threshold
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        # Auteurs déclarés mais pas encore écrits, et slugs insérés depuis le dernier commit
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._inserted = set()
+        self.stats = {"hits": 0, "inserted": 0, "existing": 0}
+        event.listen(session, "before_commit", self._on_before_commit)
+        event.listen(session, "after_commit", self._on_commit)
+        event.listen(session, "after_rollback", self._on_rollback)
+
+    @classmethod
+    def for_session(cls, session: Session) -> "AuthorRegistry":
+        """Renvoie le registre attaché à la session (créé au premier appel)."""
+        registry = session.info.get(REGISTRY_KEY)
+        if registry is None:
+            registry = cls(session)
+            session.info[REGISTRY_KEY] = registry
+        return registry
+
+    # --- DÉCLARATION ---
+
+    def add(self, external_id: str, full_name: str, **fields):
+        """Déclare un auteur (créé au prochain flush s'il n'existe pas). Les autres champs d'Author en option."""
+        if not external_id:
+            return
+        if external_id in self._ids:
+            self._ids.move_to_end(external_id)
+            self.stats["hits"] += 1
+            return
+        if external_id not in self._pending:
+            self._pending[external_id] = {"external_id": external_id, "full_name": full_name, **fields}
+            if len(self._pending) >= self.flush_threshold:
+                self.flush()
+
+    def get_id(self, external_id: str) -> Optional[int]:
+        """Id de l'auteur ; écrit d'abord les auteurs en attente, interroge la base si le slug a été évincé."""
+        if external_id in self._pending:
+            self.flush()
+        author_id = self._ids.get(external_id)
+        if author_id is None and external_id:
+            found = self.writer.lookup(Author, [external_id])
+            if found:
+                self._remember(found)
+                author_id = found[external_id]
+        return author_id
+
+    # --- ÉCRITURE ---
+
+    def flush(self) -> Dict[str, int]:
+        """Insère les auteurs en attente et résout les ids de ceux qui existaient déjà."""
+        if not self._pending:
+            return {}
+        pending, self._pending = self._pending, {}
+        ids = self.writer.write(Author, list(pending.values()))
+        self._inserted.update(ids)
+        self.stats["inserted"] += len(ids)
+
+        # Les lignes ignorées sur conflit sont les auteurs déjà en base
+        existing = self.writer.lookup(Author, (slug for slug in pending if slug not in ids))
+        self.stats["existing"] += len(existing)
+        ids.update(existing)
+        self._remember(ids)
+        return ids
+
+    def _remember(self, ids: Dict[str, int]):
+        self._ids.update(ids)
+        for slug in ids:
+            self._ids.move_to_end(slug)
+        while len(self._ids) > self.max_cached:
+            self._ids.popitem(last=False)
+
+    # --- TRANSACTIONS ---
+
+    def _on_before_commit(self, session):
+        if not session.in_nested_transaction():
+            self.flush()
+
+    def _on_commit(self, session):
+        if not session.in_nested_transaction():
+            self._inserted.clear()
+
+    def _on_rollback(self, session):
+        if session.in_nested_transaction():
+            return
+        self._pending.clear()
+        for slug in self._inserted:
+            self._ids.pop(slug, None)
+        self._inserted.clear()
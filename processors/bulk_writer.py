@@ -0,0 +1,147 @@
+"""
+Écriture groupée des lignes ResearchItem, Author et Entity via SQLAlchemy Core.
+
+Le chemin ORM (session.add objet par objet, puis flush) émet un INSERT par ligne et
+construit un objet suivi par la session pour chacune : quelques centaines de lignes par
+seconde au mieux. Ici les processors mettent en attente des dictionnaires déjà mappés et
+le writer les écrit en INSERT multi-lignes :
+
+    INSERT INTO author (...) VALUES (...), (...), ... ON CONFLICT DO NOTHING RETURNING id, external_id
+
+Features:
+- ON CONFLICT DO NOTHING : une ligne qui viole une contrainte d'unicité (ResearchItem.doi,
+  Author.external_id, Entity.external_id) est ignorée au lieu de faire échouer le paquet,
+  sans SELECT préalable.
+- ON CONFLICT (clé) DO UPDATE : avec `update`, les colonnes listées des lignes existantes
+  sont remplacées par les nouvelles valeurs (clé unique obligatoire : Author, Entity).
+- RETURNING : renvoie {clé métier: id} des lignes écrites, pour lier affiliations et hiérarchies.
+- Valeurs par défaut des modèles (created_at, listes / dicts JSON...) appliquées comme le
+  ferait l'ORM, qui ne passe pas par ce chemin.
+- INSERT de BATCH_SIZE lignes au plus, sous la limite de paramètres du dialecte.
+- Les requêtes passent par la session : même transaction que le reste du paquet,
+  commit / rollback (et donc DedupIndex) inchangés.
+
+Variables de contrôle :
+- BATCH_SIZE : nombre max de lignes par INSERT.
+- MAX_PARAMS : nombre max de clés par SELECT ... IN de lookup() (SQLITE_MAX_VARIABLE_NUMBER).
+
+Utilisation :
+    writer = BulkWriter(session)
+    writer.add(Author, {"external_id": "hal_jean_dupont", "full_name": "Jean Dupont"})
+    writer.add(ResearchItem, row)
+    ids = writer.flush()   # {ResearchItem: {external_id: id}, Author: {...}}
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from pydantic_core import PydanticUndefined
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session
+
+# ------------------ CONFIG ------------------
+BATCH_SIZE = 500
+MAX_PARAMS = 32766
+
+# INSERT ... ON CONFLICT propre à chaque dialecte
+DIALECT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def model_defaults(model) -> Dict[str, Any]:
+    """Valeurs (ou fabriques) par défaut des colonnes du modèle, hors clé primaire."""
+    defaults = {}
+    for name, field in model.model_fields.items():
+        if name == "id":
+            continue
+        if field.default_factory is not None:
+            defaults[name] = field.default_factory
+        elif field.default is not PydanticUndefined:
+            defaults[name] = field.default
+    return defaults
+
+
+class BulkWriter:
+    """Met en attente des lignes par modèle et les écrit en INSERT multi-lignes ON CONFLICT."""
+
+    def __init__(self, session: Session, batch_size: int = BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self._insert = DIALECT_INSERTS[session.get_bind().dialect.name]
+        # Lignes en attente, par modèle, dans l'ordre du premier ajout (ex: auteurs avant items)
+        self.pending: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+        self._defaults: Dict[Any, Dict[str, Any]] = {}
+
+    # --- MISE EN ATTENTE ---
+
+    def add(self, model, row: Dict[str, Any]):
+        self.pending.setdefault(model, []).append(row)
+
+    def flush(self, update: Optional[Dict[Any, Sequence[str]]] = None) -> Dict[Any, Dict[str, int]]:
+        """
+        Écrit les lignes en attente (modèle par modèle) et renvoie {modèle: {external_id: id}}.
+        `update` : colonnes à mettre à jour en cas de conflit, par modèle (DO NOTHING sinon).
+        """
+        written = {}
+        update = update or {}
+        while self.pending:
+            model, rows = self.pending.popitem(last=False)
+            written[model] = self.write(model, rows, update=update.get(model, ()))
+        return written
+
+    # --- ÉCRITURE ---
+
+    def write(self, model, rows: List[Dict[str, Any]], key: str = "external_id", update: Sequence[str] = ()) -> Dict[str, int]:
+        """
+        INSERT multi-lignes de `rows` dans la table du modèle ; renvoie {row[key]: id} des lignes
+        insérées (et des lignes mises à jour avec `update`). Les lignes ignorées sur conflit
+        n'apparaissent pas dans le résultat : lookup() retrouve leur id si besoin.
+        """
+        if not rows:
+            return {}
+        table = model.__table__
+        stmt = self._insert(table)
+        if update:
+            stmt = stmt.on_conflict_do_update(index_elements=[key], set_={name: stmt.excluded[name] for name in update})
+        else:
+            stmt = stmt.on_conflict_do_nothing()
+        stmt = stmt.returning(table.c.id, table.c[key]).execution_options(insertmanyvalues_page_size=self.batch_size)
+
+        # Liste de paramètres + RETURNING : SQLAlchemy rend des INSERT multi-lignes de
+        # batch_size lignes (sous la limite de paramètres du dialecte) à partir d'une requête
+        # compilée une seule fois et mise en cache, au lieu de recompiler un VALUES géant par paquet.
+        result = self.session.execute(stmt, self._complete(model, rows))
+        return {row_key: row_id for row_id, row_key in result}
+
+    def lookup(self, model, keys: Iterable[str], key: str = "external_id") -> Dict[str, int]:
+        """Ids des lignes existantes pour ces clés, par SELECT ... IN groupés."""
+        keys = [k for k in dict.fromkeys(keys) if k]
+        column = model.__table__.c[key]
+        ids = {}
+        for start in range(0, len(keys), MAX_PARAMS):
+            stmt = select(model.__table__.c.id, column).where(column.in_(keys[start:start + MAX_PARAMS]))
+            for row_id, row_key in self.session.execute(stmt):
+                ids[row_key] = row_id
+        return ids
+
+    def _complete(self, model, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Applique les valeurs par défaut du modèle : un INSERT multi-lignes exige les mêmes
+        colonnes pour chaque ligne, et Core n'appelle pas les default_factory de SQLModel.
+        """
+        defaults = self._defaults.get(model)
+        if defaults is None:
+            defaults = self._defaults[model] = model_defaults(model)
+        columns = set(defaults).union(*rows)
+        completed = []
+        for row in rows:
+            full = {}
+            for name in columns:
+                if name in row:
+                    full[name] = row[name]
+                else:
+                    default = defaults.get(name)
+                    full[name] = default() if callable(default) else default
+            completed.append(full)
+        return completed
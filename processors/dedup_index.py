@@ -0,0 +1,97 @@
+"""
+Index mémoire des clés déjà présentes en base, partagé par les processors d'une session.
+
+Les processors vérifiaient chaque enregistrement par un ou deux
+`SELECT ResearchItem WHERE external_id / doi = ?` : pour 100 000 works, des centaines de
+milliers de requêtes ponctuelles. L'index charge les clés existantes en une lecture
+groupée au premier usage, puis reste à jour au fil des insertions.
+Les auteurs sont gérés par le registre borné processors/author_registry.py.
+
+Features:
+- Un index par session SQL (session.info) : toutes les sources d'un run le partagent,
+  le dédoublonnage inter-sources par DOI est donc conservé.
+- Chargement paresseux : les clés des ResearchItem (external_id, doi) ne sont lues qu'à
+  la première vérification.
+- Les clés ajoutées depuis le dernier commit restent "en attente" : elles sont confirmées
+  au commit et oubliées en cas de rollback (un paquet annulé pourra être réinséré).
+  Les savepoints (session.begin_nested) n'y touchent pas : seule la transaction principale compte.
+
+Utilisation :
+    index = DedupIndex.for_session(session)
+    if index.has_item(external_id=ext_id, doi=doi): continue
+    session.add(item); index.add_item(ext_id, doi)
+"""
+
+from typing import Optional, Set
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from models import ResearchItem
+
+INDEX_KEY = "dedup_index"
+
+
+class DedupIndex:
+    """Ensembles des external_id et DOI de ResearchItem connus."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._external_ids: Optional[Set[str]] = None
+        self._dois: Optional[Set[str]] = None
+        # Clés ajoutées depuis le dernier commit (retirées si la transaction est annulée)
+        self._pending = {"external_ids": set(), "dois": set()}
+        event.listen(session, "after_commit", self._on_commit)
+        event.listen(session, "after_rollback", self._on_rollback)
+
+    @classmethod
+    def for_session(cls, session: Session) -> "DedupIndex":
+        """Renvoie l'index attaché à la session (créé au premier appel)."""
+        index = session.info.get(INDEX_KEY)
+        if index is None:
+            index = cls(session)
+            session.info[INDEX_KEY] = index
+        return index
+
+    # --- CHARGEMENT ---
+
+    def _load_items(self):
+        self._external_ids, self._dois = set(), set()
+        for external_id, doi in self.session.exec(select(ResearchItem.external_id, ResearchItem.doi)):
+            self._external_ids.add(external_id)
+            if doi:
+                self._dois.add(doi)
+
+    # --- RESEARCH ITEMS ---
+
+    def has_item(self, external_id: str = None, doi: str = None) -> bool:
+        """Vrai si un ResearchItem existe déjà avec cet external_id ou ce DOI."""
+        if self._external_ids is None:
+            self._load_items()
+        return bool(external_id and external_id in self._external_ids) or bool(doi and doi in self._dois)
+
+    def add_item(self, external_id: str, doi: str = None):
+        if self._external_ids is None:
+            self._load_items()
+        if external_id and external_id not in self._external_ids:
+            self._external_ids.add(external_id)
+            self._pending["external_ids"].add(external_id)
+        if doi and doi not in self._dois:
+            self._dois.add(doi)
+            self._pending["dois"].add(doi)
+
+    # --- TRANSACTIONS ---
+
+    def _on_commit(self, session):
+        if session.in_nested_transaction():
+            return
+        for keys in self._pending.values():
+            keys.clear()
+
+    def _on_rollback(self, session):
+        if session.in_nested_transaction():
+            return
+        for name, target in (("external_ids", self._external_ids), ("dois", self._dois)):
+            if target is not None:
+                target.difference_update(self._pending[name])
+            self._pending[name].clear()
@@ -3,16 +3,20 @@ Processeur épuré pour les données HAL.
 
 Features:
 - Initialisation de la source HAL.
-- Déduplication par external_id et par DOI (inter-sources).
-- Création simplifiée des auteurs.
+- Déduplication par external_id et par DOI (inter-sources), via l'index mémoire partagé (DedupIndex).
+- Création simplifiée des auteurs, via le registre partagé (AuthorRegistry).
 - Insertion directe dans ResearchItem avec stockage complet dans 'raw'.
 """
 
 from sqlmodel import Session, select
-from models import ResearchItem, Author, Source
+from models import ResearchItem, Source
+from processors.dedup_index import DedupIndex
+from processors.author_registry import AuthorRegistry
+from processors.bulk_writer import BulkWriter
+from processors.transform import transform_chunk
 
 class HalProcessor:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, bulk: bool = False):
         # On utilise la session passée en argument (cohérence pipeline)
         self.session = session
         
@@ -24,95 +28,113 @@ class HalProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
+        self.index = DedupIndex.for_session(session)
+        self.authors = AuthorRegistry.for_session(session)
+        # bulk : lignes écrites par INSERT multi-lignes en fin de paquet (cf. BulkWriter)
+        self.writer = BulkWriter(session) if bulk else None
 
     def get_or_create_author(self, full_name: str):
-        """Récupère ou crée l'auteur."""
-        ext_id = f"hal_{full_name.replace(' ', '_').lower()}"
-        author = self.session.exec(select(Author).where(Author.external_id == ext_id)).first()
-        
-        if not author:
-            author = Author(full_name=full_name, external_id=ext_id)
-            self.session.add(author)
-        return author
+        """Déclare l'auteur au registre (créé au commit s'il n'existe pas encore)."""
+        self.authors.add(f"hal_{full_name.replace(' ', '_').lower()}", full_name=full_name)
 
     def process_records(self, records: list) -> int:
         """Traite et insère les notices HAL (Format API Direct)."""
-        processed_count = 0
+        return self.write_records(transform_chunk(prepare_record, records))
 
-        for doc in records:
-            # Extraction directe des clés HAL
-            ext_id = doc.get("halId_s")
-            doi = doc.get("doiId_s")
-
-            if not ext_id:
-                continue
+    def write_records(self, prepared: list) -> int:
+        """Insère les notices déjà transformées par prepare_record."""
+        processed_count = 0
 
-            # 1. Check doublon par external_id
-            existing = self.session.exec(
-                select(ResearchItem).where(ResearchItem.external_id == ext_id)
-            ).first()
-            if existing: continue
+        for doc in prepared:
+            ext_id, doi = doc["external_id"], doc["doi"]
 
-            # 2. Check doublon par DOI (Toutes sources)
-            if doi:
-                existing_doi = self.session.exec(
-                    select(ResearchItem).where(ResearchItem.doi == doi)
-                ).first()
-                if existing_doi: continue
+            # 1. / 2. Check doublon par external_id et par DOI (Toutes sources)
+            if self.index.has_item(external_id=ext_id, doi=doi): continue
 
             try:
                 # Création des auteurs
-                for name in doc.get("authFullName_s", []):
+                for name in doc["authors"]:
                     self.get_or_create_author(name)
 
-                # Nettoyage du titre
-                raw_title = doc.get("title_s")
-                title = raw_title[0] if isinstance(raw_title, list) and raw_title else raw_title
-
-                # 3. Logique de mapping du type
-                hal_type = doc.get("docType_s", "ART")
-                normalized_type = "article" if hal_type in ["ART", "COUV", "COMM", "POSTER"] else "other"
-
-                # Extraction et nettoyage des domaines (topics)
-                raw_domains = doc.get("domain_s", [])
-                clean_topics = []
-
-                for d in raw_domains:
-                    # On enlève les préfixes de hiérarchie (0., 1., 2.)
-                    # "1.shs.droit" devient "shs.droit"
-                    parts = d.split('.')
-                    if len(parts) > 1:
-                        topic = ".".join(parts[1:])
-                    else:
-                        topic = d
-                    
-                    # Optionnel : Rendre plus lisible (ex: shs -> sciences-sociales)
-                    topic = topic.replace("shs", "sciences-sociales").replace("info", "informatique")
-                    
-                    if topic not in clean_topics:
-                        clean_topics.append(topic)
-
-
-                # 4. Création du ResearchItem homogénéisé
-                item = ResearchItem(
-                    source_id=self.source_id,
-                    external_id=ext_id,
-                    doi=doi,
-                    title=title,
-                    year=doc.get("producedDateY_i"),
-                    type=normalized_type, # Utilisation du type mappé
-                    is_open_access=True,
-                    keywords=doc.get("keyword_s", []),
-                    topics=clean_topics,
-                    raw=doc
-                )
-                
-                self.session.add(item)
+                row = {**doc["row"], "source_id": self.source_id}
+                if self.writer:
+                    self.writer.add(ResearchItem, row)
+                else:
+                    self.session.add(ResearchItem(**row))
+                self.index.add_item(ext_id, doi)
                 processed_count += 1
 
             except Exception as e:
                 print(f"Error processing HAL record {ext_id}: {e}")
                 continue
 
+        if self.writer:
+            processed_count = len(self.writer.flush().get(ResearchItem, {}))
         self.session.commit()
-        return processed_count
\ No newline at end of file
+        return processed_count
+
+
+def prepare_record(doc: dict):
+    """
+    Transformation pure d'une notice HAL (titre, type, domaines), sans accès BDD ; None sans
+    halId. Une notice illisible est ignorée (None) sans interrompre le paquet.
+    """
+    try:
+        return _map_record(doc)
+    except Exception as e:
+        print(f"Error processing HAL record {doc.get('halId_s')}: {e}")
+        return None
+
+
+def _map_record(doc: dict):
+    # Extraction directe des clés HAL
+    ext_id = doc.get("halId_s")
+    doi = doc.get("doiId_s")
+
+    if not ext_id:
+        return None
+
+    # Nettoyage du titre
+    raw_title = doc.get("title_s")
+    title = raw_title[0] if isinstance(raw_title, list) and raw_title else raw_title
+
+    # 3. Logique de mapping du type
+    hal_type = doc.get("docType_s", "ART")
+    normalized_type = "article" if hal_type in ["ART", "COUV", "COMM", "POSTER"] else "other"
+
+    # Extraction et nettoyage des domaines (topics)
+    raw_domains = doc.get("domain_s", [])
+    clean_topics = []
+
+    for d in raw_domains:
+        # On enlève les préfixes de hiérarchie (0., 1., 2.)
+        # "1.shs.droit" devient "shs.droit"
+        parts = d.split('.')
+        if len(parts) > 1:
+            topic = ".".join(parts[1:])
+        else:
+            topic = d
+        
+        # Optionnel : Rendre plus lisible (ex: shs -> sciences-sociales)
+        topic = topic.replace("shs", "sciences-sociales").replace("info", "informatique")
+        
+        if topic not in clean_topics:
+            clean_topics.append(topic)
+
+    # 4. Création du ResearchItem homogénéisé
+    return {
+        "external_id": ext_id,
+        "doi": doi,
+        "authors": doc.get("authFullName_s", []),
+        "row": dict(
+            external_id=ext_id,
+            doi=doi,
+            title=title,
+            year=doc.get("producedDateY_i"),
+            type=normalized_type, # Utilisation du type mappé
+            is_open_access=True,
+            keywords=doc.get("keyword_s", []),
+            topics=clean_topics,
+            raw=doc
+        ),
+    }
@@ -1,6 +1,21 @@
+"""
+Processeur des brevets EPO OPS (InpiCrawler).
+
+Transactions groupées : chaque brevet est inséré dans un savepoint (session.begin_nested),
+si bien qu'un enregistrement invalide n'annule que lui-même ; les brevets d'un appel de
+process_patents sont validés ensemble, par un seul commit en fin d'appel. Le pipeline
+appelle process_patents par paquet de --chunk-size brevets (CHUNK_SIZE, cf.
+scripts/streaming.py) : c'est la taille des transactions. La transaction n'est pas gardée
+ouverte d'un appel à l'autre, car la session est partagée avec les autres sources du
+pipeline : le rollback d'un paquet d'une autre source emporterait les brevets non validés.
+Le nombre de commits (un fsync chacun sous SQLite) ne dépend donc plus du nombre de brevets.
+"""
+
 import re
 from sqlmodel import Session, select
-from models import ResearchItem, Author, Source
+from models import ResearchItem, Source
+from processors.dedup_index import DedupIndex
+from processors.author_registry import AuthorRegistry
 
 class InpiProcessor:
 
@@ -13,7 +28,8 @@ class InpiProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
-
+        self.index = DedupIndex.for_session(session)
+        self.authors = AuthorRegistry.for_session(session)
 
     # Liste des marqueurs d'organisations
     ORG_MARKERS = [
@@ -49,46 +65,44 @@ class InpiProcessor:
         
         # SI CE N'EST PAS UN HUMAIN, ON SORT
         if not self.is_probably_human(display_name):
-            return None 
+            return
             
         author_slug = f"person_{display_name.lower().replace(' ', '_')}"
-        author = self.session.exec(select(Author).where(Author.external_id == author_slug)).first()
-        
-        if not author:
-            author = Author(full_name=display_name, external_id=author_slug)
-            self.session.add(author)
-        return author
+        self.authors.add(author_slug, full_name=display_name)
 
     def process_patents(self, patents: list) -> int:
         count = 0
         for p in patents:
             ext_id = p["external_id"]
             
-            existing = self.session.exec(select(ResearchItem).where(ResearchItem.external_id == ext_id)).first()
-            if existing: continue
+            if self.index.has_item(external_id=ext_id): continue
 
             try:
-                # Création/Récupération des auteurs
-                for name in p["authors"]:
-                    self.get_or_create_author(name)
-
-                # Création du brevet
-                item = ResearchItem(
-                    source_id=self.source_id,
-                    external_id=ext_id,
-                    title=p["title"],
-                    abstract=p["abstract"],
-                    year=p["year"],
-                    type="patent",
-                    is_open_access=True,
-                    raw=p
-                )
-                self.session.add(item)
-                self.session.commit()
-                count += 1
+                # Savepoint : une erreur n'annule que ce brevet, pas le lot en cours
+                with self.session.begin_nested():
+                    authors = p["authors"]
+                    # Création du brevet
+                    item = ResearchItem(
+                        source_id=self.source_id,
+                        external_id=ext_id,
+                        title=p["title"],
+                        abstract=p["abstract"],
+                        year=p["year"],
+                        type="patent",
+                        is_open_access=True,
+                        raw=p
+                    )
+                    self.session.add(item)
             except Exception as e:
-                self.session.rollback() # Important pour débloquer la session en cas d'erreur
                 print(f"Erreur processing brevet {ext_id}: {e}")
-                
+                continue
+
+            # Auteurs déclarés une fois le brevet accepté (écrits au prochain commit)
+            for name in authors:
+                self.get_or_create_author(name)
+            self.index.add_item(ext_id)
+            count += 1
+
+        # Un seul commit pour tout le paquet
         self.session.commit()
-        return count
\ No newline at end of file
+        return count
@@ -4,10 +4,13 @@ Synchronisé avec le crawler pyalex personnalisé.
 """
 
 from sqlmodel import Session, select
-from models import ResearchItem, Author, Source
+from models import ResearchItem, Source
+from processors.dedup_index import DedupIndex
+from processors.author_registry import AuthorRegistry
+from processors.bulk_writer import BulkWriter
 
 class OpenAlexProcessor:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, bulk: bool = False):
         self.session = session
         # Initialisation ou récupération de la source
         source = self.session.exec(select(Source).where(Source.name == "openalex")).first()
@@ -17,28 +20,26 @@ class OpenAlexProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
+        # Clés déjà en base (DOI, external_id, auteurs), chargées une fois pour tout le run
+        self.index = DedupIndex.for_session(session)
+        self.authors = AuthorRegistry.for_session(session)
+        # bulk : lignes écrites par INSERT multi-lignes en fin de paquet (cf. BulkWriter)
+        self.writer = BulkWriter(session) if bulk else None
 
     def get_or_create_author(self, author_data: dict):
-        """Récupère l'auteur via l'ID OpenAlex (ex: https://openalex.org/A50...)"""
+        """Déclare l'auteur au registre via l'ID OpenAlex (ex: https://openalex.org/A50...)."""
         full_ext_id = author_data.get("author_id")
-        if not full_ext_id: return None
+        if not full_ext_id: return
         
         # On garde l'ID propre
         ext_id = str(full_ext_id).replace("https://openalex.org/", "")
-        
-        author = self.session.exec(
-            select(Author).where(Author.external_id == ext_id)
-        ).first()
-        
-        if not author:
-            # On utilise le display_name extrait par ton crawler
-            author = Author(
-                full_name=author_data.get("display_name") or "Unknown Author",
-                external_id=ext_id,
-                orcid=author_data.get("orcid")
-            )
-            self.session.add(author)
-        return author
+
+        # On utilise le display_name extrait par ton crawler
+        self.authors.add(
+            ext_id,
+            full_name=author_data.get("display_name") or "Unknown Author",
+            orcid=author_data.get("orcid")
+        )
 
     def process_works(self, works: list) -> int:
         """Traite les dictionnaires générés par crawl_openalex_ai()"""
@@ -56,18 +57,8 @@ class OpenAlexProcessor:
 
             if not ext_id: continue
 
-            # 1. Vérification doublon par DOI (Maintenant ils seront identiques !)
-            existing = None
-            if doi:
-                existing = self.session.exec(
-                    select(ResearchItem).where(ResearchItem.doi == doi)
-                ).first()
-            
-            # 2. Déduplication ID
-            if not existing:
-                existing = self.session.exec(select(ResearchItem).where(ResearchItem.external_id == ext_id)).first()
-
-            if existing: continue
+            # Déduplication par DOI (Maintenant ils seront identiques !) puis par ID, via l'index mémoire
+            if self.index.has_item(external_id=ext_id, doi=doi): continue
 
             try:
                 # Création des auteurs via la liste 'authors' de ton crawler
@@ -75,7 +66,7 @@ class OpenAlexProcessor:
                     self.get_or_create_author(auth_data)
 
                 # Création du ResearchItem avec tes champs mappés
-                item = ResearchItem(
+                row = dict(
                     source_id=self.source_id,
                     external_id=ext_id,
                     doi=doi,
@@ -91,12 +82,19 @@ class OpenAlexProcessor:
                     raw=w.get("raw") 
                 )
                 
-                self.session.add(item)
+                if self.writer:
+                    self.writer.add(ResearchItem, row)
+                else:
+                    self.session.add(ResearchItem(**row))
+                self.index.add_item(ext_id, doi)
                 processed_count += 1
 
             except Exception as e:
                 print(f"Error processing OpenAlex work {ext_id}: {e}")
                 continue
 
+        if self.writer:
+            # Compte réel : les lignes ignorées sur conflit ne sont pas renvoyées
+            processed_count = len(self.writer.flush().get(ResearchItem, {}))
         self.session.commit()
         return processed_count
\ No newline at end of file
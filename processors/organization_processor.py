@@ -17,7 +17,8 @@ from pathlib import Path
 from typing import List, Optional
 from sqlmodel import Session, select 
 from database import engine
-from models import Entity, Source, Affiliation, Author
+from models import Entity, Source, Affiliation
+from processors.author_registry import AuthorRegistry
 
 class OrganizationProcessor:
     def __init__(self, session: Session, data_dir: Path):
@@ -31,6 +32,7 @@ class OrganizationProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
+        self.authors = AuthorRegistry.for_session(session)
 
     # --- MÉTHODES DE NETTOYAGE ---
 
@@ -331,22 +333,12 @@ class OrganizationProcessor:
                             
                             p_slug = f"person_{f_name.lower().replace(' ', '_')}"
                             
-                            person = self.session.exec(
-                                select(Author).where(Author.external_id == p_slug)
-                            ).first()
-                            
-                            if not person:
-                                person = Author(
-                                    full_name=f_name, 
-                                    external_id=p_slug,
-                                    publication_count=0
-                                )
-                                self.session.add(person)
-                                self.session.flush()
+                            # Auteur créé au commit s'il n'existe pas encore (registre partagé)
+                            self.authors.add(p_slug, full_name=f_name, publication_count=0)
                             
                             # CORRECTION ICI : Ajout de author_external_id=p_slug
+                            # (Affiliation n'a pas de colonne author_id : le lien passe par le slug)
                             self.session.add(Affiliation(
-                                author_id=person.id, 
                                 author_external_id=p_slug, # <--- INDISPENSABLE
                                 entity_id=entity.id, 
                                 role="Founder",
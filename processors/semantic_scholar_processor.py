@@ -3,10 +3,13 @@ Processeur épuré pour Semantic Scholar.
 Harmonisé avec les autres processeurs du pipeline.
 """
 from sqlmodel import Session, select
-from models import ResearchItem, Author, Source
+from models import ResearchItem, Source
+from processors.dedup_index import DedupIndex
+from processors.author_registry import AuthorRegistry
+from processors.bulk_writer import BulkWriter
 
 class SemanticScholarProcessor:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, bulk: bool = False):
         self.session = session
         # Source unique Semantic Scholar
         source = self.session.exec(
@@ -22,22 +25,17 @@ class SemanticScholarProcessor:
             self.session.commit()
             self.session.refresh(source)
         self.source_id = source.id
+        self.index = DedupIndex.for_session(session)
+        self.authors = AuthorRegistry.for_session(session)
+        # bulk : lignes écrites par INSERT multi-lignes en fin de paquet (cf. BulkWriter)
+        self.writer = BulkWriter(session) if bulk else None
 
     def get_or_create_author(self, author_data: dict):
-        """Récupère ou crée l'auteur via son ID S2."""
+        """Déclare l'auteur au registre via son ID S2."""
         s2_id = author_data.get("authorId")
-        if not s2_id: return None
+        if not s2_id: return
         
-        ext_id = f"s2_{s2_id}"
-        author = self.session.exec(select(Author).where(Author.external_id == ext_id)).first()
-        
-        if not author:
-            author = Author(
-                full_name=author_data.get("name", "Unknown"),
-                external_id=ext_id
-            )
-            self.session.add(author)
-        return author
+        self.authors.add(f"s2_{s2_id}", full_name=author_data.get("name", "Unknown"))
 
     def process_papers(self, papers: list) -> int:
         """Traite et insère les publications Semantic Scholar."""
@@ -48,18 +46,8 @@ class SemanticScholarProcessor:
 
             if not ext_id: continue
 
-            # 1. Déduplication par ID Source
-            existing = self.session.exec(
-                select(ResearchItem).where(ResearchItem.external_id == ext_id)
-            ).first()
-            if existing: continue
-
-            # 2. Déduplication par DOI (Inter-sources)
-            if doi:
-                existing_doi = self.session.exec(
-                    select(ResearchItem).where(ResearchItem.doi == doi)
-                ).first()
-                if existing_doi: continue
+            # Déduplication par ID Source et par DOI (Inter-sources), via l'index mémoire
+            if self.index.has_item(external_id=ext_id, doi=doi): continue
 
             try:
                 # Création des auteurs
@@ -68,7 +56,7 @@ class SemanticScholarProcessor:
 
 
                 # Création de l'item
-                item = ResearchItem(
+                row = dict(
                     source_id=self.source_id,
                     external_id=ext_id,
                     doi=doi,
@@ -83,12 +71,18 @@ class SemanticScholarProcessor:
                     raw=paper # Stocke tout le JSON pour AffiliationProcessor
                 )
                 
-                self.session.add(item)
+                if self.writer:
+                    self.writer.add(ResearchItem, row)
+                else:
+                    self.session.add(ResearchItem(**row))
+                self.index.add_item(ext_id, doi)
                 count += 1
 
             except Exception as e:
                 print(f"Erreur traitement article S2 {ext_id}: {e}")
                 continue
 
+        if self.writer:
+            count = len(self.writer.flush().get(ResearchItem, {}))
         self.session.commit()
         return count
\ No newline at end of file
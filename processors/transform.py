@@ -0,0 +1,27 @@
+"""
+Transformations pures des processors : enregistrement brut (dict du crawler) -> ligne préparée.
+
+Les processors séparent leur travail en deux étapes :
+- prepare_* (fonction de module, sans session ni accès BDD) : parsing des dates, nettoyage
+  des domaines HAL, aplatissement des topics OpenAlex, parsing des leaders ScanR... ;
+- write_* (méthode du processor) : déduplication, auteurs et écriture en base.
+
+process_* enchaîne les deux dans le thread du writer ; avec `pipeline.py --transform-workers N`,
+la première étape tourne dans un pool de processus (cf. scripts/streaming.py, TransformPool)
+et le writer ne reçoit que des lignes prêtes à écrire. Les fonctions prepare_* sont donc
+importables par nom (picklables) et leurs résultats ne contiennent que des types simples.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+Transform = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def transform_chunk(transform: Transform, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Applique `transform` à un paquet ; les enregistrements ignorés (None) sont écartés.
+    Une exception interrompt le paquet, comme dans les boucles d'origine des processors :
+    le pipeline l'annule et ne fait pas avancer la marque de la source. Une transformation
+    qui tolère les enregistrements invalides (prepare_record de HAL) renvoie None pour eux.
+    """
+    return [row for row in (transform(record) for record in records) if row is not None]
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Serveur HTTP local rejouant les fixtures des crawlers (cf. crawlers/fixtures.py).
+
+Remplace OpenAlex, arXiv, HAL, ScanR, S2, OpenCorporates et EPO OPS pour mesurer le débit
+des crawlers sans réseau (CI isolée) : les fixtures sont enregistrées une fois avec
+`pipeline.py --record-fixtures`, puis le pipeline est redirigé vers ce serveur avec
+`--base-url http://127.0.0.1:8765` (ou la variable d'environnement CRAWLER_BASE_URL).
+
+Les requêtes arrivent sous la forme /<hôte>/<chemin>?<paramètres> ; le serveur reconstruit
+l'URL d'origine, calcule la même clé que l'enregistreur et renvoie la réponse stockée.
+
+Comportements simulés :
+- Latence : --latency secondes par réponse, plus un aléa uniforme de 0 à --jitter (graine --seed).
+- Throttling : au-delà de --rate-limit requêtes/seconde par hôte, ou une requête sur
+  --throttle-every, le serveur répond comme la vraie API : 403 OPS (X-Rejection-Reason,
+  X-Throttling-Control) pour ops.epo.org, 429 pour les autres, avec Retry-After.
+- Jeton OAuth OPS : /auth/accesstoken renvoie un jeton factice (jamais enregistré).
+- Fixture absente : 404 (compté et affiché).
+
+Utilisation :
+    uv run scripts/mock_server.py --latency 0.2 --jitter 0.1 --throttle-every 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawlers.fixtures import FIXTURE_DIR, fixture_path, load_fixture, original_url
+from crawlers.http_cache import NO_CACHE_PATHS
+
+# ------------------ CONFIG ------------------
+DEFAULT_PORT = 8765
+OPS_HOST = "ops.epo.org"
+OPS_BUSY_HEADER = "busy (images=green:100, inpadoc=yellow:45, other=green:1000, retrieval=yellow:200, search=red:30)"
+
+
+class FixtureReplay:
+    """État partagé par les threads du serveur : fixtures, throttling simulé et compteurs."""
+
+    def __init__(self, directory: Path, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0,
+                 throttle_every: int = 0, retry_after: int = 1, seed: int = 0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = defaultdict(int)
+        self.recent = defaultdict(deque)
+        self.stats = {"served": 0, "missing": 0, "throttled": 0}
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def should_throttle(self, host: str) -> bool:
+        """Compte la requête et décide si elle dépasse le quota simulé de l'hôte."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests[host] += 1
+            if self.throttle_every and self.requests[host] % self.throttle_every == 0:
+                self.stats["throttled"] += 1
+                return True
+            if self.rate_limit:
+                window = self.recent[host]
+                while window and now - window[0] > 1.0:
+                    window.popleft()
+                if len(window) >= self.rate_limit:
+                    self.stats["throttled"] += 1
+                    return True
+                window.append(now)
+            return False
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.replay("GET")
+
+    def do_POST(self):
+        self.replay("POST")
+
+    def replay(self, method: str):
+        state: FixtureReplay = self.server.replay
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        url = original_url(self.path)
+        host = urlsplit(url).hostname or ""
+
+        time.sleep(state.delay())
+
+        if any(fragment in url for fragment in NO_CACHE_PATHS):
+            token = {"access_token": "mock-token", "token_type": "BearerToken", "expires_in": "1199"}
+            return self.send(200, json.dumps(token).encode(), {"Content-Type": "application/json"})
+
+        if state.should_throttle(host):
+            headers = {"Retry-After": str(state.retry_after)}
+            if host == OPS_HOST:
+                headers.update({"X-Rejection-Reason": "IndividualQuotaPerHour", "X-Throttling-Control": OPS_BUSY_HEADER})
+                return self.send(403, b"<error>quota exceeded</error>", {**headers, "Content-Type": "application/xml"})
+            return self.send(429, b'{"message": "Too Many Requests"}', {**headers, "Content-Type": "application/json"})
+
+        fixture = load_fixture(fixture_path(state.directory, method, url, body, self.headers))
+        if fixture is None:
+            state.count("missing")
+            print(f"[mock] fixture absente : {method} {url}")
+            return self.send(404, b'{"message": "no fixture"}', {"Content-Type": "application/json"})
+
+        meta, content = fixture
+        state.count("served")
+        self.send(meta["status"], content, meta.get("headers", {}))
+
+    def send(self, status: int, content: bytes, headers: dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # Une ligne par requête noierait la sortie d'un benchmark
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local rejouant les fixtures HTTP des crawlers")
+    parser.add_argument("--fixture-dir", default=str(FIXTURE_DIR), help="Dossier des fixtures enregistrées")
+    parser.add_argument("--bind", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port d'écoute")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence fixe ajoutée à chaque réponse (secondes)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latence aléatoire supplémentaire, de 0 à JITTER secondes")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requêtes/seconde par hôte au-delà desquelles le serveur throttle (0 : illimité)")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Throttle une requête sur N par hôte (0 : jamais)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Valeur de Retry-After des réponses 429 / 403")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de l'aléa de latence (runs reproductibles)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.bind, args.port), ReplayHandler)
+    server.daemon_threads = True
+    server.replay = FixtureReplay(
+        args.fixture_dir, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+        throttle_every=args.throttle_every, retry_after=args.retry_after, seed=args.seed,
+    )
+    print(f"Mock server on http://{args.bind}:{args.port} (fixtures: {args.fixture_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.replay.stats
+        print(f"Mock server stopped: {stats['served']} served, {stats['missing']} missing, {stats['throttled']} throttled")
+
+
+if __name__ == "__main__":
+    main()
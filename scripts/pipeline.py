@@ -2,6 +2,7 @@
 import argparse
 import sys
 import os
+from functools import partial
 from sqlmodel import Session
 
 from pathlib import Path
@@ -10,69 +11,150 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.initialize import create_db_and_tables
 from database import engine
+from database.crawl_state_service import CrawlStateService
 
-# Crawlers
-from crawlers.open_alex_crawler import crawl_openalex_ai
-from crawlers.open_alex_institution_crawler import crawl_openalex_institutions
-from crawlers.arxiv_crawler import crawl_ai_articles
-from crawlers.semantic_scholar_crawler import SemanticScholarCrawler
-from crawlers.hal_crawler import HALCrawler
-from crawlers.scanR_crawler import crawl_scanr_ai
-from crawlers.open_corporates_crawler import crawl_opencorporates_ai
-from crawlers.inpi_crawler import InpiCrawler
-from processors.inpi_processor import InpiProcessor 
-
-# Processors
-from processors.openalex_processor import OpenAlexProcessor
-from processors.open_alex_institution_processor import OpenAlexInstitutionProcessor
-from processors.arxiv_processor import ArxivProcessor
-from processors.semantic_scholar_processor import SemanticScholarProcessor
-from processors.hal_processor import HalProcessor
-from processors.scanR_processor import ScanRProcessor
-from processors.open_corporates_processor import OpenCorporatesProcessor
-from processors.organization_processor import OrganizationProcessor
-
-def run_source(name, session, data, processor_class, process_method):
-    """Gère l'ingestion une fois que les données sont récupérées."""
-    if not data:
-        print(f"No data retrieved for {name}.\n")
-        return 0
-    
-    print(f"Crawled {len(data)} items from {name}")
-    processor = processor_class(session)
-    count = getattr(processor, process_method)(data)
-    print(f"Successfully processed {count} {name} items\n")
-    return count
-
+# Crawlers et processors : importés à la demande, pour les seules sources sélectionnées
+from scripts.sources import SOURCES, select_sources
+from crawlers.http_client import get_http_client
+from crawlers.resilience import RETRY_BUDGET
+from crawlers.http_cache import ResponseCache, CACHE_DIR
+from crawlers.fixtures import FixtureRecorder, FIXTURE_DIR
+from crawlers.spool import SpoolWriter, SPOOL_DIR, iter_spool, new_run_id
+from crawlers.checkpoint import Checkpoint, CHECKPOINT_EVERY
+from crawlers.telemetry import get_telemetry
+from scripts.streaming import DateWatermark, SourceStream, TransformPool, run_streams, CHUNK_SIZE, QUEUE_SIZE
 
 def main():
     parser = argparse.ArgumentParser(description="Run data crawling and processing pipelines")
-    parser.add_argument("--source", default="all", help="Source à traiter")
+    parser.add_argument("--source", default="all", help=f"Source à traiter ({', '.join(SOURCES)} ou all)")
     parser.add_argument("--limit", type=int, default=100, help="Nombre max d'items à récupérer")
     parser.add_argument("--year", type=int, default=2024, help="Année de départ pour la collecte")
     parser.add_argument("--query", default="intelligence artificielle", help="Mot-clé de recherche")
+    parser.add_argument("--lean", action="store_true", help="OpenAlex : ne demande que les champs utiles (select) et n'inclut pas le work brut dans raw")
+    parser.add_argument("--shard-by", choices=["year", "month"], default="year", help="OpenAlex : découpage de la période en shards crawlés en parallèle")
+    parser.add_argument("--s2-bulk", action="store_true", help="Semantic Scholar : recherche bulk (ids) puis détails par lots de 500 via /paper/batch")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Nombre d'items passés au processor à chaque commit")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Nombre de paquets en attente entre crawler et processor")
+    parser.add_argument("--no-spool", action="store_true", help="N'écrit pas la copie brute des crawls dans le spool NDJSON")
+    parser.add_argument("--spool-dir", default=str(SPOOL_DIR), help="Dossier du spool NDJSON compressé")
+    parser.add_argument("--from-spool", action="store_true", help="Rejoue le spool dans les processors, sans appel réseau")
+    parser.add_argument("--run-id", default=None, help="Avec --from-spool : ne rejoue que ce run (par défaut : tous les runs)")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignore les high-water marks : recrawle toute la fenêtre depuis --year")
+    parser.add_argument("--resume", action="store_true", help="Reprend OpenAlex, arXiv et EPO au dernier point de reprise (checkpoints/)")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY, help="Nombre de pages / tranches entre deux écritures du point de reprise")
+    parser.add_argument("--bulk-insert", action="store_true", help="Écrit ResearchItem, Author et Entity par INSERT multi-lignes ON CONFLICT (OpenAlex, institutions, arXiv, S2, HAL)")
+    parser.add_argument("--transform-workers", type=int, default=0, help="Processus dédiés aux transformations des processors (arXiv, HAL, institutions OpenAlex, ScanR) ; 0 : dans le writer")
+    parser.add_argument("--sequential", action="store_true", help="Ingère les sources l'une après l'autre au lieu de les crawler en parallèle")
+    parser.add_argument("--retry-budget", type=int, default=RETRY_BUDGET, help="Nombre total de retries HTTP autorisés sur le run (toutes sources)")
+    parser.add_argument("--report-dir", default="reports", help="Dossier du rapport JSON du run et du fichier de métriques Prometheus")
+    parser.add_argument("--cache", action="store_true", help="Rejoue les réponses HTTP déjà téléchargées depuis le cache disque")
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR), help="Dossier du cache HTTP (avec --cache)")
+    parser.add_argument("--record-fixtures", action="store_true", help="Enregistre chaque réponse HTTP en fixture (rejouable par scripts/mock_server.py)")
+    parser.add_argument("--fixture-dir", default=str(FIXTURE_DIR), help="Dossier des fixtures HTTP (avec --record-fixtures)")
+    parser.add_argument("--base-url", default=None, help="Redirige toutes les sources vers un serveur local (ex: http://127.0.0.1:8765)")
 
     args = parser.parse_args()
+    selected = select_sources(args.source)
+    if not selected:
+        parser.error(f"source inconnue : {args.source}")
+
+    get_http_client().set_retry_budget(args.retry_budget)
+    if args.cache:
+        cache = ResponseCache(directory=Path(args.cache_dir))
+        get_http_client().enable_cache(cache)
+        print(f"HTTP cache enabled ({args.cache_dir})")
+    if args.record_fixtures:
+        recorder = FixtureRecorder(directory=Path(args.fixture_dir))
+        get_http_client().enable_recording(recorder)
+        print(f"Recording HTTP fixtures ({args.fixture_dir})")
+    if args.base_url:
+        get_http_client().set_base_url(args.base_url)
+        print(f"All sources redirected to {args.base_url}")
 
     print("Initializing database...")
     create_db_and_tables()
 
     total_processed = 0
-    s = args.source
     limit = args.limit
     year = args.year
     query = args.query
+    spool_dir = Path(args.spool_dir)
+    run_id = new_run_id()
+
+    def mark(session, name, scope=""):
+        """High-water mark d'une source (None avec --full-refresh, en relecture de spool ou sans run précédent)."""
+        if args.full_refresh or args.from_spool:
+            return None
+        return CrawlStateService(session).get(name, scope)
+
+    def since(session, name, scope=""):
+        """Date de la marque (YYYY-MM-DD), avec les mêmes exceptions que mark()."""
+        if args.full_refresh or args.from_spool:
+            return None
+        value = CrawlStateService(session).since(name, scope)
+        if value:
+            print(f"{name}: incremental crawl since {value}")
+        return value
+
+    def save_mark(session, name, scope="", **marks):
+        """Enregistre la marque après une ingestion complète (jamais en relecture de spool)."""
+        if not args.from_spool:
+            CrawlStateService(session).save(name, scope, **marks)
+
+    def checkpoint(name, **signature):
+        """Point de reprise d'une source, repris avec --resume si les paramètres sont identiques."""
+        return Checkpoint(name, signature=signature, resume=args.resume, every=args.checkpoint_every)
+
+    def finish(cp) -> bool:
+        """Supprime le point de reprise d'un crawl complet ; renvoie False s'il reste à reprendre."""
+        if cp.completed():
+            cp.clear()
+            return True
+        cp.flush()
+        print(f"{cp.name}: crawl incomplet, relancer avec --resume pour repartir de {cp.path}")
+        return False
+
+    def prepare(name, session, crawl, processor_class, process_method, date_field=None, scope="", cp=None, on_complete=None):
+        """Prépare le flux d'une source : crawl (copié dans le spool) ou relecture du spool.
+        Avec date_field, la date de publication la plus récente devient la marque de la source
+        (uniquement si le crawl est complet : un crawl interrompu garde la marque précédente).
+        on_complete enregistre les autres marques (curseur, tranche) une fois la source ingérée."""
+        if args.bulk_insert and SOURCES[name].bulk:
+            processor_class = partial(processor_class, bulk=True)
+        # Avec --transform-workers, la transformation pure de la source part dans le pool de processus
+        transform_args = dict(transform=SOURCES[name].transform, write_method=SOURCES[name].write_method) if args.transform_workers else {}
+        if args.from_spool:
+            print(f"Replaying {name} from spool ({args.run_id or 'all runs'})")
+            data = iter_spool(name, run_id=args.run_id, directory=spool_dir)
+            return SourceStream(name, data, processor_class, process_method, **transform_args)
+
+        spool = None if args.no_spool else SpoolWriter(name, run_id, spool_dir)
+        data = crawl()
+        watermark = None
+        if date_field:
+            watermark = DateWatermark(date_field)
+            data = watermark.observe(data)
+
+        def complete():
+            if cp is not None and not finish(cp):
+                return
+            if watermark is not None and watermark.value:
+                save_mark(session, name, scope, last_publication_date=watermark.value)
+            if on_complete is not None:
+                on_complete()
+
+        return SourceStream(name, data, processor_class, process_method, spool=spool, on_complete=complete, **transform_args)
 
     # Traduction de la query pour les sources anglophones
     query_en = "artificial intelligence" if query == "intelligence artificielle" else query
 
     with Session(engine) as session:
-        # 0. Bases Locales (Crunchbase, AI Companies, etc.)
-        if s in ["local", 'csv', "all"]:
+        # 0. Bases Locales (Crunchbase, AI Companies, etc.) / pas d'appel réseau : traité avant les crawls
+        if "local" in selected:
             print("=== Running Local Databases Pipeline ===")
             data_dir = Path("data") # Dossier où sont tes CSV
             if data_dir.exists():
-                local_processor = local_processor = OrganizationProcessor(session, data_dir)
+                local_processor = SOURCES["local"].processor(session, data_dir)
                 
                 # On lance les différentes méthodes du processeur
                 count = 0
@@ -85,73 +167,131 @@ def main():
             else:
                 print("Dossier /data non trouvé. Skip local ingestion.\n")
 
+        # Sources distantes : chaque bloc prépare un flux, les flux sont ingérés ensemble à la fin
+        streams = []
+
         # 1. OpenAlex
-        if s in ["openalex", "all"]:
-            print(f"=== Running OpenAlex Pipeline (Limit: {limit}, Year: {year}) ===")
-            data = crawl_openalex_ai(max_articles=limit, from_year=year, to_year=2026)
-            total_processed += run_source("openalex", session, data, OpenAlexProcessor, "process_works")
+        if "openalex" in selected:
+            print(f"=== Preparing OpenAlex Pipeline (Limit: {limit}, Year: {year}) ===")
+            openalex_since = since(session, "openalex")
+            cp = checkpoint("openalex", limit=limit, year=year, lean=args.lean, shard_by=args.shard_by, since=openalex_since)
+            crawl = lambda: SOURCES["openalex"].crawler(
+                max_articles=limit, from_year=year, to_year=2026, lean=args.lean, shard_by=args.shard_by,
+                since=openalex_since, checkpoint=cp,
+            )
+            streams.append(prepare("openalex", session, crawl, SOURCES["openalex"].processor, "process_works", date_field="publication_date", cp=cp))
     
         # 2. OpenAlex Institutions / augmentation de la limite ici
-        if s in ["openalex_inst", 'open_alex_institution', "all"]:
-            print(f"=== Running OpenAlex Institutions Pipeline (Limit: {limit}) ===")
-            data = crawl_openalex_institutions(limit=limit)
-            total_processed += run_source("openalex_inst", session, data, OpenAlexInstitutionProcessor, "process_institutions")
+        if "openalex_inst" in selected:
+            print(f"=== Preparing OpenAlex Institutions Pipeline (Limit: {limit}) ===")
+            crawl = lambda: SOURCES["openalex_inst"].crawler(limit=limit)
+            streams.append(prepare("openalex_inst", session, crawl, SOURCES["openalex_inst"].processor, "process_institutions"))
 
        # 3. ArXiv / max_results pour chaque catégorie d'articles / from_year: récupère de 2026 jusqu'à "from_year"
-        if s in ["arxiv", "all"]:
-            print(f"=== Running ArXiv Pipeline (Limit/Cat: {limit}, Year: {year}) ===")
-            data = crawl_ai_articles(max_results_per_cat=limit, from_year=year)
-            total_processed += run_source("arxiv", session, data, ArxivProcessor, "process_articles")
+        if "arxiv" in selected:
+            print(f"=== Preparing ArXiv Pipeline (Limit/Cat: {limit}, Year: {year}) ===")
+            arxiv_since = since(session, "arxiv")
+            cp = checkpoint("arxiv", limit=limit, year=year, since=arxiv_since)
+            crawl = lambda: SOURCES["arxiv"].crawler(max_results_per_cat=limit, from_year=year, since=arxiv_since, checkpoint=cp)
+            streams.append(prepare("arxiv", session, crawl, SOURCES["arxiv"].processor, "process_articles", date_field="published", cp=cp))
 
         # 4. Semantic Scholar (CLASSE avec arguments)
-        if s in ["semantic_scholar", 's2', "all"]:
-            print(f"=== Running Semantic Scholar Pipeline (Limit: {limit}) ===")
-            key = os.getenv("SEMANTIC_SCHOLAR_API_KEY")
-            crawler = SemanticScholarCrawler(api_key=key)
-            data = crawler.fetch_ai_papers(query=query_en, year=2026, max_results=limit)
-            if data:
-                proc = SemanticScholarProcessor(session)
-                count = proc.process_papers(data)
-                total_processed += count
-                print(f"Processed {count} items\n")
-
-        # 5. HAL (CLASSE avec arguments) / contrôle sur la date de début et le max / attention HAL fournit les articles par ordre de pertinence et non par date
-        if s in ["hal", "all"]:
-            print(f"=== Running HAL Pipeline (Query: {query}, Year: {year}) ===")
-            try:
-                crawler = HALCrawler()
-                data = crawler.fetch_ai_publications(query=query, start_year=year, max_results=limit)
-                total_processed += run_source("hal", session, data, HalProcessor, "process_records")
-            except Exception as e:
-                print(f"[ERROR] HAL failed: {e}")
+        if "semantic_scholar" in selected:
+            print(f"=== Preparing Semantic Scholar Pipeline (Limit: {limit}) ===")
+
+            def crawl():
+                SemanticScholarCrawler = SOURCES["semantic_scholar"].crawler
+                key = os.getenv("SEMANTIC_SCHOLAR_API_KEY")
+                s2_crawler = SemanticScholarCrawler(api_key=key)
+                fetch = s2_crawler.iter_ai_papers_bulk if args.s2_bulk else s2_crawler.iter_ai_papers
+                # Pas de marque : la recherche S2 est triée par pertinence, pas par date
+                return fetch(query=query_en, year=2026, max_results=limit)
+
+            streams.append(prepare("semantic_scholar", session, crawl, SOURCES["semantic_scholar"].processor, "process_papers"))
+
+        # 5. HAL (CLASSE avec arguments) / contrôle sur la date de début et le max / attention HAL fournit les articles par ordre de dépôt (docid, pour le cursorMark) et non par pertinence
+        if "hal" in selected:
+            print(f"=== Preparing HAL Pipeline (Query: {query}, Year: {year}) ===")
+            # Crawler importé et construit seulement pour un vrai crawl (pas en relecture de spool)
+            hal_crawler = None if args.from_spool else SOURCES["hal"].crawler()
+            # Le curseur n'est valable que pour la même requête et les mêmes filtres
+            hal_scope = f"{query}|{year}"
+            state = mark(session, "hal", hal_scope)
+            cursor = state.last_cursor if state and state.last_cursor else "*"
+            crawl = lambda: hal_crawler.iter_publications(query=query, start_year=year, max_results=limit, cursor=cursor)
+
+            def save_cursor():
+                if hal_crawler.last_cursor:
+                    save_mark(session, "hal", hal_scope, last_cursor=hal_crawler.last_cursor)
+
+            streams.append(prepare("hal", session, crawl, SOURCES["hal"].processor, "process_records", on_complete=save_cursor))
 
         # 6. ScanR / contrôle de la limite ici
-        if s in ["scanr", "all"]:
-            print(f"=== Running ScanR Pipeline (Query: {query}, Limit: {limit}) ===")
-            data = crawl_scanr_ai(query=query, limit=limit)
-            total_processed += run_source("scanr", session, data, ScanRProcessor, "process_organizations")
-
-        # 7. INPI / EPO / Inscription au fil de l'eau
-        if s in ["inpi", 'epo', "all"]:
-            print(f"=== Running INPI Pipeline (Query: {query_en}, Year: {year}) ===")
-            client_id = os.getenv("EPO_CLIENT_ID")
-            client_secret = os.getenv("EPO_CLIENT_SECRET")
-            
-            # AJOUT de session=session ici :
-            crawler = InpiCrawler(client_id, client_secret, session=session)
-            
-            # Cette méthode gère maintenant l'insertion toute seule
-            crawler.fetch_ai_patents(query_text=query_en, max_results=limit, from_year=year)
+        if "scanr" in selected:
+            print(f"=== Preparing ScanR Pipeline (Query: {query}, Limit: {limit}) ===")
+            crawl = lambda: SOURCES["scanr"].crawler(query=query, limit=limit)
+            streams.append(prepare("scanr", session, crawl, SOURCES["scanr"].processor, "process_organizations"))
+
+        # 7. INPI / EPO / les tranches sont insérées par le writer comme les autres sources
+        if "inpi" in selected:
+            print(f"=== Preparing INPI Pipeline (Query: {query_en}, Year: {year}) ===")
+            inpi_crawler = None
+            if not args.from_spool:
+                InpiCrawler = SOURCES["inpi"].crawler
+                client_id = os.getenv("EPO_CLIENT_ID")
+                client_secret = os.getenv("EPO_CLIENT_SECRET")
+                inpi_crawler = InpiCrawler(client_id, client_secret)
+
+            # Reprise après la dernière tranche du run précédent pour la même requête
+            inpi_scope = f"{query_en}|{year}"
+            state = mark(session, "inpi", inpi_scope)
+            start_range = state.last_range + 1 if state and state.last_range else 1
+            inpi_cp = checkpoint("inpi", query=query_en, year=year, limit=limit, start_range=start_range)
+            crawl = lambda: (
+                patent
+                for patents in inpi_crawler.iter_patent_ranges(
+                    query_text=query_en, max_results=limit, from_year=year, start_range=start_range, checkpoint=inpi_cp,
+                )
+                for patent in patents
+            )
+
+            def save_range():
+                if inpi_crawler.last_range:
+                    save_mark(session, "inpi", inpi_scope, last_range=inpi_crawler.last_range)
+
+            streams.append(prepare("inpi", session, crawl, SOURCES["inpi"].processor, "process_patents", cp=inpi_cp, on_complete=save_range))
           
         # 8. OpenCorporates / pas de contrôle sur l'année ici, seulement sur le volume
-        if s in ["open_corporates", "all"]:
-            print(f"=== Running Open Corporates Pipeline (Query: {query_en}, Limit: {limit}) ===")
-            data = crawl_opencorporates_ai(limit=limit, query=query_en)
-            total_processed += run_source("open_corporates", session, data, OpenCorporatesProcessor, "process_companies")
+        if "open_corporates" in selected:
+            print(f"=== Preparing Open Corporates Pipeline (Query: {query_en}, Limit: {limit}) ===")
+            crawl = lambda: SOURCES["open_corporates"].crawler(limit=limit, query=query_en)
+            streams.append(prepare("open_corporates", session, crawl, SOURCES["open_corporates"].processor, "process_companies"))
 
-        
+        # Crawls en parallèle (un thread par source, débit borné par hôte), transformations
+        # dans un pool de processus (--transform-workers), un seul writer
+        pool = TransformPool(args.transform_workers) if args.transform_workers else None
+        try:
+            counts = run_streams(
+                session, streams,
+                chunk_size=args.chunk_size, queue_size=args.queue_size, concurrent=not args.sequential, pool=pool,
+            )
+        finally:
+            if pool is not None:
+                pool.close()
+        total_processed += sum(counts.values())
 
     print(f"=== Pipeline Complete ===\nTotal items processed: {total_processed}")
+    if args.cache:
+        print(f"HTTP cache: {cache.hits} hits, {cache.misses} misses")
+    if args.record_fixtures:
+        print(f"HTTP fixtures: {recorder.recorded} responses recorded")
+
+    # Télémétrie : rapport JSON par run + métriques Prometheus (écrasées à chaque run)
+    telemetry = get_telemetry()
+    report_dir = Path(args.report_dir)
+    telemetry.write_json(report_dir / f"run-{run_id}.json", extra={"run_id": run_id, "args": vars(args), "total_processed": total_processed})
+    telemetry.write_prometheus(report_dir / "crawler_metrics.prom")
+    print(f"=== Crawl telemetry ({report_dir}) ===\n{telemetry.summary()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
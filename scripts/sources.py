@@ -0,0 +1,113 @@
+"""
+Registre des sources du pipeline : crawler et processor importés à la demande.
+
+pipeline.py importait tous les crawlers et processors au chargement, donc pyalex,
+feedparser, dotenv... même pour `--source hal`. Chaque source déclare ici ses chemins
+d'import ("module:attribut") ; le module n'est importé qu'au premier accès à
+`source.crawler` ou `source.processor`, c'est-à-dire seulement si la source est
+sélectionnée (et, en relecture de spool, seul le processor est importé).
+
+Les sources qui lisent des identifiants dans l'environnement (S2, EPO, OpenCorporates)
+chargent le fichier .env avant l'import de leur crawler.
+
+`bulk` signale les processors qui acceptent `bulk=True` (écriture par INSERT multi-lignes,
+cf. processors/bulk_writer.py), activée par `pipeline.py --bulk-insert`.
+`transform` / `write_method` désignent la transformation pure du processor (prepare_*) et
+la méthode qui écrit son résultat, utilisées avec `pipeline.py --transform-workers N`.
+
+Utilisation :
+    from scripts.sources import SOURCES, select_sources
+    for name in select_sources("all"):
+        processor_class = SOURCES[name].processor
+"""
+
+import importlib
+from typing import Any, Dict, List, Optional
+
+_env_loaded = False
+
+
+def load_env():
+    """Charge le .env une seule fois (python-dotenv importé à la demande)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def load(path: str) -> Any:
+    """Importe "package.module:attribut" et renvoie l'attribut."""
+    module, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+class Source:
+    """Une source du pipeline : nom canonique, alias acceptés par --source, crawler et processor."""
+
+    def __init__(
+        self, name: str, crawler: Optional[str], processor: str, aliases=(), needs_env: bool = False, bulk: bool = False,
+        transform: Optional[str] = None, write_method: Optional[str] = None,
+    ):
+        self.name = name
+        self.crawler_path = crawler
+        self.processor_path = processor
+        self.aliases = tuple(aliases)
+        self.needs_env = needs_env
+        self.bulk = bulk
+        self.transform_path = transform
+        self.write_method = write_method
+
+    @property
+    def crawler(self) -> Any:
+        if self.needs_env:
+            load_env()
+        return load(self.crawler_path)
+
+    @property
+    def processor(self) -> Any:
+        return load(self.processor_path)
+
+    @property
+    def transform(self) -> Any:
+        return load(self.transform_path) if self.transform_path else None
+
+
+# Ordre = ordre d'exécution du pipeline
+SOURCES: Dict[str, Source] = {source.name: source for source in (
+    Source("local", None, "processors.organization_processor:OrganizationProcessor", aliases=("csv",)),
+    Source("openalex", "crawlers.open_alex_crawler:iter_openalex_ai", "processors.openalex_processor:OpenAlexProcessor", bulk=True),
+    Source(
+        "openalex_inst", "crawlers.open_alex_institution_crawler:iter_openalex_institutions",
+        "processors.open_alex_institution_processor:OpenAlexInstitutionProcessor", aliases=("open_alex_institution",),
+        bulk=True, transform="processors.open_alex_institution_processor:prepare_institution", write_method="write_institutions",
+    ),
+    Source(
+        "arxiv", "crawlers.arxiv_crawler:iter_ai_articles", "processors.arxiv_processor:ArxivProcessor",
+        bulk=True, transform="processors.arxiv_processor:prepare_article", write_method="write_articles",
+    ),
+    Source(
+        "semantic_scholar", "crawlers.semantic_scholar_crawler:SemanticScholarCrawler",
+        "processors.semantic_scholar_processor:SemanticScholarProcessor", aliases=("s2",), needs_env=True, bulk=True,
+    ),
+    Source(
+        "hal", "crawlers.hal_crawler:HALCrawler", "processors.hal_processor:HalProcessor",
+        bulk=True, transform="processors.hal_processor:prepare_record", write_method="write_records",
+    ),
+    Source(
+        "scanr", "crawlers.scanR_crawler:iter_scanr_ai", "processors.scanR_processor:ScanRProcessor",
+        transform="processors.scanR_processor:prepare_organization", write_method="write_organizations",
+    ),
+    Source("inpi", "crawlers.inpi_crawler:InpiCrawler", "processors.inpi_processor:InpiProcessor", aliases=("epo",), needs_env=True),
+    Source(
+        "open_corporates", "crawlers.open_corporates_crawler:iter_opencorporates_ai",
+        "processors.open_corporates_processor:OpenCorporatesProcessor", needs_env=True,
+    ),
+)}
+
+
+def select_sources(choice: str) -> List[str]:
+    """Noms canoniques des sources désignées par --source ("all" = toutes) ; [] si inconnue."""
+    if choice == "all":
+        return list(SOURCES)
+    return [name for name, source in SOURCES.items() if choice == name or choice in source.aliases]
@@ -0,0 +1,346 @@
+"""
+Ingestion en flux : crawler -> file bornée -> processor par paquets.
+
+Les crawlers exposent des itérateurs (iter_openalex_ai, iter_ai_articles, iter_scanr_ai...).
+Plutôt que de construire la liste complète avant de la passer au processor, le pipeline :
+    1. Fait tourner le crawler dans un thread de fond.
+    2. Découpe son flux en paquets de CHUNK_SIZE éléments.
+    3. Pousse les paquets dans une file bornée (QUEUE_SIZE paquets au plus en attente).
+    4. Passe chaque paquet au processor dans le thread principal (un commit par paquet).
+
+L'écriture en base chevauche donc les appels réseau, et la mémoire reste bornée à
+(QUEUE_SIZE + 1) * CHUNK_SIZE éléments quelle que soit la valeur de --limit.
+La session SQL n'est utilisée que depuis le thread principal.
+
+Si un SpoolWriter est fourni, chaque paquet est écrit dans le spool (cf. crawlers/spool.py)
+depuis le thread du crawler, avant d'être transmis au processor.
+
+Plusieurs sources (run_streams) :
+Chaque source est crawlée dans son propre thread (la limite de débit reste celle de son hôte,
+cf. crawlers/http_client.py) et tous les paquets convergent vers un unique writer, le thread
+principal, seul détenteur de la session SQL. Le temps total tend vers celui de la source la
+plus lente plutôt que vers la somme des sources. Une erreur de processor sur un paquet est
+annulée (rollback) sans interrompre les autres sources ; la source concernée (comme une source
+dont le crawl échoue) n'est alors pas finalisée : sa marque et son point de reprise restent
+ceux du run précédent, et le prochain run redemande les enregistrements non écrits.
+
+Transformations en processus (TransformPool, `pipeline.py --transform-workers N`) :
+Les sources dont le processor expose une transformation pure (prepare_*, cf.
+processors/transform.py) envoient leurs paquets à un pool de N processus ; le writer
+reçoit les lignes préparées, dans l'ordre des paquets, et ne fait plus que l'écriture en
+base (write_*). Le parsing et le mapping utilisent ainsi tous les cœurs, hors GIL, tandis
+que SQLite garde un unique écrivain. Au plus IN_FLIGHT_PER_WORKER paquets par processus
+sont en cours de transformation, pour borner la mémoire.
+
+Variables de contrôle :
+- CHUNK_SIZE : nombre d'éléments transmis au processor à chaque appel.
+- QUEUE_SIZE : nombre de paquets pouvant attendre entre le crawler et le processor.
+- IN_FLIGHT_PER_WORKER : paquets en cours de transformation par processus du pool.
+"""
+
+import multiprocessing
+from collections import deque
+from datetime import date
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from crawlers.concurrency import merge_concurrently
+from crawlers.spool import SpoolWriter
+from crawlers.telemetry import get_telemetry
+from processors.transform import Transform, transform_chunk
+
+# ------------------ CONFIG ------------------
+CHUNK_SIZE = 200
+QUEUE_SIZE = 4
+IN_FLIGHT_PER_WORKER = 2
+
+
+def chunked(items: Iterable[Any], size: int = CHUNK_SIZE) -> Iterator[List[Any]]:
+    """Découpe un flux en listes de `size` éléments (la dernière peut être plus courte)."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def prefetch_chunks(
+    items: Iterable[Any],
+    size: int = CHUNK_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    name: str = "crawl",
+    spool: SpoolWriter = None,
+) -> Iterator[List[Any]]:
+    """
+    Consomme `items` dans un thread de fond et renvoie ses paquets via une file bornée :
+    le crawler avance pendant que le thread principal traite le paquet précédent.
+    """
+    def pages():
+        # merge_concurrently aplatit les pages : chaque page ne contient ici qu'un paquet
+        for chunk in chunked(items, size):
+            if spool is not None:
+                spool.write(chunk)
+            yield [chunk]
+
+    yield from merge_concurrently([pages], max_workers=1, queue_size=queue_size, name=name)
+
+
+class TransformPool:
+    """Pool de processus appliquant les transformations pures des processors aux paquets."""
+
+    def __init__(self, workers: int, in_flight: int = None):
+        self.workers = workers
+        self.in_flight = in_flight or workers * IN_FLIGHT_PER_WORKER
+        # spawn plutôt que fork : les threads des crawlers tournent déjà quand le pool démarre
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, transform: Transform, chunk: List[Dict[str, Any]]) -> Future:
+        return self.executor.submit(transform_chunk, transform, chunk)
+
+    def map_chunks(self, transform: Transform, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[Tuple[int, Future]]:
+        """
+        (taille du paquet brut, future des lignes préparées) pour chaque paquet, dans l'ordre
+        d'arrivée ; l'appelant lit le résultat, pour isoler l'échec d'un paquet.
+        """
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), self.submit(transform, chunk)))
+            if len(pending) >= self.in_flight:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SourceStream:
+    """Une source à ingérer : flux d'enregistrements, processor cible et finalisation."""
+
+    def __init__(
+        self,
+        name: str,
+        items: Iterable[Dict[str, Any]],
+        processor_class,
+        process_method: str,
+        spool: SpoolWriter = None,
+        on_complete: Callable[[], None] = None,
+        transform: Transform = None,
+        write_method: str = None,
+    ):
+        self.name = name
+        self.items = items
+        self.processor_class = processor_class
+        self.process_method = process_method
+        self.spool = spool
+        # Transformation pure exécutable dans un TransformPool, et méthode d'écriture de son résultat
+        self.transform = transform
+        self.write_method = write_method
+        # Appelé par le writer une fois la source entièrement ingérée (marques, checkpoints)
+        self.on_complete = on_complete
+        # Paquets annulés par le writer, et erreur du crawl (thread du crawler)
+        self.failed_chunks = 0
+        self.crawl_error = None
+
+    def complete(self):
+        """Finalise la source, sauf si des enregistrements n'ont pas été écrits."""
+        if self.failed_chunks or self.crawl_error is not None:
+            print(
+                f"{self.name}: {self.failed_chunks} paquet(s) non inséré(s)"
+                f"{', crawl interrompu' if self.crawl_error is not None else ''} : "
+                "marque et point de reprise précédents conservés"
+            )
+            return
+        if self.on_complete is not None:
+            self.on_complete()
+
+
+class DateWatermark:
+    """
+    Suit la date de publication la plus récente d'un flux d'enregistrements.
+    observe() laisse passer les enregistrements sans les modifier.
+    Les dates futures (numéros de revue datés de l'année suivante...) sont ignorées : la
+    marque ne dépasse jamais la date du jour, sinon le run suivant sauterait tout ce qui
+    sera publié d'ici là.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.value: Optional[date] = None
+
+    def observe(self, items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        today = date.today()
+        for item in items:
+            raw = item.get(self.field)
+            if raw:
+                try:
+                    value = date.fromisoformat(str(raw)[:10])
+                except ValueError:
+                    value = None
+                if value and value <= today and (self.value is None or value > self.value):
+                    self.value = value
+            yield item
+
+
+def stream_source(
+    st: SourceStream,
+    session,
+    chunk_size: int = CHUNK_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    pool: TransformPool = None,
+) -> int:
+    """
+    Équivalent en flux de run_source : le processor reçoit des paquets au fil du crawl.
+    Avec un pool et une transformation, les paquets sont préparés dans le pool puis écrits
+    par `write_method`. Comme dans run_streams, un paquet en erreur est annulé (rollback)
+    et un crawl interrompu est enregistré sur la source, qui garde alors ses marques.
+    """
+    name = st.name
+    processor = None
+    crawled = 0
+    count = 0
+
+    chunks = prefetch_chunks(st.items, chunk_size, queue_size, name=name, spool=st.spool)
+    if pool is not None and st.transform is not None:
+        batches = pool.map_chunks(st.transform, chunks)
+        method = st.write_method
+    else:
+        batches = ((len(chunk), chunk) for chunk in chunks)
+        method = st.process_method
+
+    try:
+        for size, batch in batches:
+            crawled += size
+            get_telemetry().record_items(name, size)
+            try:
+                if isinstance(batch, Future):
+                    batch = batch.result()
+                if processor is None:
+                    processor = st.processor_class(session)
+                count += getattr(processor, method)(batch)
+            except Exception as e:
+                session.rollback()
+                st.failed_chunks += 1
+                print(f"[ERROR] {name}: paquet de {size} items non inséré ({e})")
+                continue
+            print(f"[{name}] {crawled} crawled, {count} processed")
+    except Exception as e:
+        st.crawl_error = e
+        print(f"[ERROR] {name}: crawl interrompu ({e})")
+    finally:
+        if st.spool is not None:
+            st.spool.close()
+
+    if not crawled:
+        print(f"No data retrieved for {name}.\n")
+        return 0
+
+    print(f"Successfully processed {count} {name} items\n")
+    return count
+
+
+def run_streams(
+    session,
+    streams: List[SourceStream],
+    chunk_size: int = CHUNK_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    concurrent: bool = True,
+    pool: TransformPool = None,
+) -> Dict[str, int]:
+    """
+    Ingère plusieurs sources : séquentiellement (une après l'autre), ou en parallèle avec
+    un thread de crawl par source et un writer unique. Renvoie le nombre traité par source.
+    Avec un pool, les paquets des sources dotées d'une transformation sont préparés dans
+    le pool de processus avant d'atteindre le writer.
+    """
+    if not concurrent or len(streams) <= 1:
+        counts = {}
+        for st in streams:
+            counts[st.name] = stream_source(st, session, chunk_size=chunk_size, queue_size=queue_size, pool=pool)
+            st.complete()
+        return counts
+
+    by_name = {st.name: st for st in streams}
+    processors = {}
+    crawled = {st.name: 0 for st in streams}
+    counts = {st.name: 0 for st in streams}
+
+    def producer(st: SourceStream):
+        def pages():
+            # L'erreur d'un crawl est propre à sa source : les autres continuent
+            try:
+                for chunk in chunked(st.items, chunk_size):
+                    if st.spool is not None:
+                        st.spool.write(chunk)
+                    yield [(st.name, chunk)]
+            except Exception as e:
+                st.crawl_error = e
+                print(f"[ERROR] {st.name}: crawl interrompu ({e})")
+        return pages
+
+    def ingest(st: SourceStream, size: int, batch, method: str):
+        name = st.name
+        crawled[name] += size
+        get_telemetry().record_items(name, size)
+        try:
+            if name not in processors:
+                processors[name] = st.processor_class(session)
+            counts[name] += getattr(processors[name], method)(batch)
+        except Exception as e:
+            session.rollback()
+            st.failed_chunks += 1
+            print(f"[ERROR] {name}: paquet de {size} items non inséré ({e})")
+            return
+        print(f"[{name}] {crawled[name]} crawled, {counts[name]} processed")
+
+    def ingest_transformed(name: str, size: int, future: Future):
+        st = by_name[name]
+        try:
+            batch = future.result()
+        except Exception as e:
+            crawled[name] += size
+            st.failed_chunks += 1
+            print(f"[ERROR] {name}: transformation d'un paquet de {size} items en échec ({e})")
+            return
+        ingest(st, size, batch, st.write_method)
+
+    # Paquets envoyés au pool, écrits dans leur ordre d'arrivée
+    transforming = deque()
+
+    print(f"=== Streaming {len(streams)} sources concurrently: {', '.join(by_name)} ===")
+    try:
+        for name, chunk in merge_concurrently(
+            [producer(st) for st in streams],
+            max_workers=len(streams),
+            queue_size=queue_size * len(streams),
+            name="pipeline",
+        ):
+            st = by_name[name]
+            if pool is not None and st.transform is not None:
+                transforming.append((name, len(chunk), pool.submit(st.transform, chunk)))
+            else:
+                ingest(st, len(chunk), chunk, st.process_method)
+            # Écrit les paquets déjà transformés, et attend le plus ancien si le pool est plein
+            while transforming and (transforming[0][2].done() or len(transforming) > pool.in_flight):
+                ingest_transformed(*transforming.popleft())
+        while transforming:
+            ingest_transformed(*transforming.popleft())
+    finally:
+        for st in streams:
+            if st.spool is not None:
+                st.spool.close()
+
+    for st in streams:
+        if not crawled[st.name]:
+            print(f"No data retrieved for {st.name}.")
+        st.complete()
+    print("\n".join(f"Successfully processed {counts[name]} {name} items" for name in by_name) + "\n")
+    return counts
@@ -0,0 +1,71 @@
+"""
+Tests du writer en flux (scripts/streaming.py) : isolation des erreurs par source.
+
+utilisation:
+python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.streaming import SourceStream, run_streams
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FailingProcessor:
+    """Échoue sur tout paquet contenant l'enregistrement {"id": 3}."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def process(self, records):
+        if any(record["id"] == 3 for record in records):
+            raise ValueError("boom")
+        return len(records)
+
+
+def broken_crawl():
+    yield {"id": 0}
+    yield {"id": 1}
+    raise RuntimeError("API down")
+
+
+class SingleStreamTest(unittest.TestCase):
+    def run_single(self, items):
+        completed = []
+        session = FakeSession()
+        stream = SourceStream("test", items, FailingProcessor, "process", on_complete=lambda: completed.append(True))
+        counts = run_streams(session, [stream], chunk_size=2)
+        return stream, session, counts, completed
+
+    def test_failing_chunk_is_rolled_back_and_marks_kept(self):
+        stream, session, counts, completed = self.run_single([{"id": i} for i in range(6)])
+        self.assertEqual(counts, {"test": 4})
+        self.assertEqual(stream.failed_chunks, 1)
+        self.assertEqual(session.rollbacks, 1)
+        self.assertEqual(completed, [])
+
+    def test_crawl_error_is_recorded_and_marks_kept(self):
+        stream, session, counts, completed = self.run_single(broken_crawl())
+        self.assertEqual(counts, {"test": 2})
+        self.assertIsInstance(stream.crawl_error, RuntimeError)
+        self.assertEqual(completed, [])
+
+    def test_clean_stream_completes(self):
+        stream, session, counts, completed = self.run_single([{"id": i} for i in (0, 1, 2)])
+        self.assertEqual(counts, {"test": 3})
+        self.assertEqual(completed, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()